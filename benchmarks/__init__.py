@@ -0,0 +1 @@
+"""Нагрузочные замеры бота (запускаются вручную через python -m benchmarks.<имя>)."""
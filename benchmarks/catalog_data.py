@@ -0,0 +1,140 @@
+"""
+Синтетический каталог объявлений и размеченные запросы для бенчмарков.
+
+Объявления повторяют схему announcement_to_dict: те же поля и близкие
+к реальным длины текстов. Каждое объявление посвящено одной теме - объекту
+автоматизации в предметной области ("заявки" для "стоматология"); запрос
+о теме считается релевантным всем объявлениям этой темы.
+Генерация детерминирована (seed).
+"""
+import datetime
+import random
+from typing import Dict, List, Set, Tuple
+
+
+# Словарь для текстов: предметные области, действия и объекты автоматизации
+DOMAINS = [
+    'интернет-магазин', 'салон красоты', 'стоматология', 'автосервис', 'фитнес-клуб', 'ресторан',
+    'логистика', 'недвижимость', 'онлайн-школа', 'юридическая фирма', 'HR-отдел', 'бухгалтерия',
+    'туризм', 'страхование', 'медицинский центр', 'маркетплейс', 'производство', 'склад',
+]
+ACTIONS = [
+    'отвечает', 'собирает', 'квалифицирует', 'распределяет', 'напоминает', 'генерирует', 'проверяет',
+    'анализирует', 'записывает', 'консультирует', 'сортирует', 'согласует', 'рассылает', 'оценивает',
+]
+OBJECTS = [
+    'заявки', 'заказы', 'лиды', 'резюме', 'отзывы', 'счета', 'договоры', 'записи клиентов', 'вопросы',
+    'коммерческие предложения', 'обращения в поддержку', 'платежи', 'остатки товаров', 'расписание',
+]
+CHANNELS = ['в Telegram', 'в WhatsApp', 'в Instagram', 'на сайте', 'в CRM', 'по email', 'в Битрикс24', 'в amoCRM']
+FILLER = [
+    'автоматически', 'круглосуточно', 'без участия менеджера', 'с помощью GPT', 'по заданным правилам',
+    'с учетом истории клиента', 'и передает результат ответственному', 'с отчетом в конце дня',
+]
+LAUNCH_TIMES = ['1 день', '3 дня', '1 неделя', '2 недели', '1 месяц']
+PRICES = ['Договорная', '10 000 ₽', '25 000 ₽', '50 000 ₽', '100 000 ₽', 'от 30 000 ₽']
+COMPLEXITY = ['Низкая', 'Средняя', 'Высокая']
+
+# Формулировки запросов пользователей о теме
+QUERY_TEMPLATES = [
+    'нужен бот, который обрабатывает {obj} для бизнеса {domain}',
+    '{obj} {domain} автоматизация',
+    'как автоматизировать {obj}? у нас {domain}',
+    'ищу решение: {obj}, сфера - {domain}',
+]
+
+
+def _sentence(rng: random.Random, domain: str) -> str:
+    """Одно предложение о задаче решения."""
+    return (f"Бот {rng.choice(ACTIONS)} {rng.choice(OBJECTS)} {rng.choice(CHANNELS)} "
+            f"для бизнеса «{domain}» {rng.choice(FILLER)}.")
+
+
+def _text(rng: random.Random, domain: str, sentences: int) -> str:
+    """Абзац из нескольких предложений."""
+    return ' '.join(_sentence(rng, domain) for _ in range(sentences))
+
+
+def make_announcement(ann_id: int, rng: random.Random) -> Dict:
+    """
+    Одно одобренное объявление.
+
+    Args:
+        ann_id: ID объявления
+        rng: Генератор случайных чисел
+
+    Returns:
+        Словарь в формате announcement_to_dict
+    """
+    domain = rng.choice(DOMAINS)
+    action, obj = rng.choice(ACTIONS), rng.choice(OBJECTS)
+    return {
+        'id': ann_id,
+        'user_id': 100000 + rng.randrange(5000),
+        'chat_id': 100000 + rng.randrange(5000),
+        'bot_name': f"{obj.capitalize()} для: {domain} #{ann_id}",
+        'task_solution': _text(rng, domain, rng.randint(3, 8)),
+        'included_features': _text(rng, domain, rng.randint(4, 10)),
+        'client_requirements': _text(rng, domain, rng.randint(2, 5)),
+        'launch_time': rng.choice(LAUNCH_TIMES),
+        'price': rng.choice(PRICES),
+        'complexity': f"{rng.choice(COMPLEXITY)}. {_sentence(rng, domain)}",
+        'short_description': f"Бот {action} {obj} для: {domain}",
+        'is_approved': True,
+        'created_at': datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=ann_id),
+    }
+
+
+def make_announcements(count: int, seed: int = 42) -> List[Dict]:
+    """
+    Синтетический каталог.
+
+    Args:
+        count: Количество объявлений
+        seed: Зерно генератора
+
+    Returns:
+        Список объявлений
+    """
+    rng = random.Random(seed)
+    return [make_announcement(ann_id, rng) for ann_id in range(1, count + 1)]
+
+
+def topic(announcement: Dict) -> Tuple[str, str]:
+    """
+    Тема объявления из его названия ("Заявки для: стоматология #12").
+
+    Args:
+        announcement: Объявление синтетического каталога
+
+    Returns:
+        Кортеж (объект автоматизации, предметная область)
+    """
+    name = announcement['bot_name'].rsplit(' #', 1)[0]
+    obj, domain = name.split(' для: ', 1)
+    return obj.lower(), domain
+
+
+def make_queries(announcements: List[Dict], count: int, seed: int = 7) -> List[Tuple[str, Set[int]]]:
+    """
+    Размеченные запросы к каталогу.
+
+    Args:
+        announcements: Синтетический каталог
+        count: Количество запросов (не больше числа различных формулировок)
+        seed: Зерно генератора
+
+    Returns:
+        Список (запрос, ID релевантных объявлений); запросы не повторяются
+    """
+    relevant: Dict[Tuple[str, str], Set[int]] = {}
+    for ann in announcements:
+        relevant.setdefault(topic(ann), set()).add(ann['id'])
+
+    rng = random.Random(seed)
+    variants = [(template, key) for key in sorted(relevant) for template in QUERY_TEMPLATES]
+    rng.shuffle(variants)
+    return [
+        (template.format(obj=obj, domain=domain), relevant[(obj, domain)])
+        for template, (obj, domain) in variants[:count]
+    ]
@@ -0,0 +1,82 @@
+"""
+Память каталога: словарь на каждую строку против колоночного снимка.
+
+Сравнивает прежнее представление каталога (кортеж словарей со всеми полями
+объявления, включая длинные тексты) с CatalogSnapshot: сколько памяти
+удерживает каталог и сколько выделяется на один поисковый запрос при
+выборке результатов по ID (прежде - словарь id -> объявление и копии результатов).
+
+Запуск (нужны переменные окружения бота):
+    python -m benchmarks.catalog_memory [--size 20000] [--results 5] [--repeat 200]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from services.catalog import CatalogSnapshot, lookup
+from .catalog_data import make_announcements
+
+
+def _retained(build: Callable[[], object]) -> Tuple[object, int]:
+    """Объект и объем памяти, который он удерживает после сборки мусора."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def _per_call(call: Callable[[], object], repeat: int) -> Tuple[float, int]:
+    """Среднее время (мкс) и пиковое выделение памяти (байт) одного вызова."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    elapsed_us = (time.perf_counter() - started) / repeat * 1e6
+
+    gc.collect()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_us, peak
+
+
+def main(size: int, results: int, repeat: int) -> None:
+    """Замер обоих представлений и вывод таблицы результатов."""
+    rows, rows_bytes = _retained(lambda: tuple(make_announcements(size)))
+    snapshot, snapshot_bytes = _retained(lambda: CatalogSnapshot(1, make_announcements(size)))
+
+    ids = random.Random(1).sample(range(1, size + 1), results)
+
+    def dict_lookup():
+        # Прежний путь smart_search: словарь по всему каталогу и копия каждого результата
+        announcement_map = {ann['id']: ann for ann in rows}
+        return [announcement_map[ann_id].copy() for ann_id in ids]
+
+    def snapshot_lookup():
+        return lookup(snapshot, ids)
+
+    dict_us, dict_peak = _per_call(dict_lookup, repeat)
+    snap_us, snap_peak = _per_call(snapshot_lookup, repeat)
+
+    print(f"Каталог: {size} объявлений, результатов на запрос: {results}")
+    print(f"{'представление':<16} {'память, МБ':>11} {'байт/объявл.':>13} {'запрос, мкс':>12} {'выдел./запрос, КБ':>18}")
+    print(f"{'dict на строку':<16} {rows_bytes / 2**20:>11.1f} {rows_bytes / size:>13.0f} "
+          f"{dict_us:>12.1f} {dict_peak / 1024:>18.1f}")
+    print(f"{'CatalogSnapshot':<16} {snapshot_bytes / 2**20:>11.1f} {snapshot_bytes / size:>13.0f} "
+          f"{snap_us:>12.1f} {snap_peak / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Память каталога: словари против колоночного снимка")
+    parser.add_argument('--size', type=int, default=20000, help="объявлений в каталоге")
+    parser.add_argument('--results', type=int, default=5, help="результатов на поисковый запрос")
+    parser.add_argument('--repeat', type=int, default=200, help="повторов для замера времени")
+    args = parser.parse_args()
+
+    main(args.size, args.results, args.repeat)
@@ -0,0 +1,110 @@
+"""
+Задержка цикла событий при конкурентных запросах к БД.
+
+Сравнивает синхронную сессию (как раньше в обработчиках) с AsyncSession:
+N "обработчиков" одновременно выполняют запросы, а фоновая задача
+каждую миллисекунду проверяет, насколько позже она просыпается.
+
+Запуск (нужны переменные окружения бота, БД из DATABASE_URL):
+    python -m benchmarks.event_loop_lag [--concurrency 50] [--queries 20] [--query-delay 0.005]
+
+--query-delay имитирует время ответа MySQL через SELECT SLEEP(...);
+для SQLite выполняется обычный SELECT 1.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from sqlalchemy import text
+
+from database.db import engine, get_db_session, get_async_db_session
+
+
+def _query(delay: float):
+    """Запрос с искусственной задержкой ответа сервера."""
+    if delay and engine.dialect.name == 'mysql':
+        return text('SELECT SLEEP(:delay)').bindparams(delay=delay)
+    return text('SELECT 1')
+
+
+async def _ticker(stop: asyncio.Event, lags: List[float], interval: float = 0.001) -> None:
+    """Замер опоздания пробуждения задачи относительно запрошенного интервала."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started - interval) * 1000)
+
+
+async def _sync_worker(queries: int, delay: float) -> None:
+    """Обработчик со старой синхронной сессией: блокирует цикл событий."""
+    for _ in range(queries):
+        with get_db_session() as session:
+            session.execute(_query(delay))
+        await asyncio.sleep(0)
+
+
+async def _async_worker(queries: int, delay: float) -> None:
+    """Обработчик с AsyncSession: пока ждет БД, цикл обслуживает других."""
+    for _ in range(queries):
+        async with get_async_db_session() as session:
+            await session.execute(_query(delay))
+
+
+async def run(mode: str, concurrency: int, queries: int, delay: float) -> dict:
+    """
+    Прогон одного режима.
+
+    Args:
+        mode: "sync" или "async"
+        concurrency: Количество одновременных обработчиков
+        queries: Количество запросов на обработчик
+        delay: Имитируемое время ответа БД (секунд)
+
+    Returns:
+        Словарь с итоговыми замерами
+    """
+    worker = _sync_worker if mode == 'sync' else _async_worker
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(queries, delay) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+
+    lags.sort()
+    return {
+        'mode': mode,
+        'total_s': elapsed,
+        'qps': concurrency * queries / elapsed,
+        'lag_p95_ms': lags[int(0.95 * (len(lags) - 1))] if lags else 0.0,
+        'lag_max_ms': lags[-1] if lags else 0.0,
+        'ticks': len(lags),
+    }
+
+
+async def main(concurrency: int, queries: int, delay: float) -> None:
+    """Прогон обоих режимов и вывод таблицы результатов."""
+    # Прогрев пулов соединений, чтобы не замерять их создание
+    await run('sync', 1, 1, 0)
+    await run('async', 1, 1, 0)
+
+    print(f"{'режим':<6} {'время, с':>9} {'запр/с':>9} {'лаг p95, мс':>12} {'лаг max, мс':>12} {'тиков':>7}")
+    for mode in ('sync', 'async'):
+        result = await run(mode, concurrency, queries, delay)
+        print(f"{result['mode']:<6} {result['total_s']:>9.2f} {result['qps']:>9.0f} "
+              f"{result['lag_p95_ms']:>12.1f} {result['lag_max_ms']:>12.1f} {result['ticks']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Задержка цикла событий: синхронная сессия против AsyncSession")
+    parser.add_argument('--concurrency', type=int, default=50, help="одновременных обработчиков")
+    parser.add_argument('--queries', type=int, default=20, help="запросов на обработчик")
+    parser.add_argument('--query-delay', type=float, default=0.005, help="имитируемое время ответа MySQL, с")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.concurrency, args.queries, args.query_delay))
@@ -0,0 +1,204 @@
+"""
+Локальная заглушка OpenAI API для бенчмарков и запуска бота без сети.
+
+Отвечает на POST /v1/chat/completions и /v1/embeddings с заданной
+задержкой. Эмбеддинги детерминированы (хеширование признаков, как
+HashingEmbedder). Ответ чата на поисковый промпт тоже детерминирован:
+кандидаты из промпта ранжируются по числу общих с запросом основ слов.
+Вместо этого можно задать готовый ответ чата (--canned-answer).
+Использованные токены считаются так же, как PromptBuilder.
+
+Запуск отдельно (нужны переменные окружения бота; бот подключается
+через OPENAI_BASE_URL=http://127.0.0.1:8099/v1):
+    python -m benchmarks.fake_openai [--port 8099] [--latency-ms 300] [--jitter-ms 100] [--canned-answer answer.json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from services.embeddings import HashingEmbedder
+from services.prompt_builder import count_tokens
+from services.search_index import tokenize
+
+
+HOST = '127.0.0.1'
+
+_QUERY_RE = re.compile(r'Запрос пользователя: "(.*)"\s*$', re.S)
+
+
+class FakeOpenAI:
+    """Заглушка OpenAI API на aiohttp."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, canned_answer: Optional[str] = None,
+                 dimension: int = 256, seed: int = 0):
+        """
+        Инициализация заглушки.
+
+        Args:
+            latency_ms: Задержка каждого ответа (мс)
+            jitter_ms: Случайная добавка к задержке, равномерно от 0 до jitter_ms (мс)
+            canned_answer: Готовый текст ответа чата (по умолчанию ответ строится по промпту)
+            dimension: Размерность эмбеддингов
+            seed: Зерно генератора задержек
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.canned_answer = canned_answer
+        self.embedder = HashingEmbedder(dimension=dimension)
+        self._rng = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ''
+        self.calls: Dict[str, int] = {}
+        self.tokens: Dict[str, int] = {}
+
+    async def _delay(self) -> None:
+        """Имитация сетевой задержки и времени генерации."""
+        delay_ms = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    def _count(self, endpoint: str, tokens: int) -> None:
+        """Учет вызова и токенов."""
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        self.tokens[endpoint] = self.tokens.get(endpoint, 0) + tokens
+
+    @staticmethod
+    def _rank(user_content: str) -> str:
+        """
+        Детерминированный ответ на поисковый промпт.
+
+        Args:
+            user_content: Сообщение пользователя из PromptBuilder.build_search_prompt
+
+        Returns:
+            JSON-ответ в формате, который ожидает AISearchService
+        """
+        match = _QUERY_RE.search(user_content)
+        if not match:
+            return json.dumps({'found': False, 'results': [], 'explanation': 'Нет запроса'}, ensure_ascii=False)
+
+        query_terms = set(tokenize(match.group(1)))
+        scored = []
+        for line in user_content.splitlines():
+            if not line.startswith('{'):
+                continue
+            item = json.loads(line)
+            common = len(query_terms & set(tokenize(f"{item['name']} {item['description']}")))
+            if common:
+                scored.append((common, item['id']))
+
+        # Как модель: только достаточно релевантные решения, не больше пяти
+        threshold = max(1, len(query_terms) // 2)
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        results = [{'id': ann_id} for common, ann_id in scored if common >= threshold][:5]
+        return json.dumps({
+            'found': bool(results),
+            'results': results,
+            'explanation': 'Совпадения по ключевым словам' if results else 'Ничего не найдено'
+        }, ensure_ascii=False)
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        """POST /v1/chat/completions."""
+        body = await request.json()
+        messages = body.get('messages', [])
+        user_content = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
+        content = self.canned_answer if self.canned_answer is not None else self._rank(user_content)
+
+        prompt_tokens = sum(count_tokens(m.get('content', '')) for m in messages)
+        completion_tokens = count_tokens(content)
+        self._count('chat', prompt_tokens + completion_tokens)
+        await self._delay()
+        return web.json_response({
+            'id': f"chatcmpl-bench-{self.calls['chat']}",
+            'object': 'chat.completion',
+            'created': 0,
+            'model': body.get('model', 'gpt-4o-mini'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens
+            }
+        })
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        """POST /v1/embeddings."""
+        body = await request.json()
+        texts: List[str] = body['input'] if isinstance(body['input'], list) else [body['input']]
+        vectors = await self.embedder.embed(texts)
+
+        tokens = sum(count_tokens(text) for text in texts)
+        self._count('embeddings', tokens)
+        await self._delay()
+        return web.json_response({
+            'object': 'list',
+            'data': [
+                {'object': 'embedding', 'index': i, 'embedding': vector.tolist()}
+                for i, vector in enumerate(vectors)
+            ],
+            'model': body.get('model', 'text-embedding-3-small'),
+            'usage': {'prompt_tokens': tokens, 'total_tokens': tokens}
+        })
+
+    def app(self) -> web.Application:
+        """aiohttp-приложение заглушки."""
+        app = web.Application(client_max_size=64 * 2 ** 20)
+        app.router.add_post('/v1/chat/completions', self.chat_completions)
+        app.router.add_post('/v1/embeddings', self.embeddings)
+        return app
+
+    async def start(self, port: int = 0) -> str:
+        """
+        Запуск сервера.
+
+        Args:
+            port: Порт (0 - любой свободный)
+
+        Returns:
+            Базовый URL API (для OPENAI_BASE_URL)
+        """
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, HOST, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{HOST}:{port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Остановка сервера."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def serve(port: int, latency_ms: float, jitter_ms: float, canned_answer: Optional[str]) -> None:
+    """Работа заглушки до остановки процесса."""
+    server = FakeOpenAI(latency_ms, jitter_ms, canned_answer)
+    base_url = await server.start(port)
+    print(f"Заглушка OpenAI: {base_url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальная заглушка OpenAI API")
+    parser.add_argument('--port', type=int, default=8099, help="порт сервера")
+    parser.add_argument('--latency-ms', type=float, default=300, help="задержка ответа, мс")
+    parser.add_argument('--jitter-ms', type=float, default=100, help="случайная добавка к задержке, мс")
+    parser.add_argument('--canned-answer', help="файл с готовым ответом чата")
+    args = parser.parse_args()
+
+    canned = open(args.canned_answer, encoding='utf-8').read() if args.canned_answer else None
+    asyncio.run(serve(args.port, args.latency_ms, args.jitter_ms, canned))
@@ -0,0 +1,239 @@
+"""
+Задержка доставки обновлений: long polling против webhook.
+
+Поднимает локальную заглушку Bot API (getMe, getUpdates, setWebhook и т.п.)
+и подает в нее поток обновлений с заданной скоростью. В режиме polling
+диспетчер забирает их через getUpdates, в режиме webhook заглушка сама
+отправляет их POST-запросами на aiohttp-сервер бота с заголовком секрета,
+как это делает Telegram (до --connections одновременных соединений).
+
+Замеряется время от появления обновления до вызова обработчика
+и пропускная способность. Переменные окружения бота не нужны.
+
+Запуск:
+    python -m benchmarks.polling_vs_webhook [--updates 2000] [--rate 500] [--connections 40]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from aiohttp import ClientSession, web
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+
+HOST = '127.0.0.1'
+TOKEN = '123456:BENCHMARK'
+SECRET = 'benchmark-secret'
+WEBHOOK_PATH = '/webhook'
+
+
+class FakeBotAPI:
+    """Заглушка Bot API: очередь обновлений для getUpdates и учет вызовов методов."""
+
+    def __init__(self):
+        self.updates: List[Dict] = []
+        self.arrived = asyncio.Event()
+        self.calls: Dict[str, int] = {}
+
+    def push(self, update: Dict) -> None:
+        """Появление нового обновления на стороне Telegram."""
+        self.updates.append(update)
+        self.arrived.set()
+
+    async def _get_updates(self, params: Dict) -> List[Dict]:
+        """Long polling: ответ сразу при наличии обновлений, иначе ожидание до timeout."""
+        offset = int(params.get('offset') or 0)
+        self.updates = [update for update in self.updates if update['update_id'] >= offset]
+        if not self.updates:
+            self.arrived.clear()
+            try:
+                await asyncio.wait_for(self.arrived.wait(), timeout=float(params.get('timeout') or 0))
+            except asyncio.TimeoutError:
+                pass
+        limit = int(params.get('limit') or 100)
+        return self.updates[:limit]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Обработка вызова метода /bot<token>/<method>."""
+        method = request.match_info['method'].lower()
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = dict(await request.post())
+
+        if method == 'getme':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'Benchmark', 'username': 'benchmark_bot'}
+        elif method == 'getupdates':
+            result = await self._get_updates(params)
+        else:
+            result = True
+        return web.json_response({'ok': True, 'result': result})
+
+    def app(self) -> web.Application:
+        """aiohttp-приложение заглушки."""
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle)
+        return app
+
+
+def make_update(update_id: int) -> Dict:
+    """Текстовое сообщение в личном чате."""
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': 1000 + update_id % 100, 'type': 'private'},
+            'from': {'id': 1000 + update_id % 100, 'is_bot': False, 'first_name': 'User'},
+            'text': str(update_id),
+        },
+    }
+
+
+def make_dispatcher(injected: Dict[int, float], latencies: List[float], done: asyncio.Event, total: int) -> Dispatcher:
+    """Диспетчер с обработчиком, фиксирующим время получения обновления."""
+    router = Router()
+
+    @router.message()
+    async def on_message(message: Message) -> None:
+        latencies.append((time.perf_counter() - injected[message.message_id]) * 1000)
+        if len(latencies) >= total:
+            done.set()
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp
+
+
+async def produce(total: int, rate: float, deliver, injected: Dict[int, float]) -> None:
+    """
+    Подача обновлений с заданной скоростью.
+
+    Args:
+        total: Количество обновлений
+        rate: Обновлений в секунду
+        deliver: Функция, передающая обновление в выбранный транспорт
+        injected: Сюда записывается время появления каждого обновления (perf_counter)
+    """
+    started = time.perf_counter()
+    for update_id in range(1, total + 1):
+        # Обновления подаются по расписанию, а не после обработки предыдущих
+        delay = started + (update_id - 1) / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        injected[update_id] = time.perf_counter()
+        deliver(make_update(update_id))
+
+
+async def run(mode: str, total: int, rate: float, connections: int, api_port: int, webhook_port: int) -> Dict:
+    """
+    Прогон одного режима.
+
+    Args:
+        mode: "polling" или "webhook"
+        total: Количество обновлений
+        rate: Скорость подачи (обновлений в секунду)
+        connections: Одновременных соединений webhook (max_connections в setWebhook)
+        api_port: Порт заглушки Bot API
+        webhook_port: Порт webhook-сервера бота
+
+    Returns:
+        Словарь с итоговыми замерами
+    """
+    api = FakeBotAPI()
+    api_runner = web.AppRunner(api.app())
+    await api_runner.setup()
+    await web.TCPSite(api_runner, HOST, api_port).start()
+
+    bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(f'http://{HOST}:{api_port}')))
+    latencies: List[float] = []
+    done = asyncio.Event()
+    injected: Dict[int, float] = {}
+    dp = make_dispatcher(injected, latencies, done, total)
+    background: List[asyncio.Task] = []
+
+    if mode == 'polling':
+        background.append(asyncio.create_task(
+            dp.start_polling(bot, handle_signals=False, close_bot_session=False, polling_timeout=10)
+        ))
+        deliver = api.push
+    else:
+        app = web.Application()
+        SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=SECRET).register(app, path=WEBHOOK_PATH)
+        setup_application(app, dp, bot=bot)
+        bot_runner = web.AppRunner(app)
+        await bot_runner.setup()
+        await web.TCPSite(bot_runner, HOST, webhook_port).start()
+
+        # Telegram доставляет обновления не более чем по connections соединениям одновременно
+        queue: asyncio.Queue = asyncio.Queue()
+        client = ClientSession()
+        url = f'http://{HOST}:{webhook_port}{WEBHOOK_PATH}'
+        headers = {'X-Telegram-Bot-Api-Secret-Token': SECRET}
+
+        async def sender() -> None:
+            while True:
+                update = await queue.get()
+                async with client.post(url, json=update, headers=headers) as response:
+                    response.raise_for_status()
+
+        background.extend(asyncio.create_task(sender()) for _ in range(connections))
+        deliver = queue.put_nowait
+
+    # Дать транспорту подняться (первый getUpdates, запуск сервера)
+    await asyncio.sleep(0.2)
+
+    started = time.perf_counter()
+    await produce(total, rate, deliver, injected)
+    await asyncio.wait_for(done.wait(), timeout=60)
+    elapsed = time.perf_counter() - started
+
+    if mode == 'polling':
+        await dp.stop_polling()
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if mode == 'webhook':
+        await client.close()
+        await bot_runner.cleanup()
+    await bot.session.close()
+    await api_runner.cleanup()
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[int(q * (len(latencies) - 1))]
+
+    return {
+        'mode': mode,
+        'total_s': elapsed,
+        'ups': total / elapsed,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'api_calls': sum(api.calls.values()),
+    }
+
+
+async def main(total: int, rate: float, connections: int, api_port: int, webhook_port: int) -> None:
+    """Прогон обоих режимов и вывод таблицы результатов."""
+    print(f"{'режим':<8} {'время, с':>9} {'обн/с':>8} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'вызовов API':>12}")
+    for mode in ('polling', 'webhook'):
+        result = await run(mode, total, rate, connections, api_port, webhook_port)
+        print(f"{result['mode']:<8} {result['total_s']:>9.2f} {result['ups']:>8.0f} {result['p50_ms']:>9.1f} "
+              f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['api_calls']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Задержка доставки обновлений: long polling против webhook")
+    parser.add_argument('--updates', type=int, default=2000, help="количество обновлений")
+    parser.add_argument('--rate', type=float, default=500, help="обновлений в секунду")
+    parser.add_argument('--connections', type=int, default=40, help="одновременных соединений webhook")
+    parser.add_argument('--api-port', type=int, default=8081, help="порт заглушки Bot API")
+    parser.add_argument('--webhook-port', type=int, default=8082, help="порт webhook-сервера")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.updates, args.rate, args.connections, args.api_port, args.webhook_port))
@@ -0,0 +1,90 @@
+"""
+Объем данных, читаемых из БД на один поиск.
+
+Сравнивает запросы до и после проекции колонок на синтетическом каталоге
+(SQLite во временном файле):
+  - все колонки всех одобренных объявлений (так поиск читал каталог на каждый запрос);
+  - только поля каталога (загрузка и периодическая сверка каталога);
+  - карточки показанных результатов: строки целиком против длинных полей одним IN (...).
+
+Байты считаются как в текстовом протоколе MySQL: каждое значение передается
+строкой с префиксом длины (1 байт до 251 байта, 3 байта до 64 КБ, иначе 4 байта).
+
+Запуск (нужны переменные окружения бота):
+    python -m benchmarks.search_bytes [--size 5000] [--shown 1 5 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from database.models import Announcement, Base
+from services.catalog import DETAIL_COLUMNS, SUMMARY_COLUMNS, load_details
+from .catalog_data import make_announcements
+
+
+def _wire_bytes(rows) -> int:
+    """Размер строк результата в текстовом протоколе MySQL."""
+    total = 0
+    for row in rows:
+        for value in row:
+            if value is None:
+                total += 1
+                continue
+            size = len(str(value).encode())
+            total += size + (1 if size < 251 else 3 if size < 2 ** 16 else 4)
+    return total
+
+
+async def main(size: int, shown_counts: list) -> None:
+    """Заполнение БД, выполнение запросов и вывод таблицы результатов."""
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for ann in make_announcements(size):
+            await conn.execute(insert(Announcement).values(**ann))
+
+    approved = Announcement.is_approved == True
+    rng = random.Random(1)
+    report = []
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(Announcement).where(approved))).all()
+        report.append(("все колонки каталога (на каждый поиск до изменения)", len(rows), _wire_bytes(rows)))
+
+        rows = (await conn.execute(select(*SUMMARY_COLUMNS).where(approved))).all()
+        report.append(("поля каталога (загрузка и сверка)", len(rows), _wire_bytes(rows)))
+
+        for shown in shown_counts:
+            ids = rng.sample(range(1, size + 1), shown)
+            rows = (await conn.execute(select(Announcement).where(Announcement.id.in_(ids), approved))).all()
+            report.append((f"карточки {shown}: строки целиком", len(rows), _wire_bytes(rows)))
+
+            rows = (await conn.execute(
+                select(Announcement.id, *DETAIL_COLUMNS).where(Announcement.id.in_(ids), approved)
+            )).all()
+            report.append((f"карточки {shown}: длинные поля, IN (...)", len(rows), _wire_bytes(rows)))
+
+    # Проверка, что load_details выполняет именно замеренный запрос
+    async with AsyncSession(engine) as session:
+        loaded = await load_details(session, [{'id': ann_id} for ann_id in ids])
+        assert [ann['id'] for ann in loaded] == ids
+    await engine.dispose()
+
+    print(f"Каталог: {size} объявлений")
+    print(f"{'запрос':<55} {'строк':>6} {'КБ':>10}")
+    for name, count, total in report:
+        print(f"{name:<55} {count:>6} {total / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Объем данных из БД на один поиск")
+    parser.add_argument('--size', type=int, default=5000, help="объявлений в каталоге")
+    parser.add_argument('--shown', type=int, nargs='+', default=[1, 5, 10], help="показанных карточек")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.size, args.shown))
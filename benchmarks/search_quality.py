@@ -0,0 +1,143 @@
+"""
+Качество и скорость поиска по движкам на синтетическом каталоге.
+
+Генерирует каталог и размеченные запросы (benchmarks.catalog_data), поднимает
+локальную заглушку OpenAI (benchmarks.fake_openai) и прогоняет все запросы
+через AISearchService.smart_search для каждого варианта поиска:
+  - index - локальный индекс BM25;
+  - gpt - кандидаты по локальным эмбеддингам, ранжирование чатом;
+  - gpt-openai-emb - кандидаты по эмбеддингам OpenAI, ранжирование чатом.
+
+Для каждого варианта выводятся recall@k и MRR по разметке, p50/p95/p99
+времени поиска и токены на запрос (чат и эмбеддинги). Построение индексов
+каталога выполняется до замера. Сеть не нужна: все запросы к OpenAI идут
+в заглушку. Движок fulltext требует MySQL с каталогом и здесь не замеряется.
+Каталог передается списком словарей со всеми полями: снимок каталога не
+хранит длинные поля и читает их для индексов из БД, а синтетического
+каталога в БД нет.
+
+Запуск (нужны переменные окружения бота):
+    python -m benchmarks.search_quality [--size 2000] [--queries 200] [--k 5] [--latency-ms 300] [--jitter-ms 100]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Set, Tuple
+
+from config import Config
+from services.ai_search_service import AISearchService
+from services.search_backends import result_ids
+from utils.metrics import metrics
+from .catalog_data import make_announcements, make_queries
+from .fake_openai import FakeOpenAI
+
+
+# Версия синтетического каталога (ключ индексов и кеша)
+CATALOG_VERSION = 1
+
+# Варианты поиска: название -> настройки конфигурации
+VARIANTS: Dict[str, Dict[str, str]] = {
+    'index': {'SEARCH_BACKEND': 'index', 'EMBEDDING_PROVIDER': 'hashing'},
+    'gpt': {'SEARCH_BACKEND': 'gpt', 'EMBEDDING_PROVIDER': 'hashing'},
+    'gpt-openai-emb': {'SEARCH_BACKEND': 'gpt', 'EMBEDDING_PROVIDER': 'openai'},
+}
+
+
+async def run_variant(name: str, announcements: List[Dict], queries: List[Tuple[str, Set[int]]],
+                      k: int, server: FakeOpenAI) -> Dict:
+    """
+    Прогон запросов через один вариант поиска.
+
+    Args:
+        name: Название варианта (ключ VARIANTS)
+        announcements: Синтетический каталог
+        queries: Размеченные запросы
+        k: Глубина выдачи для recall и MRR
+        server: Заглушка OpenAI
+
+    Returns:
+        Словарь с метриками варианта
+    """
+    for option, value in VARIANTS[name].items():
+        setattr(Config, option, value)
+    service = AISearchService()
+
+    # Построение индексов каталога (эмбеддинги, BM25) не входит в замер
+    started = time.perf_counter()
+    await service.smart_search('прогрев индексов', announcements, CATALOG_VERSION)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    metrics.reset()
+    embedding_tokens = server.tokens.get('embeddings', 0)
+    latencies, recalls, reciprocal_ranks = [], [], []
+    for query, relevant in queries:
+        started = time.perf_counter()
+        result = await service.smart_search(query, announcements, CATALOG_VERSION)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        top = result_ids(result)[:k]
+        recalls.append(len(relevant.intersection(top)) / len(relevant))
+        reciprocal_ranks.append(next((1 / rank for rank, ann_id in enumerate(top, 1) if ann_id in relevant), 0.0))
+
+    latencies.sort()
+
+    def percentile(q: float) -> float:
+        return latencies[int(q * (len(latencies) - 1))]
+
+    counters = metrics.snapshot()
+    chat_tokens = counters.get('ai.search.prompt_tokens.sum', 0) + counters.get('ai.search.completion_tokens.sum', 0)
+    return {
+        'name': name,
+        'recall': sum(recalls) / len(queries),
+        'mrr': sum(reciprocal_ranks) / len(queries),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'chat_tokens': chat_tokens / len(queries),
+        'embedding_tokens': (server.tokens.get('embeddings', 0) - embedding_tokens) / len(queries),
+        'build_ms': build_ms,
+    }
+
+
+async def main(size: int, query_count: int, k: int, latency_ms: float, jitter_ms: float, variants: List[str]) -> None:
+    """Прогон всех вариантов и вывод таблицы результатов."""
+    announcements = make_announcements(size)
+    queries = make_queries(announcements, query_count)
+
+    server = FakeOpenAI(latency_ms, jitter_ms)
+    os.environ['OPENAI_BASE_URL'] = await server.start()
+    Config.OPENAI_API_KEY = 'benchmark'
+    Config.SEARCH_RETRIEVER = 'embeddings'
+    Config.SEARCH_FALLBACK = 'index'
+    Config.SEARCH_SHADOW_BACKEND = ''
+    try:
+        results = [await run_variant(name, announcements, queries, k, server) for name in variants]
+    finally:
+        await server.stop()
+
+    print(f"Каталог: {size} объявлений, запросов: {len(queries)}, "
+          f"задержка OpenAI: {latency_ms:.0f}+{jitter_ms:.0f} мс")
+    print(f"{'вариант':<15} {f'recall@{k}':>9} {'MRR':>6} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} "
+          f"{'токены/запр':>12} {'эмб./запр':>10} {'индексы, мс':>12}")
+    for result in results:
+        print(f"{result['name']:<15} {result['recall']:>9.3f} {result['mrr']:>6.3f} {result['p50_ms']:>9.1f} "
+              f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['chat_tokens']:>12.0f} "
+              f"{result['embedding_tokens']:>10.1f} {result['build_ms']:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Качество и скорость поиска на синтетическом каталоге")
+    parser.add_argument('--size', type=int, default=2000, help="объявлений в каталоге")
+    parser.add_argument('--queries', type=int, default=200, help="размеченных запросов")
+    parser.add_argument('--k', type=int, default=5, help="глубина выдачи для recall и MRR")
+    parser.add_argument('--latency-ms', type=float, default=300, help="задержка ответа заглушки OpenAI, мс")
+    parser.add_argument('--jitter-ms', type=float, default=100, help="случайная добавка к задержке, мс")
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS),
+                        help="варианты поиска")
+    args = parser.parse_args()
+
+    # Логи каждого запроса к заглушке и к GPT заглушают таблицу результатов
+    logging.disable(logging.INFO)
+    asyncio.run(main(args.size, args.queries, args.k, args.latency_ms, args.jitter_ms, args.variants))
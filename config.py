@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List
 
 # Загрузка переменных окружения из .env файла
 load_dotenv()
@@ -12,12 +12,162 @@ class Config:
     # Токен бота
     BOT_TOKEN: str = os.getenv("BOT_TOKEN")
     
+    # Режим получения обновлений: polling (long polling) или webhook
+    BOT_MODE: str = os.getenv("BOT_MODE", "polling").lower()
+
+    # Публичный HTTPS-адрес бота для webhook (без пути), например https://bot.example.com
+    WEBHOOK_BASE_URL: str = os.getenv("WEBHOOK_BASE_URL")
+
+    # Путь, на который Telegram присылает обновления
+    WEBHOOK_PATH: str = os.getenv("WEBHOOK_PATH", "/webhook")
+
+    # Секрет, который Telegram передает в заголовке X-Telegram-Bot-Api-Secret-Token
+    WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET")
+
+    # Адрес и порт, на которых слушает webhook-сервер
+    WEBHOOK_HOST: str = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+    WEBHOOK_PORT: int = int(os.getenv("WEBHOOK_PORT", "8080"))
+
+    # Хранилище состояний FSM: memory (в процессе, с удалением по простою), sql (таблица fsm_states) или redis
+    FSM_STORAGE: str = os.getenv("FSM_STORAGE", "memory").lower()
+
+    # Адрес Redis для FSM_STORAGE=redis
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Время жизни брошенного состояния FSM с последнего изменения (секунд)
+    FSM_STATE_TTL: int = int(os.getenv("FSM_STATE_TTL", "86400"))
+
+    # Время простоя до удаления состояния по группам, например "SearchForm=600,AnnouncementForm=7200"
+    # (группы без настройки используют FSM_STATE_TTL; в sql и redis - с последнего изменения)
+    FSM_GROUP_TTLS: Dict[str, int] = {
+        name.strip(): int(ttl) for name, _, ttl in (
+            item.partition("=") for item in os.getenv("FSM_GROUP_TTLS", "").split(",")
+        )
+        if name.strip() and ttl.strip().isdigit()
+    }
+
+    # Интервал удаления просроченных состояний (секунд)
+    FSM_CLEANUP_INTERVAL: int = int(os.getenv("FSM_CLEANUP_INTERVAL", "600"))
+
     # URL базы данных
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+
+    # URL базы данных для асинхронного драйвера (по умолчанию выводится из DATABASE_URL)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL")
+    
+    # Применять миграции Alembic при старте бота вместо ошибки об устаревшей схеме БД
+    DB_AUTO_MIGRATE: bool = os.getenv("DB_AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
     
     # OpenAI API ключ для умного поиска
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
 
+    # Предельное время запроса к OpenAI, включая ожидание свободного слота (секунд)
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "15"))
+
+    # Максимум одновременных запросов к OpenAI
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+
+    # Размыкатель цепи OpenAI: окно (секунд), минимум вызовов в окне и доля ошибок для размыкания
+    OPENAI_BREAKER_WINDOW: float = float(os.getenv("OPENAI_BREAKER_WINDOW", "60"))
+    OPENAI_BREAKER_MIN_CALLS: int = int(os.getenv("OPENAI_BREAKER_MIN_CALLS", "5"))
+    OPENAI_BREAKER_FAILURE_RATE: float = float(os.getenv("OPENAI_BREAKER_FAILURE_RATE", "0.5"))
+
+    # Время в разомкнутом состоянии до пробного запроса (секунд)
+    OPENAI_BREAKER_OPEN_SECONDS: float = float(os.getenv("OPENAI_BREAKER_OPEN_SECONDS", "30"))
+
+    # Поставщик эмбеддингов для векторного поиска: hashing (локальный) или openai
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "hashing")
+
+    # Модель эмбеддингов OpenAI
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+    # Основной движок поиска: gpt (кандидаты + ранжирование GPT), index (локальный BM25) или fulltext (MySQL)
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "gpt")
+
+    # Теневой движок для сравнения с основным на живых запросах (пусто - выключено) и доля таких запросов
+    SEARCH_SHADOW_BACKEND: str = os.getenv("SEARCH_SHADOW_BACKEND", "")
+    SEARCH_SHADOW_SAMPLE: float = float(os.getenv("SEARCH_SHADOW_SAMPLE", "0.05"))
+
+    # Источник кандидатов для GPT: embeddings (векторный поиск в памяти) или fulltext (FULLTEXT-индекс MySQL)
+    SEARCH_RETRIEVER: str = os.getenv("SEARCH_RETRIEVER", "embeddings")
+
+    # Резервный движок (нет ключа OpenAI, ошибка или недоступность основного): index или fulltext
+    SEARCH_FALLBACK: str = os.getenv("SEARCH_FALLBACK", "index")
+
+    # Количество кандидатов, передаваемых GPT для ранжирования
+    SEARCH_CANDIDATES_K: int = int(os.getenv("SEARCH_CANDIDATES_K", "20"))
+
+    # Максимальный размер промпта GPT в токенах
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+
+    # Максимальная длина описания решения в промпте (символов)
+    PROMPT_DESCRIPTION_CHARS: int = int(os.getenv("PROMPT_DESCRIPTION_CHARS", "300"))
+
+    # Срок показа первого результата поиска (локальный индекс, если GPT не успел), секунд
+    SEARCH_FIRST_RESULT_DEADLINE: float = float(os.getenv("SEARCH_FIRST_RESULT_DEADLINE", "0.3"))
+
+    # Срок, до которого ответ GPT заменяет показанный результат, секунд от начала поиска
+    SEARCH_FINAL_DEADLINE: float = float(os.getenv("SEARCH_FINAL_DEADLINE", "10"))
+
+    # Максимальное количество закешированных результатов поиска
+    SEARCH_CACHE_SIZE: int = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+
+    # Время жизни результата поиска в кеше (секунд)
+    SEARCH_CACHE_TTL: int = int(os.getenv("SEARCH_CACHE_TTL", "600"))
+
+    # Интервал вывода метрик в лог (секунд, 0 - не выводить)
+    METRICS_LOG_INTERVAL: int = int(os.getenv("METRICS_LOG_INTERVAL", "60"))
+
+    # Интервал сверки каталога объявлений в памяти с БД (секунд)
+    CATALOG_RECONCILE_INTERVAL: int = int(os.getenv("CATALOG_RECONCILE_INTERVAL", "300"))
+
+    # Максимум получателей, которым уведомления отправляются одновременно
+    NOTIFY_CONCURRENCY: int = int(os.getenv("NOTIFY_CONCURRENCY", "8"))
+
+    # Максимум отправок сообщений в секунду на бота
+    TELEGRAM_GLOBAL_RATE: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+
+    # Максимум отправок сообщений в секунду в один личный чат
+    TELEGRAM_PRIVATE_CHAT_RATE: float = float(os.getenv("TELEGRAM_PRIVATE_CHAT_RATE", "1"))
+
+    # Максимум отправок сообщений в секунду в одну группу (Telegram допускает около 20 в минуту)
+    TELEGRAM_GROUP_CHAT_RATE: float = float(os.getenv("TELEGRAM_GROUP_CHAT_RATE", str(20 / 60)))
+
+    # Допустимый всплеск отправок в один чат
+    TELEGRAM_CHAT_BURST: float = float(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+
+    # Количество повторов отправки после ответа 429 (RetryAfter)
+    TELEGRAM_MAX_RETRIES: int = int(os.getenv("TELEGRAM_MAX_RETRIES", "3"))
+
+    # Входящие действия пользователя в секунду и допустимый всплеск (кнопки, шаги форм)
+    THROTTLE_DEFAULT_RATE: float = float(os.getenv("THROTTLE_DEFAULT_RATE", "2"))
+    THROTTLE_DEFAULT_BURST: float = float(os.getenv("THROTTLE_DEFAULT_BURST", "5"))
+
+    # Поисковые запросы пользователя в секунду и допустимый всплеск (каждый запрос - вызов GPT)
+    THROTTLE_SEARCH_RATE: float = float(os.getenv("THROTTLE_SEARCH_RATE", str(1 / 10)))
+    THROTTLE_SEARCH_BURST: float = float(os.getenv("THROTTLE_SEARCH_BURST", "3"))
+
+    # Максимум пользователей, для которых хранятся ведра ограничения
+    THROTTLE_MAX_USERS: int = int(os.getenv("THROTTLE_MAX_USERS", "10000"))
+
+    # Записей outbox, отправляемых за один проход
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+
+    # Интервал опроса outbox, если новых записей нет (секунд)
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+
+    # Количество попыток отправки записи outbox
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+
+    # Задержка перед первым повтором отправки, удваивается с каждой попыткой (секунд)
+    OUTBOX_RETRY_BASE_DELAY: float = float(os.getenv("OUTBOX_RETRY_BASE_DELAY", "2"))
+
+    # Максимальная задержка повтора отправки (секунд)
+    OUTBOX_RETRY_MAX_DELAY: float = float(os.getenv("OUTBOX_RETRY_MAX_DELAY", "600"))
+
+    # Время, на которое запись outbox закрепляется за обработчиком (секунд)
+    OUTBOX_LEASE: float = float(os.getenv("OUTBOX_LEASE", "120"))
+
     # URL чата
     CHAT_URL: str = os.getenv("CHAT_URL")
     
@@ -42,9 +192,40 @@ class Config:
         if not cls.BOT_TOKEN:
             raise ValueError("BOT_TOKEN не найден в переменных окружения")
         
+        if cls.BOT_MODE not in ("polling", "webhook"):
+            raise ValueError("BOT_MODE должен быть polling или webhook")
+
+        if cls.BOT_MODE == "webhook" and not (cls.WEBHOOK_BASE_URL and cls.WEBHOOK_SECRET):
+            raise ValueError("Для режима webhook нужны WEBHOOK_BASE_URL и WEBHOOK_SECRET")
+        
+        if cls.FSM_STORAGE not in ("memory", "sql", "redis"):
+            raise ValueError("FSM_STORAGE должен быть memory, sql или redis")
+
         if not cls.DATABASE_URL:
             raise ValueError("DATABASE_URL не найден в переменных окружения")
 
+        if cls.SEARCH_BACKEND not in ("gpt", "index", "fulltext"):
+            raise ValueError("SEARCH_BACKEND должен быть gpt, index или fulltext")
+
+        if cls.SEARCH_SHADOW_BACKEND not in ("", "gpt", "index", "fulltext"):
+            raise ValueError("SEARCH_SHADOW_BACKEND должен быть пустым, gpt, index или fulltext")
+
+        if cls.SEARCH_SHADOW_BACKEND == cls.SEARCH_BACKEND:
+            raise ValueError("SEARCH_SHADOW_BACKEND должен отличаться от SEARCH_BACKEND")
+
+        if not 0 <= cls.SEARCH_SHADOW_SAMPLE <= 1:
+            raise ValueError("SEARCH_SHADOW_SAMPLE должен быть от 0 до 1")
+
+        if cls.SEARCH_RETRIEVER not in ("embeddings", "fulltext"):
+            raise ValueError("SEARCH_RETRIEVER должен быть embeddings или fulltext")
+
+        if cls.SEARCH_FALLBACK not in ("index", "fulltext"):
+            raise ValueError("SEARCH_FALLBACK должен быть index или fulltext")
+
+        search_engines = (cls.SEARCH_BACKEND, cls.SEARCH_SHADOW_BACKEND, cls.SEARCH_RETRIEVER, cls.SEARCH_FALLBACK)
+        if "fulltext" in search_engines and not cls.DATABASE_URL.startswith("mysql"):
+            raise ValueError("Полнотекстовый поиск (fulltext) доступен только с MySQL")
+
         if not cls.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY не настроен - необходим для умного поиска")
         
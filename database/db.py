@@ -1,13 +1,39 @@
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from config import Config
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
+from typing import AsyncIterator
+
+
+def make_async_url(url: str) -> str:
+    """
+    Преобразование URL базы данных для асинхронного драйвера.
+
+    Args:
+        url: URL базы данных для синхронного драйвера
+
+    Returns:
+        URL с асинхронным драйвером (aiomysql для MySQL, aiosqlite для SQLite)
+    """
+    for prefix, async_prefix in (('mysql+pymysql://', 'mysql+aiomysql://'),
+                                 ('mysql://', 'mysql+aiomysql://'),
+                                 ('sqlite://', 'sqlite+aiosqlite://')):
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
 
 # Настройка подключения к базе данных
 DATABASE_URL = Config.DATABASE_URL
 engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_recycle=300)
 SessionLocal = sessionmaker(bind=engine)
 
+# Асинхронное подключение для обработчиков: запросы не блокируют цикл событий
+ASYNC_DATABASE_URL = Config.ASYNC_DATABASE_URL or make_async_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True, pool_recycle=300)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 
 def get_session():
     """Получение новой сессии базы данных"""
@@ -28,6 +54,25 @@ def get_db_session():
         session.close()
 
 
+def get_async_session() -> AsyncSession:
+    """Получение новой асинхронной сессии базы данных"""
+    return AsyncSessionLocal()
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncIterator[AsyncSession]:
+    """Асинхронный контекстный менеджер для работы с сессией БД"""
+    session = AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
 # Для обратной совместимости
 def get_db():
     """Генератор сессии (для совместимости с FastAPI стилем)"""
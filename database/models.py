@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Boolean, Text, JSON, create_engine
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Boolean, Text, JSON, Index, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from config import Config
 import datetime
@@ -9,6 +9,15 @@ Base = declarative_base()
 class Announcement(Base):
     """Модель объявления"""
     __tablename__ = 'announcements'
+    __table_args__ = (
+        Index('ix_announcements_is_approved_created_at', 'is_approved', 'created_at'),
+        Index('ix_announcements_user_id_created_at', 'user_id', 'created_at'),
+        # Полнотекстовый поиск (MySQL, парсер ngram для кириллицы); в других БД индекс не создается
+        Index(
+            'ft_announcements_text', 'bot_name', 'task_solution', 'included_features',
+            mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+        ).ddl_if(dialect='mysql'),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, nullable=False)
@@ -20,6 +29,7 @@ class Announcement(Base):
     launch_time = Column(String(50), nullable=False)
     price = Column(String(100), nullable=False)
     complexity = Column(Text, nullable=False)
+    short_description = Column(String(255), nullable=True)
     demo_url = Column(String(2048), nullable=True)
     documents = Column(JSON, nullable=True)
     videos = Column(JSON, nullable=True)
@@ -56,6 +66,10 @@ class Announcement(Base):
 class CustomRequest(Base):
     """Модель заявки на индивидуальное решение"""
     __tablename__ = 'custom_requests'
+    __table_args__ = (
+        Index('ix_custom_requests_is_approved_created_at', 'is_approved', 'created_at'),
+        Index('ix_custom_requests_user_id_created_at', 'user_id', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(BigInteger, nullable=False)
@@ -93,8 +107,47 @@ class CustomRequest(Base):
         return self.is_approved is False
 
 
+class OutboxMessage(Base):
+    """Модель исходящей отправки в Telegram (transactional outbox)"""
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        Index('ix_outbox_status_available_at', 'status', 'available_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    progress = Column(JSON, nullable=True)
+    dedup_key = Column(String(255), nullable=True, unique=True)
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    available_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, kind='{self.kind}', status='{self.status}')>"
+
+
+class FsmRecord(Base):
+    """Модель состояния FSM пользователя (общее хранилище для нескольких экземпляров бота)"""
+    __tablename__ = 'fsm_states'
+    __table_args__ = (
+        Index('ix_fsm_states_expires_at', 'expires_at'),
+    )
+
+    storage_key = Column(String(255), primary_key=True)
+    state = Column(String(255), nullable=True)
+    data = Column(JSON(none_as_null=True), nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<FsmRecord(storage_key='{self.storage_key}', state='{self.state}')>"
+
+
 # Создание базы данных
 def create_tables():
-    """Создание таблиц в базе данных"""
+    """Создание таблиц в базе данных без миграций (для локальной разработки и тестов)"""
     engine = create_engine(Config.DATABASE_URL, pool_pre_ping=True, pool_recycle=300)
     Base.metadata.create_all(engine)
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+
+from config import Config
+from .db import async_engine
+
+
+logger = logging.getLogger(__name__)
+
+# Исходная ревизия: схема, которую бот создавал сам до появления миграций
+BASELINE_REVISION = '0001'
+
+# alembic.ini лежит в корне проекта
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic.ini')
+
+
+def get_alembic_config() -> AlembicConfig:
+    """
+    Конфигурация Alembic для запуска миграций из кода бота.
+
+    Returns:
+        Конфигурация Alembic
+    """
+    alembic_config = AlembicConfig(ALEMBIC_INI)
+    # Логирование уже настроено ботом, env.py не должен его перезаписывать
+    alembic_config.attributes['configure_logger'] = False
+    return alembic_config
+
+
+def get_head_revision() -> Optional[str]:
+    """
+    Последняя ревизия миграций в коде.
+
+    Returns:
+        ID ревизии
+    """
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+async def get_current_revision() -> Optional[str]:
+    """
+    Ревизия схемы, примененная к БД.
+
+    Returns:
+        ID ревизии или None, если миграции не применялись
+    """
+    async with async_engine.connect() as connection:
+        return await connection.run_sync(
+            lambda sync_connection: MigrationContext.configure(sync_connection).get_current_revision()
+        )
+
+
+async def has_baseline_tables() -> bool:
+    """
+    Есть ли в БД таблицы исходной схемы (база создана до появления миграций).
+
+    Returns:
+        True, если таблица announcements уже существует
+    """
+    async with async_engine.connect() as connection:
+        return await connection.run_sync(
+            lambda sync_connection: inspect(sync_connection).has_table('announcements')
+        )
+
+
+async def check_schema_version() -> str:
+    """
+    Проверка версии схемы БД при старте бота.
+
+    DDL при каждом запуске больше не выполняется: схема меняется только
+    миграциями (alembic upgrade head). При DB_AUTO_MIGRATE миграции
+    применяются автоматически; база, созданная до появления миграций,
+    сначала отмечается исходной ревизией.
+
+    Returns:
+        Текущая ревизия схемы
+
+    Raises:
+        RuntimeError: Если схема БД отстает от кода
+    """
+    head = get_head_revision()
+    current = await get_current_revision()
+    if current == head:
+        logger.info(f"Схема БД актуальна, ревизия {current}")
+        return current
+
+    # Таблицы созданы ботом до появления миграций: исходную миграцию применять нельзя
+    unversioned = current is None and await has_baseline_tables()
+
+    if not Config.DB_AUTO_MIGRATE:
+        command_hint = f"alembic stamp {BASELINE_REVISION} && alembic upgrade head" if unversioned \
+            else "alembic upgrade head"
+        raise RuntimeError(
+            f"Схема БД устарела (ревизия {current}, требуется {head}). "
+            f"Выполните: {command_hint}"
+        )
+
+    if unversioned:
+        logger.info(f"БД создана до появления миграций, отмечаем ревизию {BASELINE_REVISION}")
+        await asyncio.to_thread(command.stamp, get_alembic_config(), BASELINE_REVISION)
+        current = BASELINE_REVISION
+
+    logger.info(f"Применение миграций БД: {current} -> {head}")
+    await asyncio.to_thread(command.upgrade, get_alembic_config(), 'head')
+    return head
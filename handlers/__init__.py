@@ -1,4 +1,5 @@
 from aiogram import Router
+from services import AISearchService
 from .start_handler import StartHandler
 from .announcement_handler import AnnouncementHandler
 from .moderation_handler import ModerationHandler
@@ -15,12 +16,15 @@ def setup_handlers() -> Router:
     """
     main_router = Router()
 
+    # Один сервис AI-поиска на процесс: общий лимит запросов и размыкатель цепи OpenAI
+    ai_search = AISearchService()
+
     # Инициализация обработчиков
     handlers = [
         StartHandler(),
         AnnouncementHandler(),
-        ModerationHandler(),
-        SearchHandler(),
+        ModerationHandler(ai_search),
+        SearchHandler(ai_search),
         CustomRequestHandler()
     ]
 
@@ -3,7 +3,8 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from .base import BaseHandler, DatabaseMixin
-from utils import messages
+from utils import messages, fan_out
+from utils.media import send_attachments
 from config import Config
 import os
 
@@ -853,7 +854,7 @@ class AnnouncementHandler(BaseHandler, DatabaseMixin):
             videos = data.get('videos', [])
             demo_url = data.get('demo_url', '')
 
-            announcement = self.safe_db_operation(
+            announcement = await self.safe_db_operation(
                 self._create_announcement_in_db,
                 callback.from_user.id,
                 callback.message.chat.id,
@@ -912,12 +913,12 @@ class AnnouncementHandler(BaseHandler, DatabaseMixin):
         except Exception as e:
             await self.send_error_message(callback, 'general_error', error=str(e))
 
-    def _create_announcement_in_db(self, session, user_id: int, chat_id: int,
+    async def _create_announcement_in_db(self, session, user_id: int, chat_id: int,
                                    bot_name: str, task_solution: str, included_features: str,
                                    client_requirements: str, launch_time: str, price: str, complexity: str,
                                    demo_url: str, documents: list, videos: list) -> dict:
         """Создание объявления в базе данных."""
-        announcement = self.create_announcement(session, user_id, chat_id, bot_name, task_solution,
+        announcement = await self.create_announcement(session, user_id, chat_id, bot_name, task_solution,
                                                 included_features, client_requirements, launch_time, price, complexity,
                                                 demo_url, documents, videos)
         return {
@@ -969,40 +970,20 @@ class AnnouncementHandler(BaseHandler, DatabaseMixin):
             # Создаем клавиатуру для модерации
             keyboard = self._create_moderation_keyboard(announcement['id'], message.chat.id)
 
-            # Отправляем объявление и файлы модераторам
-            for moderator_id in self.moderator_ids:
-                try:
-                    # Отправляем текст объявления
-                    await message.bot.send_message(
-                        moderator_id,
-                        announcement_text,
-                        parse_mode='HTML',
-                        reply_markup=keyboard
-                    )
+            async def send(moderator_id: int):
+                # Текст и файлы одному модератору уходят по порядку
+                await message.bot.send_message(
+                    moderator_id,
+                    announcement_text,
+                    parse_mode='HTML',
+                    reply_markup=keyboard
+                )
+
+                # Файлы альбомами: документы и видео отдельно, до 10 в альбоме
+                await send_attachments(message.bot, moderator_id, announcement['documents'], announcement['videos'])
 
-                    # Отправляем сами файлы
-                    if announcement['documents']:
-                        for doc in announcement['documents']:
-                            try:
-                                await message.bot.send_document(
-                                    moderator_id,
-                                    doc['file_id']
-                                )
-                            except Exception as e:
-                                continue
-
-                    if announcement['videos']:
-                        for video in announcement['videos']:
-                            try:
-                                await message.bot.send_video(
-                                    moderator_id,
-                                    video['file_id']
-                                )
-                            except Exception as e:
-                                continue
-
-                except Exception as e:
-                    continue
+            # Отправляем объявление и файлы всем модераторам параллельно
+            await fan_out(self.moderator_ids, send, name='notify.new_announcement')
 
         except Exception as e:
             await self.send_error_message(message, 'general_error', error=str(e))
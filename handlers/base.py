@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
 from aiogram import Router
 from aiogram.types import CallbackQuery, Message
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from database.models import Announcement, CustomRequest
-from database.db import get_session
+from database.db import get_async_session
 from utils import messages
 from typing import Optional, List
 
@@ -20,14 +21,14 @@ class BaseHandler(ABC):
         """Настройка обработчиков для конкретного класса."""
         pass
 
-    def get_db_session(self) -> Session:
+    def get_db_session(self) -> AsyncSession:
         """
-        Получение сессии базы данных.
+        Получение асинхронной сессии базы данных.
 
         Returns:
-            Session: Сессия базы данных.
+            AsyncSession: Сессия базы данных.
         """
-        return get_session()
+        return get_async_session()
 
     async def send_error_message(self, message_or_callback: Message | CallbackQuery, error_key: str, **kwargs):
         """
@@ -57,7 +58,7 @@ class BaseHandler(ABC):
         """
         return user_id in moderator_ids
 
-    def get_announcement_by_id(self, session: Session, announcement_id: int) -> Optional[Announcement]:
+    async def get_announcement_by_id(self, session: AsyncSession, announcement_id: int) -> Optional[Announcement]:
         """
         Получение объявления по ID.
 
@@ -68,36 +69,36 @@ class BaseHandler(ABC):
         Returns:
             Optional[Announcement]: Объект объявления или None, если не найдено.
         """
-        return session.query(Announcement).filter_by(id=announcement_id).first()
+        return await session.get(Announcement, announcement_id)
 
 
 class DatabaseMixin:
     """Миксин для работы с базой данных."""
 
-    def safe_db_operation(self, operation_func, *args, **kwargs):
+    async def safe_db_operation(self, operation_func, *args, **kwargs):
         """
         Безопасное выполнение операций с базой данных.
 
         Args:
-            operation_func: Функция для выполнения операции с БД.
+            operation_func: Асинхронная функция для выполнения операции с БД.
             *args: Позиционные аргументы для функции.
             **kwargs: Именованные аргументы для функции.
 
         Returns:
             Результат выполнения функции или исключение в случае ошибки.
         """
-        session = get_session()
+        session = get_async_session()
         try:
-            result = operation_func(session, *args, **kwargs)
-            session.commit()
+            result = await operation_func(session, *args, **kwargs)
+            await session.commit()
             return result
         except Exception as e:
-            session.rollback()
+            await session.rollback()
             raise e
         finally:
-            session.close()
+            await session.close()
 
-    def get_announcement_by_id(self, session: Session, announcement_id: int) -> Optional[Announcement]:
+    async def get_announcement_by_id(self, session: AsyncSession, announcement_id: int) -> Optional[Announcement]:
         """
         Получение объявления по ID.
 
@@ -108,9 +109,9 @@ class DatabaseMixin:
         Returns:
             Optional[Announcement]: Объект объявления или None, если не найдено.
         """
-        return session.query(Announcement).filter(Announcement.id == announcement_id).first()
+        return await session.get(Announcement, announcement_id)
 
-    def create_announcement(self, session: Session, user_id: int, chat_id: int,
+    async def create_announcement(self, session: AsyncSession, user_id: int, chat_id: int,
                            bot_name: str, task_solution: str, included_features: str,
                            client_requirements: str, launch_time: str, price: str,
                            complexity: str, demo_url: str, documents: list, videos: list) -> Announcement:
@@ -151,11 +152,50 @@ class DatabaseMixin:
             is_approved=None
         )
         session.add(new_announcement)
-        session.flush()
+        await session.flush()
         return new_announcement
 
-    def update_announcement_status(self, session: Session, announcement_id: int,
-                                  is_approved: bool, moderator_id: int) -> Optional[Announcement]:
+    async def update_status(self, session: AsyncSession, model, row_id: int,
+                            is_approved: bool, moderator_id: int) -> Optional[Row]:
+        """
+        Атомарная смена статуса модерации одним условным UPDATE.
+
+        Статус меняется только у записи на модерации (is_approved IS NULL),
+        поэтому из одновременных решений двух модераторов применяется ровно одно.
+
+        Args:
+            session: Сессия базы данных.
+            model: Модель (Announcement или CustomRequest).
+            row_id: ID записи.
+            is_approved: Статус одобрения.
+            moderator_id: ID модератора.
+
+        Returns:
+            Optional[Row]: Строка записи после изменения или None, если запись не найдена или уже обработана.
+        """
+        columns = model.__table__.columns
+        statement = update(model).where(
+            model.id == row_id,
+            model.is_approved.is_(None)
+        ).values(
+            is_approved=is_approved,
+            moderator_id=moderator_id
+        ).execution_options(synchronize_session=False)
+
+        connection = await session.connection()
+        if connection.dialect.update_returning:
+            return (await session.execute(statement.returning(*columns))).first()
+
+        result = await session.execute(statement)
+        if result.rowcount != 1:
+            return None
+
+        # MySQL не поддерживает UPDATE ... RETURNING: строка заблокирована нашим UPDATE
+        # до конца транзакции, поэтому чтение видит именно примененное решение
+        return (await session.execute(select(*columns).where(model.id == row_id))).one()
+
+    async def update_announcement_status(self, session: AsyncSession, announcement_id: int,
+                                  is_approved: bool, moderator_id: int) -> Optional[Row]:
         """
         Обновление статуса объявления.
 
@@ -166,16 +206,38 @@ class DatabaseMixin:
             moderator_id: ID модератора.
 
         Returns:
-            Optional[Announcement]: Обновленный объект объявления или None, если не найдено.
+            Optional[Row]: Строка обновленного объявления или None, если не найдено или уже обработано.
+        """
+        return await self.update_status(session, Announcement, announcement_id, is_approved, moderator_id)
+
+    async def create_custom_request(self, session: AsyncSession, user_id: int, chat_id: int,
+                                    business_description: str, automation_task: str, budget: str) -> CustomRequest:
+        """
+        Создание новой заявки на индивидуальное решение.
+
+        Args:
+            session: Сессия базы данных.
+            user_id: ID пользователя.
+            chat_id: ID чата.
+            business_description: Описание бизнеса.
+            automation_task: Задача автоматизации.
+            budget: Бюджет.
+
+        Returns:
+            CustomRequest: Созданный объект заявки.
         """
-        announcement = self.get_announcement_by_id(session, announcement_id)
-        if announcement and announcement.is_approved is None:
-            announcement.is_approved = is_approved
-            announcement.moderator_id = moderator_id
-            return announcement
-        return None
+        custom_request = CustomRequest(
+            user_id=user_id,
+            chat_id=chat_id,
+            business_description=business_description,
+            automation_task=automation_task,
+            budget=budget
+        )
+        session.add(custom_request)
+        await session.flush()
+        return custom_request
 
-    def get_custom_request_by_id(self, session: Session, request_id: int) -> Optional[CustomRequest]:
+    async def get_custom_request_by_id(self, session: AsyncSession, request_id: int) -> Optional[CustomRequest]:
         """
         Получение заявки по ID.
 
@@ -186,10 +248,10 @@ class DatabaseMixin:
         Returns:
             Optional[CustomRequest]: Объект заявки или None, если не найдено.
         """
-        return session.query(CustomRequest).filter(CustomRequest.id == request_id).first()
+        return await session.get(CustomRequest, request_id)
 
-    def update_custom_request_status(self, session: Session, request_id: int,
-                                   is_approved: bool, moderator_id: int) -> Optional[CustomRequest]:
+    async def update_custom_request_status(self, session: AsyncSession, request_id: int,
+                                   is_approved: bool, moderator_id: int) -> Optional[Row]:
         """
         Обновление статуса заявки.
 
@@ -200,11 +262,6 @@ class DatabaseMixin:
             moderator_id: ID модератора.
 
         Returns:
-            Optional[CustomRequest]: Обновленный объект заявки или None, если не найдено.
-        """
-        custom_request = self.get_custom_request_by_id(session, request_id)
-        if custom_request and custom_request.is_approved is None:
-            custom_request.is_approved = is_approved
-            custom_request.moderator_id = moderator_id
-            return custom_request
-        return None
\ No newline at end of file
+            Optional[Row]: Строка обновленной заявки или None, если не найдена или уже обработана.
+        """
+        return await self.update_status(session, CustomRequest, request_id, is_approved, moderator_id)
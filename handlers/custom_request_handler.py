@@ -3,9 +3,9 @@ from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKe
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from .base import BaseHandler, DatabaseMixin
-from database.models import CustomRequest
 from config import Config
 from utils.messages import messages
+from utils.fanout import fan_out
 import logging
 
 logger = logging.getLogger(__name__)
@@ -274,38 +274,31 @@ class CustomRequestHandler(BaseHandler, DatabaseMixin):
         Returns:
             int: ID созданной заявки
         """
-        with self.get_db_session() as session:
-            try:
-                custom_request = CustomRequest(
-                    user_id=user_id,
-                    chat_id=chat_id,
-                    business_description=business_description,
-                    automation_task=automation_task,
-                    budget=budget
-                )
-                
-                session.add(custom_request)
-                session.commit()
-                
-                # Получаем ID созданной заявки
-                session.refresh(custom_request)
-                request_id = custom_request.id
-                
-                logger.info(f"Сохранена заявка от пользователя {user_id}, ID: {request_id}")
-                
-                # Отправляем уведомления модераторам
-                await self._notify_moderators_about_request(
-                    user_id, chat_id, business_description, 
-                    automation_task, budget, request_id, 
-                    custom_request.created_at, bot
-                )
-                
-                return request_id
-                
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Ошибка при сохранении заявки: {e}")
-                raise
+        try:
+            custom_request = await self.safe_db_operation(
+                self.create_custom_request,
+                user_id,
+                chat_id,
+                business_description,
+                automation_task,
+                budget
+            )
+            request_id = custom_request.id
+
+            logger.info(f"Сохранена заявка от пользователя {user_id}, ID: {request_id}")
+
+        except Exception as e:
+            logger.error(f"Ошибка при сохранении заявки: {e}")
+            raise
+
+        # Отправляем уведомления модераторам уже после коммита
+        await self._notify_moderators_about_request(
+            user_id, chat_id, business_description,
+            automation_task, budget, request_id,
+            custom_request.created_at, bot
+        )
+
+        return request_id
 
     async def _notify_moderators_about_request(self, user_id: int, chat_id: int,
                                              business_description: str, automation_task: str, 
@@ -351,19 +344,18 @@ class CustomRequestHandler(BaseHandler, DatabaseMixin):
                 ]
             ])
             
-            # Отправляем уведомления всем модераторам
-            for moderator_id in moderator_ids:
-                try:
-                    await bot.send_message(
-                        moderator_id,
-                        moderation_text,
-                        reply_markup=keyboard,
-                        parse_mode='HTML'
-                    )
-                except Exception as e:
-                    logger.error(f"Не удалось отправить уведомление модератору {moderator_id}: {e}")
-                    continue
-                    
+            # Отправляем уведомления всем модераторам параллельно
+            await fan_out(
+                moderator_ids,
+                lambda moderator_id: bot.send_message(
+                    moderator_id,
+                    moderation_text,
+                    reply_markup=keyboard,
+                    parse_mode='HTML'
+                ),
+                name='notify.new_request'
+            )
+
         except Exception as e:
             logger.error(f"Ошибка при уведомлении модераторов: {e}")
 
@@ -1,12 +1,18 @@
-from aiogram import F
+from aiogram import Bot, F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from .base import BaseHandler, DatabaseMixin
 from utils.messages import messages
+from utils.media import CAPTION_LIMIT, caption_length, send_attachments
 from config import Config
-from typing import List
+from typing import List, Optional
 from handlers.start_handler import StartHandler
+from services import AISearchService
+from services.catalog import catalog, after_commit, announcement_to_dict
+from services.short_descriptions import ShortDescriptionService
+from services.outbox import outbox, OutboxEntry
+import datetime
 import logging
 
 
@@ -22,9 +28,16 @@ class ModerationForm(StatesGroup):
 class ModerationHandler(BaseHandler, DatabaseMixin):
     """Обработчик модерации объявлений."""
 
-    def __init__(self):
-        """Инициализация обработчика модерации."""
+    def __init__(self, ai_search: AISearchService):
+        """
+        Инициализация обработчика модерации.
+
+        Args:
+            ai_search: Сервис AI-поиска (общий с поиском, для обращений к GPT)
+        """
         self.moderator_ids: List[int] = getattr(Config, 'MODERATOR_IDS')
+        self.short_descriptions = ShortDescriptionService(ai_search)
+        outbox.register('announcement.publish', self._deliver_publication)
         super().__init__()
 
     def setup_handlers(self):
@@ -53,7 +66,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             return
 
         try:
-            result = self.safe_db_operation(
+            result = await self.safe_db_operation(
                 self._approve_announcement_in_db,
                 announcement_id,
                 moderator_id
@@ -75,14 +88,11 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
 
             announcement = result
 
-            # Уведомление автора объявления
-            await self._notify_user_approval(callback.message, announcement)
+            # Короткое описание для списка результатов поиска генерируется один раз, в фоне
+            self.short_descriptions.schedule(announcement)
 
-            # Публикация объявления в чате
-            await self._publish_to_chat(callback.message, announcement)
-
-            # Уведомление других модераторов
-            await self._notify_other_moderators(callback, moderator_id, approved=True, announcement=announcement)
+            # Уведомление автора, публикация в чате и уведомление других модераторов
+            # уже записаны в outbox в транзакции одобрения и отправляются в фоне
 
             # Обновление сообщения модератора
             await self._update_moderator_message(callback, announcement, approved=True)
@@ -113,7 +123,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
 
         try:
             # Используем безопасную операцию с БД
-            announcement = self.safe_db_operation(
+            announcement = await self.safe_db_operation(
                 self._get_announcement_for_rejection,
                 announcement_id
             )
@@ -166,36 +176,22 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
                 # Обработка отклонения заявки
                 request_id = user_data['request_id']
                 
-                with self.get_db_session() as session:
-                    # Обновляем статус заявки
-                    custom_request = self.update_custom_request_status(session, request_id, False, moderator_id)
-
-                    if not custom_request:
-                        await message.answer(messages.get_message("moderation", "request", "not_found"))
-                        await state.clear()
-                        return
-
-                    # Преобразуем в словарь для удобства
-                    request_dict = {
-                        'id': custom_request.id,
-                        'user_id': custom_request.user_id,
-                        'chat_id': custom_request.chat_id,
-                        'business_description': custom_request.business_description,
-                        'automation_task': custom_request.automation_task,
-                        'budget': custom_request.budget,
-                        'created_at': custom_request.created_at
-                    }
-
-                    # Уведомляем пользователя об отклонении
-                await self._notify_user_request_rejection(message, request_dict, comment)
-
-                # Уведомляем других модераторов
-                await self._notify_other_moderators_request(
-                    type('CallbackQuery', (),
-                         {'message': message, 'from_user': type('User', (), {'id': moderator_id})})(),
-                    moderator_id, False, request_dict
+                # Обновляем статус заявки
+                request_dict = await self.safe_db_operation(
+                    self._update_custom_request_in_db,
+                    request_id,
+                    False,
+                    moderator_id,
+                    comment
                 )
 
+                if request_dict.get('already_processed'):
+                    await message.answer(messages.get_message("moderation", "request", "already_processed"))
+                    await state.clear()
+                    return
+
+                # Уведомления пользователя и других модераторов отправляются через outbox
+
                 await message.answer(
                     messages.get_message(
                         "moderation", "request", "rejected_confirmation",
@@ -210,7 +206,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
                 # Обработка отклонения объявления (существующий код)
                 announcement_id = user_data['announcement_id']
 
-                result = self.safe_db_operation(
+                result = await self.safe_db_operation(
                     self._reject_announcement_in_db,
                     announcement_id,
                     moderator_id,
@@ -235,11 +231,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
 
                 announcement = result
 
-                # Уведомляем пользователя
-                await self._notify_user_rejection(message, announcement, comment)
-
-                # Уведомляем других модераторов
-                await self._notify_other_moderators_rejection(message, moderator_id, comment, announcement)
+                # Уведомления пользователя и других модераторов отправляются через outbox
 
                 await message.answer(
                     messages.get_message('moderation', 'rejected_by_moderator',
@@ -293,7 +285,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             announcement_id = int(message.text)
 
             # Используем безопасную операцию с БД
-            announcement = self.safe_db_operation(
+            announcement = await self.safe_db_operation(
                 self._get_announcement_for_contact,
                 announcement_id
             )
@@ -363,7 +355,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         return getattr(Config, 'CHAT_ID'), getattr(Config, 'TOPIC_ID')
 
 
-    def _approve_announcement_in_db(self, session, announcement_id: int, moderator_id: int):
+    async def _approve_announcement_in_db(self, session, announcement_id: int, moderator_id: int):
         """
         Одобрение объявления в БД.
 
@@ -375,20 +367,16 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         Returns:
             Словарь с данными объявления или информацией об ошибке
         """
-        announcement = self.get_announcement_by_id(session, announcement_id)
-        if not announcement:
-            return None
-
-        if hasattr(announcement, 'is_processed') and announcement.is_processed:
-            return {'already_processed': True}
-        elif hasattr(announcement, 'moderator_id') and announcement.moderator_id is not None:
+        announcement = await self.update_announcement_status(session, announcement_id, True, moderator_id)
+        if announcement is None:
             return {'already_processed': True}
 
-        announcement.is_approved = True
-        announcement.moderator_id = moderator_id
+        # Добавляем объявление в каталог поиска, как только одобрение будет закоммичено
+        record = announcement_to_dict(announcement)
+        after_commit(session, lambda: catalog.upsert([record]))
 
         # Возвращаем данные объявления
-        return {
+        result = {
             'id': announcement.id,
             'chat_id': announcement.chat_id,
             'user_id': announcement.user_id,
@@ -399,11 +387,26 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             'launch_time': announcement.launch_time,
             'price': announcement.price,
             'complexity': announcement.complexity,
+            'demo_url': announcement.demo_url,
+            'documents': announcement.documents,
+            'videos': announcement.videos,
             'created_at': announcement.created_at
         }
 
+        # Отправки записываются в той же транзакции, что и одобрение
+        self._queue_user_approval(session, result)
+        self._queue_publication(session, result)
+        self._queue_moderators_notification(
+            session, moderator_id, f"announcement:{announcement_id}",
+            messages.get_message('moderation', 'approved_by_moderator',
+                                 moderator_id=moderator_id,
+                                 bot_name=result['bot_name'])
+        )
+
+        return result
 
-    def _reject_announcement_in_db(self, session, announcement_id: int, moderator_id: int, comment: str):
+
+    async def _reject_announcement_in_db(self, session, announcement_id: int, moderator_id: int, comment: str):
         """
         Отклонение объявления в БД.
 
@@ -411,26 +414,19 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             session: Сессия базы данных
             announcement_id: ID объявления
             moderator_id: ID модератора
-            comment: Комментарий модератора
+            comment: Комментарий модератора (не хранится в БД, передается автору)
 
         Returns:
             Словарь с данными объявления или информацией об ошибке
         """
-        announcement = self.get_announcement_by_id(session, announcement_id)
-        if not announcement:
-            return None
-
-        if hasattr(announcement, 'is_processed') and announcement.is_processed:
-            return {'already_processed': True}
-        elif hasattr(announcement, 'moderator_id') and announcement.moderator_id is not None:
+        announcement = await self.update_announcement_status(session, announcement_id, False, moderator_id)
+        if announcement is None:
             return {'already_processed': True}
 
-        announcement.is_approved = False
-        announcement.moderator_id = moderator_id
-        announcement.comment = comment
+        after_commit(session, lambda: catalog.remove([announcement_id]))
 
         # Возвращаем данные объявления
-        return {
+        result = {
             'id': announcement.id,
             'chat_id': announcement.chat_id,
             'bot_name': announcement.bot_name,
@@ -438,8 +434,21 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             'created_at': announcement.created_at
         }
 
+        # Отправки записываются в той же транзакции, что и отклонение
+        self._queue_user_rejection(session, result, comment)
+        self._queue_moderators_notification(
+            session, moderator_id, f"announcement:{announcement_id}",
+            messages.get_message('moderation', 'rejected_by_moderator',
+                                 announcement_id=announcement_id,
+                                 moderator_id=moderator_id,
+                                 comment=comment,
+                                 bot_name=result['bot_name'])
+        )
+
+        return result
+
 
-    def _get_announcement_for_rejection(self, session, announcement_id: int):
+    async def _get_announcement_for_rejection(self, session, announcement_id: int):
         """
         Получение объявления для отклонения.
 
@@ -450,7 +459,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         Returns:
             Словарь с данными объявления или None
         """
-        announcement = self.get_announcement_by_id(session, announcement_id)
+        announcement = await self.get_announcement_by_id(session, announcement_id)
         if not announcement:
             return None
 
@@ -465,7 +474,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         }
 
 
-    def _get_announcement_for_contact(self, session, announcement_id: int):
+    async def _get_announcement_for_contact(self, session, announcement_id: int):
         """
         Получение объявления для связи с пользователем.
 
@@ -476,7 +485,7 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         Returns:
             Словарь с данными объявления или None
         """
-        announcement = self.get_announcement_by_id(session, announcement_id)
+        announcement = await self.get_announcement_by_id(session, announcement_id)
         if not announcement:
             return None
 
@@ -489,113 +498,126 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         }
 
 
-    @staticmethod
-    async def _notify_user_approval(message: Message, announcement: dict):
+    async def _update_custom_request_in_db(self, session, request_id: int, is_approved: bool, moderator_id: int,
+                                           comment: Optional[str] = None):
         """
-        Уведомление пользователя об одобрении объявления.
+        Одобрение или отклонение заявки в БД.
 
         Args:
-            message: Объект сообщения
-            announcement: Словарь с данными объявления
+            session: Сессия базы данных
+            request_id: ID заявки
+            is_approved: Флаг одобрения
+            moderator_id: ID модератора
+            comment: Комментарий модератора при отклонении
+
+        Returns:
+            Словарь с данными заявки или информацией об ошибке
         """
-        try:
-            # Создаем клавиатуру с кнопкой "В меню"
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(
-                        text=messages.get_button_text('moderation', 'back_to_menu'),
-                        callback_data='main_menu'
-                    )]
-                ]
-            )
+        custom_request = await self.update_custom_request_status(session, request_id, is_approved, moderator_id)
+        if custom_request is None:
+            return {'already_processed': True}
 
-            # Отправляем уведомление с клавиатурой
-            await message.bot.send_message(
-                announcement['chat_id'],
-                messages.get_message('moderation', 'approval_notification', bot_name=announcement['bot_name']),
-                reply_markup=keyboard,
-                parse_mode='HTML'
-            )
+        request_dict = {
+            'id': custom_request.id,
+            'user_id': custom_request.user_id,
+            'chat_id': custom_request.chat_id,
+            'business_description': custom_request.business_description,
+            'automation_task': custom_request.automation_task,
+            'budget': custom_request.budget,
+            'created_at': custom_request.created_at
+        }
 
-        except Exception as e:
-            await message.answer(
-                messages.get_message('moderation', 'general_error', error=str(e)),
-                parse_mode='HTML'
+        # Отправки записываются в той же транзакции, что и решение по заявке
+        if is_approved:
+            self._queue_user_request_approval(session, request_dict)
+            self._queue_request_publication(session, request_dict)
+        else:
+            self._queue_user_request_rejection(session, request_dict, comment)
+        self._queue_moderators_notification(
+            session, moderator_id, f"request:{request_id}",
+            messages.get_message(
+                "moderation", "request", "moderator_notification",
+                status="✅ Одобрена" if is_approved else "❌ Отклонена",
+                request_id=request_id,
+                moderator_id=moderator_id,
+                business_description_short=request_dict['business_description'][:50] + "..."
             )
+        )
+
+        return request_dict
 
 
     @staticmethod
-    async def _notify_user_rejection(message: Message, announcement: dict, comment: str):
+    def _queue_user_approval(session, announcement: dict):
         """
-        Уведомление пользователя об отклонении.
+        Постановка в outbox уведомления автора об одобрении объявления.
 
         Args:
-            message: Объект сообщения
+            session: Сессия базы данных
             announcement: Словарь с данными объявления
-            comment: Комментарий модератора
         """
-        try:
-            await message.bot.send_message(
-                announcement['chat_id'],
-                messages.get_message('moderation', 'rejection_notification',
-                                   announcement_id=announcement.get('id'),
-                                   bot_name=announcement.get('bot_name'),
-                                   comment=comment),
-                parse_mode='HTML'
-            )
-        except Exception as e:
-            print(f"Не удалось уведомить пользователя об отклонении: {e}")
+        # Создаем клавиатуру с кнопкой "В меню"
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [InlineKeyboardButton(
+                    text=messages.get_button_text('moderation', 'back_to_menu'),
+                    callback_data='main_menu'
+                )]
+            ]
+        )
+
+        outbox.enqueue_message(
+            session,
+            announcement['chat_id'],
+            messages.get_message('moderation', 'approval_notification', bot_name=announcement['bot_name']),
+            reply_markup=keyboard,
+            dedup_key=f"announcement:{announcement['id']}:author",
+            parse_mode='HTML'
+        )
 
 
-    async def _notify_other_moderators(self, callback: CallbackQuery, moderator_id: int, approved: bool, announcement: dict):
+    @staticmethod
+    def _queue_user_rejection(session, announcement: dict, comment: str):
         """
-        Уведомление других модераторов.
+        Постановка в outbox уведомления автора об отклонении.
 
         Args:
-            callback: Объект обратного вызова
-            moderator_id: ID модератора
-            approved: Флаг одобрения
+            session: Сессия базы данных
             announcement: Словарь с данными объявления
+            comment: Комментарий модератора
         """
-        message_key = 'approved_by_moderator' if approved else 'rejected_by_moderator'
-
-        for mod_id in self.moderator_ids:
-            if mod_id != moderator_id:
-                try:
-                    await callback.message.bot.send_message(
-                        mod_id,
-                        messages.get_message('moderation', message_key,
-                                           moderator_id=moderator_id,
-                                           bot_name=announcement.get('bot_name')),
-                        parse_mode='HTML'
-                    )
-                except Exception:
-                    continue
+        outbox.enqueue_message(
+            session,
+            announcement['chat_id'],
+            messages.get_message('moderation', 'rejection_notification',
+                                 announcement_id=announcement.get('id'),
+                                 bot_name=announcement.get('bot_name'),
+                                 comment=comment),
+            dedup_key=f"announcement:{announcement['id']}:author",
+            parse_mode='HTML'
+        )
 
 
-    async def _notify_other_moderators_rejection(self, message: Message, moderator_id: int, comment: str, announcement: dict):
+    def _queue_moderators_notification(self, session, moderator_id: int, subject: str, text: str):
         """
-        Уведомление других модераторов об отклонении.
+        Постановка в outbox уведомлений остальным модераторам о принятом решении.
+
+        Каждому модератору - отдельная запись, чтобы ошибки и повторы
+        одного получателя не влияли на других.
 
         Args:
-            message: Объект сообщения
-            moderator_id: ID модератора
-            comment: Комментарий модератора
-            announcement: Словарь с данными объявления
+            session: Сессия базы данных
+            moderator_id: ID модератора, принявшего решение
+            subject: Объект решения для ключа дедупликации (announcement:ID, request:ID)
+            text: Текст уведомления
         """
-        for mod_id in self.moderator_ids:
+        for mod_id in dict.fromkeys(self.moderator_ids):
             if mod_id != moderator_id:
-                try:
-                    await message.bot.send_message(
-                        mod_id,
-                        messages.get_message('moderation', 'rejected_by_moderator',
-                                           moderator_id=moderator_id,
-                                           comment=comment,
-                                           bot_name=announcement['bot_name']),
-                        parse_mode='HTML'
-                    )
-                except Exception:
-                    continue
+                outbox.enqueue_message(
+                    session, mod_id, text,
+                    dedup_key=f"{subject}:moderator:{mod_id}",
+                    parse_mode='HTML'
+                )
 
 
     async def _update_moderator_message(self, callback: CallbackQuery, announcement: dict, approved: bool):
@@ -643,14 +665,41 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
         )
 
 
-    async def _publish_to_chat(self, message: Message, announcement: dict):
+    @staticmethod
+    def _queue_publication(session, announcement: dict):
+        """
+        Постановка в outbox публикации объявления в чате.
+
+        Args:
+            session: Сессия базы данных
+            announcement: Словарь с данными объявления
+        """
+        payload = dict(announcement, created_at=announcement['created_at'].isoformat())
+        outbox.enqueue(session, 'announcement.publish', payload, dedup_key=f"announcement:{announcement['id']}:publish")
+
+
+    async def _deliver_publication(self, bot: Bot, entry: OutboxEntry):
+        """
+        Обработчик outbox: публикация объявления в чате.
+
+        Args:
+            bot: Объект бота
+            entry: Запись outbox
+        """
+        announcement = dict(entry.payload, created_at=datetime.datetime.fromisoformat(entry.payload['created_at']))
+        await self._publish_to_chat(bot, announcement, entry)
+
+
+    async def _publish_to_chat(self, bot: Bot, announcement: dict, entry: Optional[OutboxEntry] = None):
         """
         Публикация объявления в чате.
 
         Args:
-            message: Объект сообщения
+            bot: Объект бота
             announcement: Словарь с данными объявления
+            entry: Запись outbox, в progress которой отмечаются выполненные шаги
         """
+        progress = entry.progress if entry else {}
         try:
             # Получаем ID чата и топика
             chat_id = getattr(Config, 'CHAT_ID')
@@ -693,53 +742,49 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
                 ]
             )
 
-            # Публикуем текст объявления
-            sent_message = await message.bot.send_message(
-                chat_id=chat_id,
-                text=chat_announcement_text,
-                parse_mode='HTML',
-                reply_markup=keyboard,
-                message_thread_id=thread_id
-            )
-
-            # Если есть файлы, отправляем их
-            if announcement.get('documents'):
-                for doc in announcement['documents']:
-                    try:
-                        await message.bot.send_document(
-                            chat_id=chat_id,
-                            document=doc['file_id'],
-                            reply_to_message_id=sent_message.message_id,
-                            message_thread_id=thread_id
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending document: {str(e)}")
-
-            # Если есть видео, отправляем их
-            if announcement.get('videos'):
-                for video in announcement['videos']:
-                    try:
-                        await message.bot.send_video(
-                            chat_id=chat_id,
-                            video=video['file_id'],
-                            reply_to_message_id=sent_message.message_id,
-                            message_thread_id=thread_id
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending video: {str(e)}")
-
-            # Если есть демо-ссылка, отправляем её
-            if announcement.get('demo_url'):
-                try:
-                    await message.bot.send_message(
-                        chat_id=chat_id,
-                        text=f"🌐 <b>Демо-версия:</b>\n{announcement['demo_url']}",
-                        parse_mode='HTML',
-                        reply_to_message_id=sent_message.message_id,
-                        message_thread_id=thread_id
-                    )
-                except Exception as e:
-                    logger.error(f"Error sending demo URL: {str(e)}")
+            demo_text = f"🌐 <b>Демо-версия:</b>\n{announcement['demo_url']}" if announcement.get('demo_url') else None
+            has_attachments = bool(announcement.get('documents') or announcement.get('videos'))
+
+            # Ссылка на демо идет в подпись к альбому, а без вложений или если подпись
+            # превысит CAPTION_LIMIT (Telegram отклонит файлы) - в текст объявления
+            caption = demo_text if has_attachments else None
+            if caption and caption_length(caption) > CAPTION_LIMIT:
+                caption = None
+            if demo_text and not caption:
+                chat_announcement_text += f"\n\n{demo_text}"
+
+            # Публикуем текст объявления (при повторе из outbox - только если он еще не опубликован)
+            if 'message_id' not in progress:
+                sent_message = await bot.send_message(
+                    chat_id=chat_id,
+                    text=chat_announcement_text,
+                    parse_mode='HTML',
+                    reply_markup=keyboard,
+                    message_thread_id=thread_id
+                )
+                progress['message_id'] = sent_message.message_id
+                if entry:
+                    await entry.checkpoint()
+
+            # Файлы отправляем альбомами: документы и видео отдельно, до 10 в альбоме.
+            # Каждый отправленный альбом отмечается, чтобы повтор из outbox не дублировал их
+            async def album_delivered(count: int):
+                progress['albums'] = count
+                if entry:
+                    await entry.checkpoint()
+
+            if has_attachments:
+                await send_attachments(
+                    bot,
+                    chat_id,
+                    announcement.get('documents'),
+                    announcement.get('videos'),
+                    caption=caption,
+                    delivered=progress.get('albums', 0),
+                    on_delivered=album_delivered,
+                    reply_to_message_id=progress['message_id'],
+                    message_thread_id=thread_id
+                )
 
         except Exception as e:
             logger.error(f"Ошибка публикации объявления в чат: {str(e)}")
@@ -759,43 +804,30 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             await callback.answer(messages.get_message("moderation", "request", "no_permissions"))
             return
 
-        with self.get_db_session() as session:
-            try:
-                # Обновляем статус заявки
-                custom_request = self.update_custom_request_status(session, request_id, True, moderator_id)
-                
-                if not custom_request:
-                    await callback.answer(messages.get_message("moderation", "request", "not_found"))
-                    return
-
-                # Преобразуем в словарь для удобства
-                request_dict = {
-                    'id': custom_request.id,
-                    'user_id': custom_request.user_id,
-                    'chat_id': custom_request.chat_id,
-                    'business_description': custom_request.business_description,
-                    'automation_task': custom_request.automation_task,
-                    'budget': custom_request.budget,
-                    'created_at': custom_request.created_at
-                }
-
-                # Обновляем сообщение модератора
-                await self._update_moderator_message_request(callback, request_dict, True)
+        try:
+            # Обновляем статус заявки
+            request_dict = await self.safe_db_operation(
+                self._update_custom_request_in_db,
+                request_id,
+                True,
+                moderator_id
+            )
 
-                # Уведомляем пользователя об одобрении
-                await self._notify_user_request_approval(callback.message, request_dict)
+            if request_dict.get('already_processed'):
+                await callback.answer(messages.get_message("moderation", "request", "already_processed"))
+                return
 
-                # Уведомляем других модераторов
-                await self._notify_other_moderators_request(callback, moderator_id, True, request_dict)
+            # Обновляем сообщение модератора
+            await self._update_moderator_message_request(callback, request_dict, True)
 
-                # Публикуем в группу
-                await self._publish_approved_request_to_group(callback.bot, request_dict)
+            # Уведомление пользователя, других модераторов и публикация в группе
+            # записаны в outbox в транзакции одобрения и отправляются в фоне
 
-                await callback.answer(messages.get_message("moderation", "request", "approval_success"))
+            await callback.answer(messages.get_message("moderation", "request", "approval_success"))
 
-            except Exception as e:
-                logger.error(f"Ошибка при одобрении заявки: {e}")
-                await callback.answer(messages.get_message("moderation", "request", "approval_error"))
+        except Exception as e:
+            logger.error(f"Ошибка при одобрении заявки: {e}")
+            await callback.answer(messages.get_message("moderation", "request", "approval_error"))
 
     async def reject_custom_request(self, callback: CallbackQuery, state: FSMContext):
         """
@@ -813,12 +845,12 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
             return
 
         try:
-            with self.get_db_session() as session:
-                custom_request = self.get_custom_request_by_id(session, request_id)
-                
-                if not custom_request or custom_request.is_approved is not None:
-                    await callback.answer(messages.get_message("moderation", "request", "not_found"))
-                    return
+            async with self.get_db_session() as session:
+                custom_request = await self.get_custom_request_by_id(session, request_id)
+
+            if not custom_request or custom_request.is_approved is not None:
+                await callback.answer(messages.get_message("moderation", "request", "not_found"))
+                return
 
             await callback.message.edit_text(
                 messages.get_message("moderation", "request", "rejection_prompt"),
@@ -862,120 +894,86 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
                 ])
             )
 
-    async def _notify_user_request_approval(self, message: Message, request_dict: dict):
+    @staticmethod
+    def _queue_user_request_approval(session, request_dict: dict):
         """
-        Уведомление пользователя об одобрении заявки.
+        Постановка в outbox уведомления пользователя об одобрении заявки.
 
         Args:
-            message: Объект сообщения
+            session: Сессия базы данных
             request_dict: Словарь с данными заявки
         """
-        try:
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(
-                        text=messages.get_message("moderation", "request", "buttons", "main_menu"),
-                        callback_data='main_menu'
-                    )]
-                ]
-            )
-
-            business_short = request_dict['business_description'][:100] + ('...' if len(request_dict['business_description']) > 100 else '')
-            task_short = request_dict['automation_task'][:100] + ('...' if len(request_dict['automation_task']) > 100 else '')
-
-            await message.bot.send_message(
-                request_dict['chat_id'],
-                messages.get_message(
-                    "moderation", "request", "user_approval",
-                    request_id=request_dict['id'],
-                    business_description_short=business_short,
-                    automation_task_short=task_short
-                ),
-                reply_markup=keyboard,
-                parse_mode='HTML'
-            )
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [InlineKeyboardButton(
+                    text=messages.get_message("moderation", "request", "buttons", "main_menu"),
+                    callback_data='main_menu'
+                )]
+            ]
+        )
 
-        except Exception as e:
-            logger.error(f"Ошибка при уведомлении пользователя об одобрении заявки: {e}")
+        business_short = request_dict['business_description'][:100] + ('...' if len(request_dict['business_description']) > 100 else '')
+        task_short = request_dict['automation_task'][:100] + ('...' if len(request_dict['automation_task']) > 100 else '')
+
+        outbox.enqueue_message(
+            session,
+            request_dict['chat_id'],
+            messages.get_message(
+                "moderation", "request", "user_approval",
+                request_id=request_dict['id'],
+                business_description_short=business_short,
+                automation_task_short=task_short
+            ),
+            reply_markup=keyboard,
+            dedup_key=f"request:{request_dict['id']}:author",
+            parse_mode='HTML'
+        )
 
-    async def _notify_user_request_rejection(self, message: Message, request_dict: dict, comment: str):
+    @staticmethod
+    def _queue_user_request_rejection(session, request_dict: dict, comment: str):
         """
-        Уведомление пользователя об отклонении заявки.
+        Постановка в outbox уведомления пользователя об отклонении заявки.
 
         Args:
-            message: Объект сообщения
+            session: Сессия базы данных
             request_dict: Словарь с данными заявки
             comment: Комментарий модератора
         """
-        try:
-            business_short = request_dict['business_description'][:100] + ('...' if len(request_dict['business_description']) > 100 else '')
-            task_short = request_dict['automation_task'][:100] + ('...' if len(request_dict['automation_task']) > 100 else '')
-
-            await message.bot.send_message(
-                request_dict['chat_id'],
-                messages.get_message(
-                    "moderation", "request", "user_rejection",
-                    request_id=request_dict['id'],
-                    business_description_short=business_short,
-                    automation_task_short=task_short,
-                    comment=comment
-                ),
-                parse_mode='HTML'
-            )
-        except Exception as e:
-            logger.error(f"Ошибка при уведомлении пользователя об отклонении заявки: {e}")
-
-    async def _notify_other_moderators_request(self, callback: CallbackQuery, moderator_id: int, approved: bool,
-                                               request_dict: dict):
-        """
-        Уведомление других модераторов о решении по заявке.
-
-        Args:
-            callback: Объект обратного вызова
-            moderator_id: ID модератора
-            approved: Флаг одобрения
-            request_dict: Словарь с данными заявки
-        """
-        status = "✅ Одобрена" if approved else "❌ Отклонена"
-        business_short = request_dict['business_description'][:50] + "..."
-
-        message_text = messages.get_message(
-            "moderation", "request", "moderator_notification",
-            status=status,
-            request_id=request_dict['id'],
-            moderator_id=moderator_id,
-            business_description_short=business_short
+        business_short = request_dict['business_description'][:100] + ('...' if len(request_dict['business_description']) > 100 else '')
+        task_short = request_dict['automation_task'][:100] + ('...' if len(request_dict['automation_task']) > 100 else '')
+
+        outbox.enqueue_message(
+            session,
+            request_dict['chat_id'],
+            messages.get_message(
+                "moderation", "request", "user_rejection",
+                request_id=request_dict['id'],
+                business_description_short=business_short,
+                automation_task_short=task_short,
+                comment=comment
+            ),
+            dedup_key=f"request:{request_dict['id']}:author",
+            parse_mode='HTML'
         )
 
-        for mod_id in self.moderator_ids:
-            if mod_id != moderator_id:
-                try:
-                    await callback.message.bot.send_message(
-                        mod_id,
-                        message_text,
-                        parse_mode='HTML'
-                    )
-                except Exception:
-                    continue
-
-    async def _publish_approved_request_to_group(self, bot, request_dict: dict):
+    @staticmethod
+    def _queue_request_publication(session, request_dict: dict):
         """
-        Публикация одобренной заявки в группу.
+        Постановка в outbox публикации одобренной заявки в группе.
 
         Args:
-            bot: Объект бота
+            session: Сессия базы данных
             request_dict: Словарь с данными заявки
         """
-        try:
-            # Получаем ID чата и топика
-            chat_id = getattr(Config, 'CHAT_ID')
-            thread_id = getattr(Config, 'TOPIC_ID_CUSTOM')
-            
-            if not chat_id:
-                raise ValueError("CHAT_ID не указан в конфигурации")
+        # Получаем ID чата и топика
+        chat_id = getattr(Config, 'CHAT_ID')
+        thread_id = getattr(Config, 'TOPIC_ID_CUSTOM')
 
-            # Формируем красивое объявление для публикации в чате
-            chat_announcement_text = f"""🤖 <b>Заявка на индивидуальное решение</b>
+        if not chat_id:
+            raise ValueError("CHAT_ID не указан в конфигурации")
+
+        # Формируем красивое объявление для публикации в чате
+        chat_announcement_text = f"""🤖 <b>Заявка на индивидуальное решение</b>
 
 ⚡ <b>Описание бизнеса:</b>
 {request_dict['business_description']}
@@ -989,25 +987,22 @@ class ModerationHandler(BaseHandler, DatabaseMixin):
 📅 <b>Дата создания:</b>
 {request_dict['created_at'].strftime('%d.%m.%Y')}"""
 
-            # Создаем клавиатуру с кнопкой "Связаться с автором"
-            keyboard = InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [InlineKeyboardButton(
-                        text="💬 Связаться с автором",
-                        url=f"tg://user?id={request_dict['user_id']}"
-                    )]
-                ]
-            )
-
-            # Публикуем текст объявления
-            await bot.send_message(
-                chat_id=chat_id,
-                text=chat_announcement_text,
-                parse_mode='HTML',
-                reply_markup=keyboard,
-                message_thread_id=thread_id
-            )
+        # Создаем клавиатуру с кнопкой "Связаться с автором"
+        keyboard = InlineKeyboardMarkup(
+            inline_keyboard=[
+                [InlineKeyboardButton(
+                    text="💬 Связаться с автором",
+                    url=f"tg://user?id={request_dict['user_id']}"
+                )]
+            ]
+        )
 
-        except Exception as e:
-            logger.error(f"Ошибка публикации заявки в группу: {str(e)}")
-            raise
+        outbox.enqueue_message(
+            session,
+            chat_id,
+            chat_announcement_text,
+            reply_markup=keyboard,
+            dedup_key=f"request:{request_dict['id']}:publish",
+            parse_mode='HTML',
+            message_thread_id=thread_id
+        )
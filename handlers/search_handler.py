@@ -1,12 +1,22 @@
+import asyncio
+import logging
+import time
 from aiogram import F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from .base import BaseHandler, DatabaseMixin
+from sqlalchemy import select
 from database.models import Announcement
 from services import AISearchService
-from utils import messages
-from typing import List
+from services.catalog import catalog, load_details, DETAIL_COLUMNS, SUMMARY_COLUMNS
+from services.search_backends import result_ids
+from config import Config
+from utils import messages, metrics
+from typing import Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
 
 
 class SearchForm(StatesGroup):
@@ -17,15 +27,21 @@ class SearchForm(StatesGroup):
 class SearchHandler(BaseHandler, DatabaseMixin):
     """Обработчик умного поиска AI-решений."""
 
-    def __init__(self):
-        """Инициализация обработчика поиска."""
+    def __init__(self, ai_search: AISearchService):
+        """
+        Инициализация обработчика поиска.
+
+        Args:
+            ai_search: Сервис AI-поиска
+        """
         super().__init__()
-        self.ai_search = AISearchService()
+        self.ai_search = ai_search
 
     def setup_handlers(self):
         """Настройка обработчиков."""
         self.router.callback_query(F.data == 'search_announcements')(self.start_search)
-        self.router.message(SearchForm.search_query)(self.process_search_query)
+        # Каждый запрос - обращение к GPT, поэтому у поиска отдельное, более строгое ограничение частоты
+        self.router.message(SearchForm.search_query, flags={'throttling': 'search'})(self.process_search_query)
         # Обработчик для выбора конкретного решения
         self.router.callback_query(F.data.startswith('view_solution_'))(self.view_solution_details)
         # Обработчик для возврата к поиску
@@ -87,59 +103,160 @@ class SearchHandler(BaseHandler, DatabaseMixin):
             # Показываем индикатор обработки
             processing_msg = await message.answer('🤖 Анализирую ваш запрос...')
 
-            # Получаем все одобренные объявления
-            all_announcements = self.safe_db_operation(
-                self._get_all_approved_announcements
-            )
+            # Каталог читаем из снимка в памяти, без обращения к БД
+            snapshot = catalog.snapshot
 
-            if not all_announcements:
+            if not snapshot.announcements:
                 await processing_msg.edit_text(
                     '😔 В базе пока нет одобренных AI-решений'
                 )
                 await state.clear()
                 return
 
-            # Используем AI для умного поиска
-            search_result = await self.ai_search.smart_search(search_query, all_announcements)
+            started = time.perf_counter()
 
-            # Обновляем сообщение с результатами поиска
-            if not search_result['found']:
-                # Если ничего не найдено - предлагаем перейти в чат или оставить заявку
-                no_results_text = messages.get_message('search', 'no_results')
+            await self._two_phase_search(processing_msg, search_query, snapshot, state, started)
 
-                # Добавляем кнопки перехода в чат и заявки
-                keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                    [InlineKeyboardButton(
-                        text=messages.get_message('search', 'buttons', 'go_to_chat'),
-                        url=self.get_chat_url()
-                    )],
-                    [InlineKeyboardButton(
-                        text=messages.get_message('search', 'buttons', 'custom_request'),
-                        callback_data='custom_request'
-                    )]
-                ])
+        except Exception as e:
+            await message.answer(
+                messages.get_message('search', 'search_error', error=str(e))
+            )
 
-                await message.answer(
-                    no_results_text,
-                    reply_markup=keyboard,
-                    parse_mode='HTML'
-                )
-            else:
-                results = search_result['results']
 
-                if len(results) == 1:
-                    # Если найдено одно объявление - показываем его полностью
-                    await self._show_full_announcement(message, results[0])
-                else:
-                    # Если найдено много - показываем список с кнопками
-                    await self._show_announcements_list(message, results)
+    async def _two_phase_search(self, processing_msg: Message, search_query: str, snapshot,
+                                state: FSMContext, started: float):
+        """
+        Поиск в два этапа: быстрый локальный результат, затем уточнение GPT.
 
-            await state.clear()
+        GPT-поиск и локальный поиск запускаются одновременно. Если GPT не успел
+        за SEARCH_FIRST_RESULT_DEADLINE от начала обработки, в сообщение выводится
+        результат локального индекса, а ответ GPT, пришедший до SEARCH_FINAL_DEADLINE,
+        заменяет его на месте, только если отличается и пользователь не ушел
+        с результатов поиска. Повторный запрос smart_search отдает из кеша, и он
+        выводится сразу.
 
-        except Exception as e:
-            await message.answer(
-                messages.get_message('search', 'search_error', error=str(e))
+        Args:
+            processing_msg: Сообщение-индикатор, в которое выводятся результаты
+            search_query: Запрос пользователя
+            snapshot: Снимок каталога
+            state: Контекст состояния FSM
+            started: Время начала обработки (time.perf_counter)
+        """
+        # Поиск через GPT продолжается независимо от ожидания ниже,
+        # поэтому даже опоздавший ответ попадет в кеш для следующих запросов
+        gpt_task = asyncio.ensure_future(
+            self.ai_search.smart_search(search_query, snapshot.announcements, snapshot.version)
+        )
+        local_task = asyncio.ensure_future(
+            self.ai_search.local_search(search_query, snapshot.announcements, snapshot.version)
+        )
+        # Локальный поиск может остаться неожиданным, если GPT ответил первым
+        local_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        # Сроки отсчитываются от начала обработки: медленный локальный поиск
+        # (перестроение индекса после смены каталога) их не сдвигает
+        first_deadline = started + Config.SEARCH_FIRST_RESULT_DEADLINE
+        final_deadline = started + Config.SEARCH_FINAL_DEADLINE
+        await asyncio.wait({gpt_task}, timeout=max(0.0, first_deadline - time.perf_counter()))
+
+        shown = None
+        if not gpt_task.done():
+            # GPT не успел к первому сроку: выводим локальный результат, как только он готов
+            await asyncio.wait(
+                {gpt_task, local_task}, timeout=max(0.0, final_deadline - time.perf_counter()),
+                return_when=asyncio.FIRST_COMPLETED
             )
+            # Пустой локальный результат не показываем: ждем GPT под индикатором
+            if not gpt_task.done() and local_task.done() and not local_task.exception() \
+                    and local_task.result()['found']:
+                shown = local_task.result()
+                await self._render_search_result(processing_msg, shown)
+                metrics.observe('search.ttfr_ms', (time.perf_counter() - started) * 1000)
+                await state.clear()
+                # Отметка, что сообщение все еще показывает результаты этого поиска
+                await state.update_data(search_result_message_id=processing_msg.message_id)
+
+        final_result = None
+        try:
+            final_result = await asyncio.wait_for(
+                asyncio.shield(gpt_task), timeout=max(0.0, final_deadline - time.perf_counter())
+            )
+        except asyncio.TimeoutError:
+            metrics.increment('search.final_deadline_missed')
+        except Exception as e:
+            logger.error(f"Ошибка умного поиска: {e}")
+
+        if shown is None:
+            # Итоговый результат GPT, а если GPT не ответил или ответил ошибкой - локальный
+            await self._render_search_result(processing_msg, final_result or await local_task)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.observe('search.ttfr_ms', elapsed_ms)
+            metrics.observe('search.ttfinal_ms', elapsed_ms)
+            await state.clear()
+            return
+
+        if await self._showing_result(state, processing_msg):
+            if final_result is not None and result_ids(final_result) != result_ids(shown):
+                await self._render_search_result(processing_msg, final_result)
+                metrics.increment('search.upgraded')
+            await state.clear()
+        metrics.observe('search.ttfinal_ms', (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    async def _showing_result(state: FSMContext, processing_msg: Message) -> bool:
+        """
+        Показывает ли сообщение все еще результаты поиска.
+
+        Переход к новому поиску, заявке или в меню меняет состояние FSM
+        или очищает его данные вместе с отметкой.
+
+        Args:
+            state: Контекст состояния FSM
+            processing_msg: Сообщение с результатами поиска
+
+        Returns:
+            True, если пользователь не ушел с результатов поиска
+        """
+        if await state.get_state() is not None:
+            return False
+        data = await state.get_data()
+        return data.get('search_result_message_id') == processing_msg.message_id
+
+    async def _render_search_result(self, processing_msg: Message, search_result: Dict):
+        """
+        Вывод результата поиска в сообщение-индикатор.
+
+        Args:
+            processing_msg: Сообщение, которое заменяется результатом
+            search_result: Результат поиска
+        """
+        if not search_result['found']:
+            # Если ничего не найдено - предлагаем перейти в чат или оставить заявку
+            text = messages.get_message('search', 'no_results')
+            reply_markup = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(
+                    text=messages.get_message('search', 'buttons', 'go_to_chat'),
+                    url=self.get_chat_url()
+                )],
+                [InlineKeyboardButton(
+                    text=messages.get_message('search', 'buttons', 'custom_request'),
+                    callback_data='custom_request'
+                )]
+            ])
+        elif len(search_result['results']) == 1:
+            # Если найдено одно объявление - показываем его полностью (длинные поля читаются из БД)
+            announcement = search_result['results'][0]
+            try:
+                full = await self.safe_db_operation(self._get_full_announcement_by_id, announcement['id'])
+            except Exception as e:
+                logger.error(f"Не удалось загрузить объявление {announcement['id']}: {e}")
+                full = None
+            text, reply_markup = self._format_full_announcement(full or announcement)
+        else:
+            # Если найдено много - показываем список с кнопками
+            text, reply_markup = self._format_announcements_list(search_result['results'])
+
+        await processing_msg.edit_text(text, reply_markup=reply_markup, parse_mode='HTML')
 
 
     async def view_solution_details(self, callback: CallbackQuery):
@@ -152,8 +269,8 @@ class SearchHandler(BaseHandler, DatabaseMixin):
         try:
             solution_id = int(callback.data.split('_')[-1])
 
-            # Получаем полную информацию о решении из БД
-            announcement_data = self.safe_db_operation(
+            # Каталог в памяти не хранит длинные поля карточки, читаем объявление по ID
+            announcement_data = await self.safe_db_operation(
                 self._get_full_announcement_by_id, solution_id
             )
 
@@ -201,51 +318,65 @@ class SearchHandler(BaseHandler, DatabaseMixin):
             )
 
 
-    async def _show_full_announcement(self, message: Message, announcement: dict):
+    @staticmethod
+    def _format_full_announcement(announcement: dict) -> Tuple[str, InlineKeyboardMarkup]:
         """
-        Показать полное объявление.
+        Текст и клавиатура полного объявления.
 
         Args:
-            message: Объект сообщения
             announcement: Словарь с данными объявления
+
+        Returns:
+            Кортеж (текст в HTML, клавиатура)
         """
-        try:
-            # Форматируем полную информацию об объявлении
-            full_text = (
-                f"🤖 <b>{announcement['bot_name']}</b>\n\n"
-                f"⚡ <b>Проблема:</b>\n{announcement['task_solution']}\n\n"
-            )
+        # Форматируем полную информацию об объявлении
+        full_text = (
+            f"🤖 <b>{announcement['bot_name']}</b>\n\n"
+            f"⚡ <b>Проблема:</b>\n{announcement['task_solution']}\n\n"
+        )
 
-            # Добавляем дополнительные поля если они есть
-            if announcement.get('included_features'):
-                full_text += f"📦 <b>Включено:</b>\n{announcement['included_features']}\n\n"
+        # Добавляем дополнительные поля если они есть
+        if announcement.get('included_features'):
+            full_text += f"📦 <b>Включено:</b>\n{announcement['included_features']}\n\n"
 
-            if announcement.get('client_requirements'):
-                full_text += f"📋 <b>Требования к клиенту:</b>\n{announcement['client_requirements']}\n\n"
+        if announcement.get('client_requirements'):
+            full_text += f"📋 <b>Требования к клиенту:</b>\n{announcement['client_requirements']}\n\n"
 
-            if announcement.get('launch_time'):
-                full_text += f"⏱️ <b>Срок запуска:</b> {announcement['launch_time']}\n\n"
+        if announcement.get('launch_time'):
+            full_text += f"⏱️ <b>Срок запуска:</b> {announcement['launch_time']}\n\n"
 
-            if announcement.get('price'):
-                full_text += f"💰 <b>Цена:</b> {announcement['price']}\n\n"
+        if announcement.get('price'):
+            full_text += f"💰 <b>Цена:</b> {announcement['price']}\n\n"
 
-            if announcement.get('complexity'):
-                full_text += f"📊 <b>Сложность:</b> {announcement['complexity']}\n\n"
+        if announcement.get('complexity'):
+            full_text += f"📊 <b>Сложность:</b> {announcement['complexity']}\n\n"
 
-            full_text += f"📅 <b>Создано:</b> {announcement['created_at'].strftime('%d.%m.%Y')}"
+        full_text += f"📅 <b>Создано:</b> {announcement['created_at'].strftime('%d.%m.%Y')}"
+
+        # Создаем кнопки для связи с автором и возврата к поиску
+        contact_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(
+                text=messages.get_message('search', 'buttons', 'contact_author'),
+                url=f"tg://user?id={announcement['user_id']}"
+            )],
+            [InlineKeyboardButton(
+                text=messages.get_message('search', 'buttons', 'back_search'),
+                callback_data='back_search'
+            )]
+        ])
+        return full_text, contact_keyboard
 
-            # Создаем кнопки для связи с автором и возврата к поиску
-            contact_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-                [InlineKeyboardButton(
-                    text=messages.get_message('search', 'buttons', 'contact_author'),
-                    url=f"tg://user?id={announcement['user_id']}"
-                )],
-                [InlineKeyboardButton(
-                    text=messages.get_message('search', 'buttons', 'back_search'),
-                    callback_data='back_search'
-                )]
-            ])
 
+    async def _show_full_announcement(self, message: Message, announcement: dict):
+        """
+        Показать полное объявление.
+
+        Args:
+            message: Объект сообщения
+            announcement: Словарь с данными объявления
+        """
+        try:
+            full_text, contact_keyboard = self._format_full_announcement(announcement)
             await message.answer(
                 full_text,
                 reply_markup=contact_keyboard,
@@ -258,63 +389,48 @@ class SearchHandler(BaseHandler, DatabaseMixin):
             )
 
 
-    async def _show_announcements_list(self, message: Message, announcements: List[dict]):
+    @staticmethod
+    def _format_announcements_list(announcements: List[dict]) -> Tuple[str, InlineKeyboardMarkup]:
         """
-        Показать список объявлений одним сообщением с кнопками.
+        Текст и клавиатура списка найденных объявлений.
 
         Args:
-            message: Объект сообщения
             announcements: Список объявлений
+
+        Returns:
+            Кортеж (текст в HTML, клавиатура с кнопкой на каждое объявление)
         """
-        try:
-            # Формируем текст списка
-            list_text = "📋 <b>Найденные AI-решения:</b>\n\n"
-
-            # Создаем кнопки для каждого объявления
-            keyboard = []
-
-            for i, announcement in enumerate(announcements[:10], 1):  # Максимум 10 результатов
-                # Получаем короткое описание
-                if self.ai_search.client:  # Если есть доступ к OpenAI API
-                    short_desc = await self.ai_search.create_short_descriptions([announcement])
-                    short_desc = short_desc.get(str(announcement['id']), announcement['task_solution'][:50] + '...')
-                else:
-                    short_desc = announcement['task_solution'][:50] + '...'
-
-                # Добавляем в текст списка
-                list_text += f"{i}. <b>{announcement['bot_name']}</b>\n"
-                list_text += f"   {short_desc}\n\n"
-
-                # Добавляем кнопку для этого объявления
-                keyboard.append([
-                    InlineKeyboardButton(
-                        text=f"{i}. {announcement['bot_name']}",
-                        callback_data=f"view_solution_{announcement['id']}"
-                    )
-                ])
+        # Формируем текст списка
+        list_text = "📋 <b>Найденные AI-решения:</b>\n\n"
+
+        # Создаем кнопки для каждого объявления
+        keyboard = []
+
+        for i, announcement in enumerate(announcements[:10], 1):  # Максимум 10 результатов
+            # Короткое описание генерируется при одобрении и хранится в БД
+            short_desc = announcement.get('short_description') or announcement['task_solution'][:50] + '...'
+
+            # Добавляем в текст списка
+            list_text += f"{i}. <b>{announcement['bot_name']}</b>\n"
+            list_text += f"   {short_desc}\n\n"
 
-            # Добавляем кнопку возврата к поиску
+            # Добавляем кнопку для этого объявления
             keyboard.append([
                 InlineKeyboardButton(
-                    text=messages.get_message('search', 'buttons', 'back_search'),
-                    callback_data='back_search'
+                    text=f"{i}. {announcement['bot_name']}",
+                    callback_data=f"view_solution_{announcement['id']}"
                 )
             ])
 
-            # Создаем клавиатуру
-            reply_markup = InlineKeyboardMarkup(inline_keyboard=keyboard)
-
-            # Отправляем одно сообщение со списком и кнопками
-            await message.answer(
-                list_text,
-                reply_markup=reply_markup,
-                parse_mode='HTML'
+        # Добавляем кнопку возврата к поиску
+        keyboard.append([
+            InlineKeyboardButton(
+                text=messages.get_message('search', 'buttons', 'back_search'),
+                callback_data='back_search'
             )
+        ])
 
-        except Exception as e:
-            await message.answer(
-                messages.get_message('search', 'search_error', error=str(e))
-            )
+        return list_text, InlineKeyboardMarkup(inline_keyboard=keyboard)
 
 
     @staticmethod
@@ -356,74 +472,34 @@ class SearchHandler(BaseHandler, DatabaseMixin):
         Returns:
             URL чата
         """
-        from config import Config
         return Config.CHAT_URL
 
 
     @staticmethod
-    def _get_all_approved_announcements(session):
+    async def _get_full_announcement_by_id(session, announcement_id: int):
         """
-        Получение всех одобренных объявлений для AI поиска.
-        
-        Args:
-            session: Сессия базы данных
-            
-        Returns:
-            Список одобренных объявлений
-        """
-        announcements = session.query(Announcement).filter(
-            Announcement.is_approved == True
-        ).order_by(Announcement.created_at.desc()).all()
-
-        return [
-            {
-                'id': ann.id,
-                'user_id': ann.user_id,
-                'chat_id': ann.chat_id,
-                'bot_name': ann.bot_name,
-                'task_solution': ann.task_solution,
-                'included_features': ann.included_features,
-                'client_requirements': ann.client_requirements,
-                'launch_time': ann.launch_time,
-                'price': ann.price,
-                'complexity': ann.complexity,
-                'is_approved': ann.is_approved,
-                'created_at': ann.created_at
-            }
-            for ann in announcements
-        ]
+        Получение полной информации об объявлении по ID.
 
+        Поля каталога берутся из снимка в памяти, из БД читаются только
+        длинные поля карточки.
 
-    @staticmethod
-    def _get_full_announcement_by_id(session, announcement_id: int):
-        """
-        Получение полной информации об объявлении по ID.
-        
         Args:
             session: Сессия базы данных
             announcement_id: ID объявления
-            
+
         Returns:
             Словарь с данными объявления или None
         """
-        announcement = session.query(Announcement).filter(
-            Announcement.id == announcement_id,
-            Announcement.is_approved == True
-        ).first()
-
-        if announcement:
-            return {
-                'id': announcement.id,
-                'user_id': announcement.user_id,
-                'chat_id': announcement.chat_id,
-                'bot_name': announcement.bot_name,
-                'task_solution': announcement.task_solution,
-                'included_features': announcement.included_features,
-                'client_requirements': announcement.client_requirements,
-                'launch_time': announcement.launch_time,
-                'price': announcement.price,
-                'complexity': announcement.complexity,
-                'is_approved': announcement.is_approved,
-                'created_at': announcement.created_at
-            }
-        return None
\ No newline at end of file
+        announcement = catalog.snapshot.get(announcement_id)
+        if announcement is not None:
+            loaded = await load_details(session, [announcement])
+            return loaded[0] if loaded else None
+
+        # Объявления еще нет в каталоге (каталог не загружен или отстает от БД)
+        row = (await session.execute(
+            select(*SUMMARY_COLUMNS, *DETAIL_COLUMNS).where(
+                Announcement.id == announcement_id,
+                Announcement.is_approved == True
+            )
+        )).first()
+        return row._asdict() if row else None
@@ -1,34 +1,125 @@
 import asyncio
 import logging
+from aiohttp import web
 from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from config import Config
 from handlers import setup_handlers
-from database.models import create_tables
-from utils import messages
+from database.schema import check_schema_version
+from services import catalog, outbox, create_fsm_storage, SQLStorage, TTLMemoryStorage
+from utils import messages, metrics, OutboundRateLimiter, ThrottlingMiddleware
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 
 
+async def on_webhook_startup(bot: Bot, dispatcher: Dispatcher):
+    """Регистрация webhook в Telegram при запуске сервера"""
+    await bot.set_webhook(
+        f"{Config.WEBHOOK_BASE_URL.rstrip('/')}{Config.WEBHOOK_PATH}",
+        secret_token=Config.WEBHOOK_SECRET,
+        allowed_updates=dispatcher.resolve_used_update_types()
+    )
+    logging.info(f"Webhook установлен: {Config.WEBHOOK_BASE_URL}{Config.WEBHOOK_PATH}")
+
+
+async def on_webhook_shutdown(bot: Bot):
+    """Снятие webhook при остановке сервера"""
+    await bot.delete_webhook()
+    logging.info("Webhook снят")
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    """
+    Создание aiohttp-приложения, принимающего обновления от Telegram.
+
+    Args:
+        dp: Диспетчер
+        bot: Объект бота
+
+    Returns:
+        Приложение aiohttp
+    """
+    dp.startup.register(on_webhook_startup)
+    dp.shutdown.register(on_webhook_shutdown)
+
+    app = web.Application()
+    # Запросы без верного X-Telegram-Bot-Api-Secret-Token отклоняются с 401
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=Config.WEBHOOK_SECRET
+    ).register(app, path=Config.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    """Прием обновлений через webhook до остановки процесса"""
+    runner = web.AppRunner(create_webhook_app(dp, bot))
+    await runner.setup()
+    site = web.TCPSite(runner, Config.WEBHOOK_HOST, Config.WEBHOOK_PORT)
+    await site.start()
+    logging.info(f"Webhook-сервер слушает {Config.WEBHOOK_HOST}:{Config.WEBHOOK_PORT}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        # Остановка приложения вызывает shutdown диспетчера и снятие webhook
+        await runner.cleanup()
+
+
 async def main():
     """Главная функция запуска бота"""
     try:
-        # Создание таблиц в базе данных
-        create_tables()
-        
+        # Проверка версии схемы БД (таблицы и индексы создаются миграциями Alembic)
+        await check_schema_version()
+
+        # Загрузка каталога одобренных объявлений в память и его периодическая сверка с БД
+        await catalog.load()
+        reconcile_task = asyncio.create_task(catalog.reconcile_forever(Config.CATALOG_RECONCILE_INTERVAL))
+
         # Инициализация бота и диспетчера
         bot = Bot(token=Config.BOT_TOKEN)
-        dp = Dispatcher()
+
+        # Все исходящие отправки проходят через общий планировщик с учетом лимитов Bot API
+        bot.session.middleware(OutboundRateLimiter())
+
+        # Хранилище состояний диалогов (FSM_STORAGE): sql и redis переживают перезапуск и общие для реплик,
+        # брошенные состояния удаляются по времени простоя
+        fsm_storage = create_fsm_storage()
+        dp = Dispatcher(storage=fsm_storage)
+        background_tasks = [reconcile_task]
+        if isinstance(fsm_storage, (SQLStorage, TTLMemoryStorage)):
+            background_tasks.append(asyncio.create_task(fsm_storage.cleanup_forever()))
 
         messages.reload_messages()
-        
+
+        # Ограничение частоты действий пользователя до вызова обработчиков (поиск - строже)
+        throttling = ThrottlingMiddleware()
+        dp.message.middleware(throttling)
+        dp.callback_query.middleware(throttling)
+
         # Настройка обработчиков
         main_router = setup_handlers()
         dp.include_router(main_router)
-        
+
+        # Фоновая отправка публикаций и уведомлений из outbox
+        background_tasks.append(asyncio.create_task(outbox.run_forever(bot)))
+
+        # Периодический отчет о метриках и состоянии компонентов в лог
+        if Config.METRICS_LOG_INTERVAL > 0:
+            background_tasks.append(asyncio.create_task(metrics.log_forever(Config.METRICS_LOG_INTERVAL)))
+
         # Запуск бота
-        await dp.start_polling(bot)
-        
+        try:
+            if Config.BOT_MODE == "webhook":
+                await run_webhook(dp, bot)
+            else:
+                await dp.start_polling(bot)
+        finally:
+            for task in background_tasks:
+                task.cancel()
+
     except KeyboardInterrupt:
         print(messages.get_message('system', 'bot_stopped'))
     except Exception as e:
@@ -40,4 +131,4 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("Бот был остановлен вручную.")
\ No newline at end of file
+        print("Бот был остановлен вручную.")
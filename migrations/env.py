@@ -0,0 +1,65 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from config import Config
+from database.models import Base
+
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name)
+
+# URL базы данных берется из конфигурации бота (синхронный драйвер)
+config.set_main_option('sqlalchemy.url', Config.DATABASE_URL.replace('%', '%%'))
+
+target_metadata = Base.metadata
+
+
+def _include_object_for(dialect_name: str):
+    """Фильтр автогенерации: FULLTEXT-индексы MySQL не сравниваются в других БД."""
+    def include_object(obj, name, type_, reflected, compare_to):
+        if type_ == 'index' and not reflected and dialect_name != 'mysql':
+            return obj.dialect_options['mysql']['prefix'] != 'FULLTEXT'
+        return True
+    return include_object
+
+
+def run_migrations_offline() -> None:
+    """Генерация SQL миграций без подключения к БД (alembic upgrade --sql)."""
+    context.configure(
+        url=config.get_main_option('sqlalchemy.url'),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Применение миграций к БД."""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix='sqlalchemy.',
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=_include_object_for(connection.dialect.name),
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,58 @@
+"""Исходная схема: объявления и заявки на индивидуальные решения
+
+Схема, которую раньше создавал create_tables(). Для существующей БД
+миграцию не применяют, а отмечают: alembic stamp 0001
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'announcements',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('chat_id', sa.BigInteger(), nullable=False),
+        sa.Column('bot_name', sa.String(255), nullable=False),
+        sa.Column('task_solution', sa.Text(), nullable=False),
+        sa.Column('included_features', sa.Text(), nullable=False),
+        sa.Column('client_requirements', sa.Text(), nullable=False),
+        sa.Column('launch_time', sa.String(50), nullable=False),
+        sa.Column('price', sa.String(100), nullable=False),
+        sa.Column('complexity', sa.Text(), nullable=False),
+        sa.Column('demo_url', sa.String(2048), nullable=True),
+        sa.Column('documents', sa.JSON(), nullable=True),
+        sa.Column('videos', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('moderator_id', sa.Integer(), nullable=True),
+    )
+    op.create_table(
+        'custom_requests',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.BigInteger(), nullable=False),
+        sa.Column('chat_id', sa.BigInteger(), nullable=False),
+        sa.Column('business_description', sa.Text(), nullable=False),
+        sa.Column('automation_task', sa.Text(), nullable=False),
+        sa.Column('budget', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('moderator_id', sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('custom_requests')
+    op.drop_table('announcements')
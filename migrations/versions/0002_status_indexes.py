@@ -0,0 +1,33 @@
+"""Составные индексы для выборок по статусу и по пользователю
+
+(is_approved, created_at) обслуживает каталог одобренных объявлений
+(WHERE is_approved = TRUE ORDER BY created_at DESC) и очередь модерации,
+(user_id, created_at) - выборки объявлений и заявок пользователя.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('announcements', 'custom_requests')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_is_approved_created_at', table, ['is_approved', 'created_at'])
+        op.create_index(f'ix_{table}_user_id_created_at', table, ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_user_id_created_at', table_name=table)
+        op.drop_index(f'ix_{table}_is_approved_created_at', table_name=table)
@@ -0,0 +1,33 @@
+"""Колонка короткого описания объявления
+
+Колонку могли добавить вручную по инструкции из README,
+поэтому она создается только при отсутствии.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    """Проверка наличия колонки в таблице."""
+    return any(col['name'] == column for col in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def upgrade() -> None:
+    if not _has_column('announcements', 'short_description'):
+        op.add_column('announcements', sa.Column('short_description', sa.String(255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('announcements', 'short_description')
@@ -0,0 +1,42 @@
+"""Таблица исходящих отправок (transactional outbox)
+
+Публикации и уведомления записываются в одной транзакции со сменой
+статуса модерации и отправляются фоновым обработчиком с повторами.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('progress', sa.JSON(), nullable=True),
+        sa.Column('dedup_key', sa.String(255), nullable=True, unique=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_outbox_status_available_at', 'outbox', ['status', 'available_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_status_available_at', table_name='outbox')
+    op.drop_table('outbox')
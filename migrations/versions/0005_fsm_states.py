@@ -0,0 +1,35 @@
+"""Таблица состояний FSM
+
+Незавершенные диалоги (форма объявления, заявки и т.п.) хранятся в БД,
+поэтому переживают перезапуск и доступны всем экземплярам бота.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'fsm_states',
+        sa.Column('storage_key', sa.String(255), primary_key=True),
+        sa.Column('state', sa.String(255), nullable=True),
+        sa.Column('data', sa.JSON(none_as_null=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_fsm_states_expires_at', 'fsm_states', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_fsm_states_expires_at', table_name='fsm_states')
+    op.drop_table('fsm_states')
@@ -0,0 +1,33 @@
+"""Полнотекстовый индекс объявлений
+
+FULLTEXT-индекс с парсером ngram по названию, описанию задачи и
+составу решения для поиска MATCH ... AGAINST. Создается только в MySQL.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index(
+        'ft_announcements_text', 'announcements', ['bot_name', 'task_solution', 'included_features'],
+        mysql_prefix='FULLTEXT', mysql_with_parser='ngram'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_announcements_text', table_name='announcements')
@@ -0,0 +1,3 @@
+"""
+Служебные команды для обслуживания бота
+"""
@@ -0,0 +1,33 @@
+"""
+Заполнение коротких описаний для уже одобренных объявлений.
+
+Запуск:
+    python -m scripts.backfill_short_descriptions [--batch-size 20] [--limit N]
+"""
+import argparse
+import asyncio
+import logging
+
+from services import AISearchService
+from services.short_descriptions import ShortDescriptionService
+
+
+async def main(batch_size: int, limit: int | None):
+    """Генерация описаний пачками по batch_size объявлений за один запрос к модели."""
+    service = ShortDescriptionService(AISearchService(), batch_size=batch_size)
+    if not service.ai_search.client:
+        raise SystemExit("OPENAI_API_KEY не настроен")
+
+    saved = await service.backfill(limit=limit)
+    print(f"Готово, сохранено коротких описаний: {saved}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Заполнение коротких описаний объявлений")
+    parser.add_argument('--batch-size', type=int, default=20, help="объявлений в одном запросе к модели")
+    parser.add_argument('--limit', type=int, default=None, help="максимум обрабатываемых объявлений")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.batch_size, args.limit))
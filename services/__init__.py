@@ -3,5 +3,35 @@
 """
 
 from .ai_search_service import AISearchService
+from .search_index import SearchIndex
+from .fulltext_search import FulltextSearch
+from .embeddings import EmbeddingProvider, HashingEmbedder, OpenAIEmbedder, VectorIndex
+from .prompt_builder import PromptBuilder, count_tokens
+from .search_cache import SearchResultCache, normalize_query
+from .catalog import catalog, catalog_version
+from .short_descriptions import ShortDescriptionService
+from .outbox import Outbox, outbox
+from .fsm_storage import TTLMemoryStorage, SQLStorage, RedisFsmStorage, create_fsm_storage
 
-__all__ = ['AISearchService']
+__all__ = [
+    'AISearchService',
+    'SearchIndex',
+    'FulltextSearch',
+    'EmbeddingProvider',
+    'HashingEmbedder',
+    'OpenAIEmbedder',
+    'VectorIndex',
+    'PromptBuilder',
+    'count_tokens',
+    'SearchResultCache',
+    'normalize_query',
+    'catalog',
+    'catalog_version',
+    'ShortDescriptionService',
+    'Outbox',
+    'outbox',
+    'TTLMemoryStorage',
+    'SQLStorage',
+    'RedisFsmStorage',
+    'create_fsm_storage'
+]
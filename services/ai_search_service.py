@@ -1,7 +1,38 @@
+import asyncio
 import json
-from typing import List, Dict
-from openai import AsyncOpenAI
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Set
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
 from config import Config
+from utils.metrics import metrics
+from utils.single_flight import SingleFlight
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from .search_index import SearchIndex
+from .fulltext_search import FulltextSearch
+from .search_backends import IndexBackend, SearchBackend, create_search_backend, result_ids
+from .embeddings import VectorIndex, create_embedding_provider
+from .prompt_builder import PromptBuilder, Prompt
+from .search_cache import SearchResultCache, normalize_query
+from .catalog import catalog_version, lookup, read_index_details
+
+logger = logging.getLogger(__name__)
+
+
+def _is_outage(error: Exception) -> bool:
+    """
+    Ошибка, говорящая о недоступности OpenAI (а не о неверном запросе).
+
+    Args:
+        error: Исключение вызова
+
+    Returns:
+        True для таймаутов, сетевых ошибок, 429 и 5xx
+    """
+    if isinstance(error, (asyncio.TimeoutError, APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and (error.status_code == 429 or error.status_code >= 500)
 
 
 class AISearchService:
@@ -9,16 +40,87 @@ class AISearchService:
 
     def __init__(self):
         """Инициализация сервиса поиска."""
-        self.client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY) if Config.OPENAI_API_KEY else None
+        # Повторы SDK отключены: срок запроса и размыкатель цепи задает _call_openai
+        self.client = AsyncOpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            timeout=Config.OPENAI_TIMEOUT,
+            max_retries=0
+        ) if Config.OPENAI_API_KEY else None
+        # Защита от зависаний OpenAI: лимит одновременных запросов, срок запроса и размыкатель цепи
+        self._slots = asyncio.Semaphore(Config.OPENAI_MAX_CONCURRENCY)
+        self.breaker = CircuitBreaker(
+            'openai',
+            window=Config.OPENAI_BREAKER_WINDOW,
+            min_calls=Config.OPENAI_BREAKER_MIN_CALLS,
+            failure_rate=Config.OPENAI_BREAKER_FAILURE_RATE,
+            open_seconds=Config.OPENAI_BREAKER_OPEN_SECONDS
+        )
+        self.index = SearchIndex()
+        self._index_key: Optional[Hashable] = None
+        self.vector_index = VectorIndex(
+            create_embedding_provider(Config.EMBEDDING_PROVIDER, self.client, Config.EMBEDDING_MODEL,
+                                      guard=self._call_openai)
+        )
+        self._vector_key: Optional[Hashable] = None
+        self.fulltext = FulltextSearch()
+        self.candidates_k = Config.SEARCH_CANDIDATES_K
+        self.prompt_builder = PromptBuilder(
+            token_budget=Config.PROMPT_TOKEN_BUDGET,
+            description_chars=Config.PROMPT_DESCRIPTION_CHARS
+        )
+        self.cache = SearchResultCache(max_size=Config.SEARCH_CACHE_SIZE, ttl=Config.SEARCH_CACHE_TTL)
+        catalog_version.subscribe(self.cache.invalidate)
+        metrics.register('search.cache', self.cache.stats)
+        # Одинаковые запросы, пришедшие одновременно, выполняются одним обращением к GPT
+        self.inflight = SingleFlight('search')
+
+        # Движки поиска: основной, резервный (при ошибке основного) и теневой (для сравнения)
+        backend = Config.SEARCH_BACKEND
+        if backend == 'gpt' and not self.client:
+            logger.warning("OPENAI_API_KEY не настроен: поиск выполняется резервным движком")
+            backend = Config.SEARCH_FALLBACK
+        # Движок с одним названием создается один раз: совпадение основного и резервного
+        # проверяется по объекту, а повторный поиск тем же движком не выполняется
+        backends: Dict[str, SearchBackend] = {}
+
+        def backend_for(name: str) -> SearchBackend:
+            if name not in backends:
+                backends[name] = create_search_backend(name, self)
+            return backends[name]
+
+        self.backend = backend_for(backend)
+        self.fallback_backend = backend_for(Config.SEARCH_FALLBACK)
+        self.shadow_backend = backend_for(Config.SEARCH_SHADOW_BACKEND) if Config.SEARCH_SHADOW_BACKEND else None
+        # Локальный индекс - последний резерв при ошибке резервного движка
+        self.local_backend = backend_for(IndexBackend.name)
+        self._background: Set[asyncio.Task] = set()
+
+
+    @staticmethod
+    def _catalog_key(announcements: Sequence[Dict], version: Optional[int]) -> Hashable:
+        """
+        Ключ состояния каталога для перестроения индексов.
 
+        Args:
+            announcements: Список объявлений
+            version: Версия каталога, если объявления взяты из снимка каталога
 
-    async def smart_search(self, user_query: str, announcements: List[Dict]) -> Dict:
+        Returns:
+            Версия каталога или кортеж ID объявлений
         """
-        Умный поиск AI-решений с помощью GPT.
+        if version is not None:
+            return 'version', version
+        return tuple(ann['id'] for ann in announcements)
+
+
+    async def smart_search(self, user_query: str, announcements: Sequence[Dict], version: Optional[int] = None) -> Dict:
+        """
+        Умный поиск AI-решений движком SEARCH_BACKEND (по умолчанию GPT).
 
         Args:
             user_query: Запрос пользователя
             announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога, из которого получены объявления
 
         Returns:
             Dict с результатами поиска в формате:
@@ -28,94 +130,279 @@ class AISearchService:
                 "explanation": str
             }
         """
-        if not self.client:
-            # Fallback на обычный поиск если нет API ключа
-            return self._fallback_search(user_query, announcements)
+        cache_version = catalog_version.value if version is None else version
 
+        # Повторные запросы к той же версии каталога отдаем из кеша без обращения к GPT
+        cached = self.cache.get(user_query, cache_version)
+        if cached is not None:
+            return cached
+
+        # Пока такой же запрос к той же версии каталога выполняется, ждем его результат
+        return await self.inflight.do(
+            (normalize_query(user_query), cache_version),
+            lambda: self._smart_search(user_query, announcements, version, cache_version)
+        )
+
+
+    async def _smart_search(self, user_query: str, announcements: Sequence[Dict], version: Optional[int],
+                            cache_version: int) -> Dict:
+        """
+        Выполнение поиска (без объединения одинаковых запросов) с теневым сравнением.
+
+        Args:
+            user_query: Запрос пользователя
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога, из которого получены объявления
+            cache_version: Версия каталога для ключа кеша
+
+        Returns:
+            Dict с результатами поиска
+        """
+
+        shadow = self._start_shadow(user_query, announcements, version)
+        started = time.perf_counter()
         try:
-            # Подготавливаем данные для GPT
-            announcements_json = json.dumps([
-                {
-                    'id': ann['id'],
-                    'bot_name': ann['bot_name'],
-                    'task_solution': ann['task_solution']
-                }
-                for ann in announcements
-            ], ensure_ascii=False, indent=2)
-
-            # Формируем промпт для GPT
-            prompt = self._create_search_prompt(user_query, announcements_json)
-
-            # Отправляем запрос к GPT
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': 'Ты - эксперт по AI-решениям. Помогаешь пользователям найти подходящие AI-боты и решения.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1000
-            )
-
-            # Парсим ответ GPT
-            gpt_response = response.choices[0].message.content
-            return self._parse_gpt_response(gpt_response, announcements)
+            result = await self._primary_search(user_query, announcements, version, cache_version)
+        except BaseException:
+            if shadow is not None:
+                shadow.cancel()
+            raise
+        if shadow is not None:
+            self._track(self._compare_shadow(shadow, user_query, result, (time.perf_counter() - started) * 1000))
+        return result
+
+
+    async def _primary_search(self, user_query: str, announcements: Sequence[Dict], version: Optional[int],
+                              cache_version: int) -> Dict:
+        """
+        Поиск основным движком с переходом на резервный при ошибке.
+
+        Args:
+            user_query: Запрос пользователя
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
+            cache_version: Версия каталога для ключа кеша
 
+        Returns:
+            Dict с результатами поиска
+        """
+        try:
+            result = await self.backend.search(user_query, announcements, version)
         except Exception as e:
-            print(f"Ошибка при обращении к GPT: {e}")
-            # Fallback на обычный поиск при ошибке
-            return self._fallback_search(user_query, announcements)
+            logger.warning(f"Ошибка поиска ({self.backend.name}): {e}")
+            # Fallback на резервный поиск при ошибке или неразборчивом ответе (не кешируем,
+            # чтобы основной движок использовался снова, как только станет доступен)
+            return await self._fallback(user_query, announcements, version)
+
+        # GPT видит только название и описание задачи, а локальный индекс - все
+        # текстовые поля, поэтому при пустом ответе проверяем резервный поиск
+        if not result['found'] and self.backend is not self.fallback_backend:
+            local_result = await self._fallback(user_query, announcements, version)
+            if local_result['found']:
+                result = local_result
 
+        self.cache.put(user_query, cache_version, result)
+        return result
 
-    def _create_search_prompt(self, user_query: str, announcements_json: str) -> str:
+
+    def _start_shadow(self, user_query: str, announcements: Sequence[Dict],
+                      version: Optional[int]) -> Optional[asyncio.Future]:
         """
-        Создание промпта для GPT.
-        
+        Запуск теневого движка для доли запросов (SEARCH_SHADOW_SAMPLE).
+
+        Теневой результат пользователю не показывается и не кешируется,
+        он только сравнивается с основным.
+
         Args:
             user_query: Запрос пользователя
-            announcements_json: JSON строка с объявлениями
-            
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
+
+        Returns:
+            Задача, возвращающая (результат, время в мс), или None, если запрос не попал в выборку
+        """
+        if self.shadow_backend is None or random.random() >= Config.SEARCH_SHADOW_SAMPLE:
+            return None
+
+        async def run():
+            started = time.perf_counter()
+            result = await self.shadow_backend.search(user_query, announcements, version)
+            return result, (time.perf_counter() - started) * 1000
+
+        return asyncio.ensure_future(run())
+
+
+    async def _compare_shadow(self, shadow: asyncio.Future, user_query: str, result: Dict,
+                              primary_ms: float) -> None:
+        """
+        Сравнение выдачи и времени основного и теневого движков.
+
+        Args:
+            shadow: Задача теневого движка
+            user_query: Запрос пользователя
+            result: Результат основного движка
+            primary_ms: Время основного поиска (мс)
+        """
+        name = self.shadow_backend.name
+        try:
+            shadow_result, shadow_ms = await asyncio.wait_for(shadow, timeout=Config.SEARCH_FINAL_DEADLINE)
+        except Exception as e:
+            metrics.increment(f'search.shadow.{name}.errors')
+            logger.warning(f"Теневой поиск ({name}) не выполнен: {e!r}")
+            return
+
+        primary_ids, shadow_ids = result_ids(result), result_ids(shadow_result)
+        common = len(set(primary_ids) & set(shadow_ids))
+        overlap = common / max(len(primary_ids), len(shadow_ids)) if primary_ids or shadow_ids else 1.0
+        top_match = primary_ids[:1] == shadow_ids[:1]
+
+        metrics.increment(f'search.shadow.{name}.runs')
+        metrics.observe(f'search.shadow.{name}.overlap', overlap)
+        metrics.observe(f'search.shadow.{name}.latency_ms', shadow_ms)
+        metrics.observe(f'search.shadow.{name}.primary_latency_ms', primary_ms)
+        if top_match:
+            metrics.increment(f'search.shadow.{name}.top_match')
+        logger.info(
+            f"Теневой поиск: пересечение {common} ({overlap:.2f}), первый результат "
+            f"{'совпал' if top_match else 'не совпал'}; основной {primary_ms:.0f} мс, "
+            f"теневой {shadow_ms:.0f} мс; {self.backend.explain(user_query, result)}; "
+            f"{self.shadow_backend.explain(user_query, shadow_result)}"
+        )
+
+
+    def _track(self, coro) -> None:
+        """Запуск фоновой задачи с сохранением ссылки до ее завершения."""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+
+    async def _retrieve_candidates(self, user_query: str, announcements: Sequence[Dict],
+                                   version: Optional[int] = None) -> Sequence[Dict]:
+        """
+        Отбор кандидатов для GPT.
+
+        По умолчанию кандидаты - ближайшие по косинусной близости эмбеддингов;
+        при SEARCH_RETRIEVER=fulltext - самые релевантные по FULLTEXT-индексу MySQL.
+
+        Args:
+            user_query: Запрос пользователя
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
+
+        Returns:
+            Не более candidates_k объявлений, ближайших к запросу
+        """
+        if len(announcements) <= self.candidates_k:
+            return announcements
+
+        if Config.SEARCH_RETRIEVER == 'fulltext':
+            hits = await self.fulltext.search(user_query, self.candidates_k)
+            candidates = lookup(announcements, (ann_id for ann_id, _ in hits))
+            # Запрос без совпадающих n-грамм: отбираем кандидатов по эмбеддингам
+            if candidates:
+                return candidates
+
+        key = self._catalog_key(announcements, version)
+        if key != self._vector_key:
+            details = await read_index_details(announcements)
+            await self.vector_index.build(list(announcements), details)
+            self._vector_key = key
+
+        hits = await self.vector_index.search(user_query, self.candidates_k)
+        return lookup(announcements, (ann_id for ann_id, _ in hits))
+
+
+    async def _call_openai(self, purpose: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Обращение к OpenAI с общей защитой процесса от зависаний API.
+
+        Все запросы сервиса (чат и эмбеддинги) проходят через один размыкатель
+        цепи, общий лимит одновременных запросов и срок OPENAI_TIMEOUT.
+
+        Args:
+            purpose: Назначение запроса для метрик ('search', 'embeddings', ...)
+            request: Функция без аргументов, выполняющая запрос
+
         Returns:
-            Строка промпта для GPT
+            Ответ OpenAI
+
+        Raises:
+            CircuitOpenError: Размыкатель цепи OpenAI разомкнут
+            asyncio.TimeoutError: Запрос не уложился в OPENAI_TIMEOUT
         """
-        return f"""
-Пользователь ищет AI-решение с запросом: "{user_query}"
-
-Доступные AI-решения:
-{announcements_json}
-
-Проанализируй запрос пользователя и найди наиболее подходящие AI-решения из списка.
-
-Верни ответ СТРОГО в формате JSON:
-{{
-    "found": true/false,
-    "results": [
-        {{
-            "id": номер_id,
-            "bot_name": "название",
-            "task_solution": "описание задачи и решения"
-        }}
-    ],
-    "explanation": "объяснение выбора"
-}}
-
-Требования:
-1. Если ничего не найдено, верни "found": false и пустой массив results
-2. Сортируй результаты по relevance_score (от большего к меньшему)
-3. Включай только решения с relevance_score >= 6
-4. Максимум 5 результатов
-5. Объяснения должны быть краткими (до 50 символов)
-6. Отвечай ТОЛЬКО JSON, без дополнительного текста
-"""
-
-
-    def _parse_gpt_response(self, gpt_response: str, announcements: List[Dict]) -> Dict:
+        if not self.breaker.allow():
+            metrics.increment(f'ai.{purpose}.rejected')
+            raise CircuitOpenError("OpenAI временно недоступен")
+
+        async def call():
+            async with self._slots:
+                return await request()
+
+        try:
+            # Срок включает ожидание свободного слота, чтобы очередь не копилась бесконечно
+            response = await asyncio.wait_for(call(), timeout=Config.OPENAI_TIMEOUT)
+        except asyncio.CancelledError:
+            # Запрос отменен вызывающим: освобождаем пробный слот, не оценивая сервис
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if _is_outage(e):
+                metrics.increment(f'ai.{purpose}.failures')
+                self.breaker.record_failure()
+            else:
+                # Сервис ответил (например, 400) - это не признак недоступности
+                self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return response
+
+
+    async def _complete(self, purpose: str, prompt: Prompt, max_tokens: int, temperature: float = 0.3) -> str:
+        """
+        Запрос к chat-модели с учетом размера промпта и ответа.
+
+        Args:
+            purpose: Назначение запроса для метрик ('search', 'short_descriptions')
+            prompt: Собранный промпт
+            max_tokens: Максимальное количество токенов ответа
+            temperature: Температура генерации
+
+        Returns:
+            Текст ответа модели
+
+        Raises:
+            CircuitOpenError: Размыкатель цепи OpenAI разомкнут
+            asyncio.TimeoutError: Запрос не уложился в OPENAI_TIMEOUT
+        """
+        started = time.perf_counter()
+        response = await self._call_openai(purpose, lambda: self.client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=prompt.messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        usage = getattr(response, 'usage', None)
+        prompt_tokens = getattr(usage, 'prompt_tokens', None) or prompt.prompt_tokens
+        completion_tokens = getattr(usage, 'completion_tokens', None) or 0
+
+        metrics.increment(f'ai.{purpose}.calls')
+        metrics.observe(f'ai.{purpose}.prompt_tokens', prompt_tokens)
+        metrics.observe(f'ai.{purpose}.completion_tokens', completion_tokens)
+        metrics.observe(f'ai.{purpose}.prompt_build_ms', prompt.build_ms)
+        metrics.observe(f'ai.{purpose}.latency_ms', elapsed_ms)
+        logger.info(
+            f"GPT {purpose}: кандидатов={prompt.candidates}, prompt_tokens={prompt_tokens} "
+            f"(оценка {prompt.prompt_tokens}), completion_tokens={completion_tokens}, "
+            f"сборка={prompt.build_ms:.1f} мс, ответ={elapsed_ms:.0f} мс"
+        )
+
+        return response.choices[0].message.content
+
+
+    def _parse_gpt_response(self, gpt_response: str, announcements: Sequence[Dict]) -> Dict:
         """
         Парсинг ответа GPT и формирование результата.
         
@@ -125,6 +412,10 @@ class AISearchService:
             
         Returns:
             Словарь с результатами поиска
+
+        Raises:
+            Exception: Ответ не удалось разобрать (поиск переходит на резервный движок
+                без кеширования, как при любой ошибке основного движка)
         """
         try:
             # Очищаем ответ от возможных markdown блоков
@@ -145,16 +436,9 @@ class AISearchService:
                     'explanation': parsed.get('explanation', 'По вашему запросу ничего не найдено')
                 }
 
-            # Находим полные данные объявлений по ID
-            announcement_map = {ann['id']: ann for ann in announcements}
-            full_results = []
-
-            for result in parsed['results']:
-                ann_id = result['id']
-                if ann_id in announcement_map:
-                    full_ann = announcement_map[ann_id].copy()
-                    full_ann['task_solution'] = result['task_solution']
-                    full_results.append(full_ann)
+            # Объявления берем из каталога по ID (в промпт описание попадает сокращенным);
+            # записи каталога только для чтения, поэтому не копируются
+            full_results = lookup(announcements, (result['id'] for result in parsed['results']))
 
             return {
                 'found': True,
@@ -165,19 +449,70 @@ class AISearchService:
         except json.JSONDecodeError as e:
             print(f"Ошибка парсинга JSON от GPT: {e}")
             print(f"Ответ GPT: {gpt_response}")
-            return self._fallback_search('', announcements)
+            raise
         except Exception as e:
             print(f"Ошибка обработки ответа GPT: {e}")
-            return self._fallback_search('', announcements)
+            raise
 
 
-    def _fallback_search(self, user_query: str, announcements: List[Dict]) -> Dict:
+    async def _fallback(self, user_query: str, announcements: Sequence[Dict], version: Optional[int] = None) -> Dict:
         """
-        Обычный поиск как fallback.
+        Поиск резервным движком (SEARCH_FALLBACK), при его ошибке - локальным индексом.
+
+        Args:
+            user_query: Запрос пользователя
+            announcements: Список объявлений
+            version: Версия снимка каталога
+
+        Returns:
+            Словарь с результатами поиска
+        """
+        # Резервный движок, совпадающий с основным, только что не справился - сразу локальный индекс
+        if not user_query or self.fallback_backend is self.backend:
+            return await self._fallback_search(user_query, announcements, version)
+
+        try:
+            return await self.fallback_backend.search(user_query, announcements, version)
+        except Exception as e:
+            logger.error(f"Ошибка резервного поиска ({self.fallback_backend.name}): {e}")
+            return await self._fallback_search(user_query, announcements, version)
+
+
+    async def _ensure_index(self, announcements: Sequence[Dict], version: Optional[int] = None) -> None:
+        """
+        Построение локального индекса, если каталог изменился.
+
+        Длинные поля объявлений читаются из БД только на время построения.
+        Если БД недоступна, индекс строится по полям каталога и будет
+        перестроен полностью при следующем поиске.
+
+        Args:
+            announcements: Список объявлений
+            version: Версия снимка каталога
+        """
+        key = self._catalog_key(announcements, version)
+        if key == self._index_key:
+            return
+
+        try:
+            details = await read_index_details(announcements)
+        except Exception as e:
+            logger.error(f"Ошибка чтения полей объявлений для индекса: {e}")
+            self.index.build(announcements)
+            self._index_key = None
+            return
+        self.index.build(announcements, details)
+        self._index_key = key
+
+
+    async def _fallback_search(self, user_query: str, announcements: Sequence[Dict], version: Optional[int] = None) -> Dict:
+        """
+        Локальный поиск по инвертированному индексу (BM25) как fallback.
         
         Args:
             user_query: Запрос пользователя
             announcements: Список объявлений
+            version: Версия снимка каталога
             
         Returns:
             Словарь с результатами поиска
@@ -189,96 +524,61 @@ class AISearchService:
                 'explanation': 'Введите поисковый запрос'
             }
 
-        query_lower = user_query.lower()
-        results = []
-
-        for ann in announcements:
-            if (query_lower in ann['bot_name'].lower() or
-                query_lower in ann['task_solution'].lower()):
-                results.append(ann)
-
-        return {
-            'found': len(results) > 0,
-            'results': results[:5],  # Максимум 5 результатов
-            'explanation': f'Найдено {len(results)} решений по обычному поиску' if results else 'Ничего не найдено'
-        }
+        return await self.local_backend.search(user_query, announcements, version)
 
 
-    async def create_short_descriptions(self, announcements: List[Dict]) -> Dict[str, str]:
+    async def local_search(self, user_query: str, announcements: Sequence[Dict], version: Optional[int] = None) -> Dict:
         """
-        Создание коротких описаний для списка объявлений через GPT.
+        Поиск по локальному индексу без обращения к GPT.
 
         Args:
-            announcements: Список объявлений
+            user_query: Запрос пользователя
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
 
         Returns:
-            Словарь {id: короткое_описание}
+            Словарь с результатами поиска в формате smart_search
         """
-        if not self.client:
-            # Если нет OpenAI API, возвращаем обрезанные описания
-            return {
-                str(ann['id']): ann['task_solution'][:50] + '...'
-                for ann in announcements
-            }
+        return await self._fallback_search(user_query, announcements, version)
 
-        try:
-            # Подготавливаем данные для GPT
-            announcements_data = []
-            for ann in announcements:
-                announcements_data.append({
-                    'id': ann['id'],
-                    'name': ann['bot_name'],
-                    'description': ann['task_solution']
-                })
-
-            prompt = f"""
-    Создай короткие описания (максимум 60 символов) для следующих AI-решений.
-    Описание должно быть понятным и привлекательным для пользователя.
-    
-    Объявления:
-    {json.dumps(announcements_data, ensure_ascii=False, indent=2)}
-    
-    Верни результат в формате JSON:
-    {{
-        "1": "короткое описание для ID 1",
-        "2": "короткое описание для ID 2"
-    }}
-    
-    Требования:
-    - Максимум 60 символов
-    - Понятно и привлекательно
-    - Отражает суть решения
-    - На русском языке
-    """
 
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {'role': 'system', 'content': 'Ты эксперт по созданию кратких и привлекательных описаний AI-решений.'},
-                    {'role': 'user', 'content': prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.3
-            )
+    async def generate_short_descriptions(self, announcements: List[Dict]) -> Dict[str, str]:
+        """
+        Генерация коротких описаний через GPT одним запросом.
 
-            gpt_response = response.choices[0].message.content
+        Обрезанные описания не подставляются: в результат попадают
+        только ответы модели.
 
-            # Очищаем ответ от markdown
-            clean_response = gpt_response.strip()
-            if clean_response.startswith('```json'):
-                clean_response = clean_response[7:]
-            if clean_response.endswith('```'):
-                clean_response = clean_response[:-3]
-            clean_response = clean_response.strip()
+        Args:
+            announcements: Список объявлений
 
-            # Парсим JSON
-            short_descriptions = json.loads(clean_response)
-            return short_descriptions
+        Returns:
+            Словарь {id: короткое_описание}
 
-        except Exception as e:
-            print(f"Ошибка создания коротких описаний: {e}")
-            # Возвращаем обрезанные описания как fallback
-            return {
-                str(ann['id']): ann['task_solution'][:50] + '...'
-                for ann in announcements
-            }
\ No newline at end of file
+        Raises:
+            RuntimeError: Если клиент OpenAI не настроен
+            Exception: Ошибки обращения к GPT и разбора ответа
+        """
+        if not self.client:
+            raise RuntimeError("OpenAI API не настроен")
+
+        prompt = self.prompt_builder.build_short_descriptions_prompt(announcements)
+        max_tokens = min(4000, 200 + 60 * len(announcements))
+        gpt_response = await self._complete('short_descriptions', prompt, max_tokens=max_tokens)
+
+        # Очищаем ответ от markdown
+        clean_response = gpt_response.strip()
+        if clean_response.startswith('```json'):
+            clean_response = clean_response[7:]
+        if clean_response.endswith('```'):
+            clean_response = clean_response[:-3]
+        clean_response = clean_response.strip()
+
+        # Парсим JSON
+        short_descriptions = json.loads(clean_response)
+        requested_ids = {str(ann['id']) for ann in announcements}
+        return {
+            str(ann_id): str(description).strip()
+            for ann_id, description in short_descriptions.items()
+            if str(ann_id) in requested_ids and description
+        }
@@ -0,0 +1,449 @@
+import asyncio
+import datetime
+import logging
+import sys
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database.db import get_async_db_session
+from database.models import Announcement
+
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogVersion:
+    """Версия каталога одобренных объявлений, меняется при каждой модерации."""
+
+    def __init__(self):
+        """Инициализация версии каталога."""
+        self._value = 0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[int], None]] = []
+
+    @property
+    def value(self) -> int:
+        """Текущая версия каталога."""
+        return self._value
+
+    def subscribe(self, listener: Callable[[int], None]) -> None:
+        """
+        Подписка на изменение версии каталога.
+
+        Args:
+            listener: Функция, получающая новую версию
+        """
+        self._listeners.append(listener)
+
+    def bump(self) -> int:
+        """
+        Увеличение версии каталога и уведомление подписчиков.
+
+        Returns:
+            Новая версия каталога
+        """
+        with self._lock:
+            self._value += 1
+            version = self._value
+
+        for listener in self._listeners:
+            try:
+                listener(version)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика изменения каталога: {e}")
+        return version
+
+
+def after_commit(session: Session | AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Выполнение действия после успешного коммита сессии.
+
+    Каталог меняется только после коммита, чтобы параллельный поиск
+    не увидел и не закешировал данные, которые еще могут откатиться.
+
+    Args:
+        session: Сессия базы данных (синхронная или асинхронная)
+        callback: Действие без аргументов
+    """
+    # У асинхронной сессии события вешаются на связанную синхронную сессию
+    event.listen(getattr(session, 'sync_session', session), 'after_commit', lambda _: callback(), once=True)
+
+
+def announcement_to_dict(announcement: Announcement) -> Dict:
+    """
+    Представление объявления для каталога поиска.
+
+    Args:
+        announcement: Объект объявления
+
+    Returns:
+        Словарь с данными объявления
+    """
+    return {
+        'id': announcement.id,
+        'user_id': announcement.user_id,
+        'chat_id': announcement.chat_id,
+        'bot_name': announcement.bot_name,
+        'task_solution': announcement.task_solution,
+        'included_features': announcement.included_features,
+        'client_requirements': announcement.client_requirements,
+        'launch_time': announcement.launch_time,
+        'price': announcement.price,
+        'complexity': announcement.complexity,
+        'short_description': announcement.short_description,
+        'is_approved': announcement.is_approved,
+        'created_at': announcement.created_at
+    }
+
+
+# Поля объявления, хранимые в каталоге в памяти (нужны поиску, промпту и списку результатов)
+SUMMARY_FIELDS = (
+    'id', 'user_id', 'chat_id', 'bot_name', 'task_solution',
+    'launch_time', 'price', 'short_description', 'created_at'
+)
+
+# Длинные поля карточки объявления: читаются из БД по ID при показе и при построении поисковых индексов
+DETAIL_FIELDS = ('included_features', 'client_requirements', 'complexity')
+
+# Колонки запросов: список и поиск читают только поля каталога, карточка - только длинные поля
+SUMMARY_COLUMNS = tuple(getattr(Announcement, field) for field in SUMMARY_FIELDS)
+DETAIL_COLUMNS = tuple(getattr(Announcement, field) for field in DETAIL_FIELDS)
+
+# Целочисленные колонки хранятся в array('q') без объекта int на каждое значение
+_INT_FIELDS = ('id', 'user_id', 'chat_id')
+
+# Короткие строки с частыми повторами ("1 неделя", "Договорная") хранятся в одном экземпляре
+_INTERNED_FIELDS = ('launch_time', 'price')
+
+
+def _sort_key(record: Mapping):
+    """Порядок каталога: сначала новые объявления."""
+    return record['created_at'] or datetime.datetime.min, record['id']
+
+
+class AnnouncementView(Mapping):
+    """
+    Объявление каталога: строка колоночного снимка только для чтения.
+
+    Поддерживает чтение как словарь (ann['bot_name'], ann.get(...)), но не
+    хранит значения сам - берет их из колонок снимка. Длинные поля
+    (DETAIL_FIELDS) в каталоге отсутствуют и читаются из БД при показе карточки
+    и при построении поисковых индексов.
+    """
+
+    __slots__ = ('_columns', '_row')
+
+    def __init__(self, columns: Dict[str, Sequence], row: int):
+        self._columns = columns
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        return column[self._row]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        return f"<AnnouncementView(id={self['id']}, bot_name='{self['bot_name']}')>"
+
+
+class CatalogSnapshot(Sequence):
+    """
+    Неизменяемый снимок каталога одобренных объявлений.
+
+    Данные хранятся по колонкам (SUMMARY_FIELDS), а объявления доступны как
+    последовательность AnnouncementView, общих для всех читателей снимка:
+    поиск, промпт и вывод результатов не копируют записи.
+    """
+
+    __slots__ = ('version', '_columns', '_views', '_rows')
+
+    def __init__(self, version: int, announcements: Iterable[Mapping]):
+        """
+        Создание снимка.
+
+        Args:
+            version: Версия каталога
+            announcements: Одобренные объявления (словари или AnnouncementView)
+        """
+        self.version = version
+        records = sorted(announcements, key=_sort_key, reverse=True)
+
+        columns: Dict[str, Sequence] = {}
+        for field in SUMMARY_FIELDS:
+            values = [record.get(field) for record in records]
+            if field in _INT_FIELDS:
+                columns[field] = array('q', values)
+            elif field in _INTERNED_FIELDS:
+                columns[field] = tuple(sys.intern(value) if value else value for value in values)
+            else:
+                columns[field] = tuple(values)
+
+        self._columns = columns
+        self._views = tuple(AnnouncementView(columns, row) for row in range(len(records)))
+        self._rows = {ann_id: row for row, ann_id in enumerate(columns['id'])}
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def __getitem__(self, index):
+        return self._views[index]
+
+    def __iter__(self) -> Iterator[AnnouncementView]:
+        return iter(self._views)
+
+    @property
+    def announcements(self) -> 'CatalogSnapshot':
+        """Объявления снимка (сам снимок - последовательность объявлений)."""
+        return self
+
+    def get(self, announcement_id: int) -> Optional[AnnouncementView]:
+        """
+        Получение объявления по ID.
+
+        Args:
+            announcement_id: ID объявления
+
+        Returns:
+            Объявление или None
+        """
+        row = self._rows.get(announcement_id)
+        return None if row is None else self._views[row]
+
+    def __contains__(self, announcement_id) -> bool:
+        """Есть ли в снимке объявление с таким ID."""
+        return announcement_id in self._rows
+
+    def same_records(self, records: Iterable[Mapping]) -> bool:
+        """
+        Совпадают ли данные снимка с записями (по полям каталога).
+
+        Args:
+            records: Объявления
+
+        Returns:
+            True, если записи дают такой же снимок
+        """
+        records = sorted(records, key=_sort_key, reverse=True)
+        return len(records) == len(self) and all(
+            list(column) == [record.get(field) for record in records]
+            for field, column in self._columns.items()
+        )
+
+
+def lookup(announcements: Sequence[Mapping], ids: Iterable[int]) -> List[Mapping]:
+    """
+    Объявления по ID в заданном порядке (отсутствующие пропускаются).
+
+    Снимок каталога ищет по своему индексу; для обычного списка
+    словарь строится только из запрошенных ID, без копии каталога.
+
+    Args:
+        announcements: Снимок каталога или список объявлений
+        ids: ID объявлений
+
+    Returns:
+        Найденные объявления
+    """
+    ids = list(ids)
+    if isinstance(announcements, CatalogSnapshot):
+        found = (announcements.get(ann_id) for ann_id in ids)
+        return [ann for ann in found if ann is not None]
+    wanted = set(ids)
+    by_id = {ann['id']: ann for ann in announcements if ann['id'] in wanted}
+    return [by_id[ann_id] for ann_id in ids if ann_id in by_id]
+
+
+class CatalogStore:
+    """
+    Процессный кеш каталога одобренных объявлений.
+
+    Читатели получают ссылку на текущий снимок без блокировок. Изменения
+    создают новый снимок (copy-on-write) и атомарно подменяют ссылку.
+    """
+
+    def __init__(self):
+        """Инициализация пустого каталога."""
+        self._snapshot = CatalogSnapshot(catalog_version.value, ())
+        self._lock = threading.Lock()
+        self.loaded = False
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """Текущий снимок каталога."""
+        return self._snapshot
+
+    def _swap(self, announcements: Iterable[Dict]) -> CatalogSnapshot:
+        """Публикация нового снимка с новой версией каталога."""
+        snapshot = CatalogSnapshot(catalog_version.value + 1, announcements)
+        self._snapshot = snapshot
+        catalog_version.bump()
+        return snapshot
+
+    @staticmethod
+    async def _read_approved() -> List[Dict]:
+        """Чтение полей каталога всех одобренных объявлений из БД."""
+        async with get_async_db_session() as session:
+            rows = await session.execute(
+                select(*SUMMARY_COLUMNS).where(Announcement.is_approved == True)
+            )
+            return [row._asdict() for row in rows]
+
+    async def load(self) -> CatalogSnapshot:
+        """
+        Загрузка каталога из БД (при старте бота).
+
+        Returns:
+            Новый снимок каталога
+        """
+        records = await self._read_approved()
+        with self._lock:
+            snapshot = self._swap(records)
+            self.loaded = True
+        logger.info(f"Каталог загружен: {len(snapshot)} объявлений, версия {snapshot.version}")
+        return snapshot
+
+    async def reconcile(self) -> bool:
+        """
+        Сверка каталога с БД для изменений, сделанных в обход бота.
+
+        Returns:
+            True, если каталог изменился
+        """
+        records = await self._read_approved()
+        with self._lock:
+            if self._snapshot.same_records(records):
+                return False
+            snapshot = self._swap(records)
+            self.loaded = True
+        logger.info(f"Каталог обновлен при сверке с БД: {len(snapshot)} объявлений, версия {snapshot.version}")
+        return True
+
+    async def reconcile_forever(self, interval: float) -> None:
+        """
+        Периодическая сверка каталога с БД.
+
+        Args:
+            interval: Интервал между сверками (секунд)
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Ошибка сверки каталога с БД: {e}")
+
+    def upsert(self, records: Iterable[Mapping]) -> None:
+        """
+        Добавление или замена одобренных объявлений.
+
+        Args:
+            records: Словари объявлений (длинные поля DETAIL_FIELDS в каталог не попадают)
+        """
+        records = {record['id']: record for record in records}
+        if not records:
+            return
+        with self._lock:
+            current = self._snapshot.announcements
+            self._swap([ann for ann in current if ann['id'] not in records] + list(records.values()))
+
+    def remove(self, announcement_ids: Iterable[int]) -> None:
+        """
+        Удаление объявлений из каталога.
+
+        Args:
+            announcement_ids: ID объявлений
+        """
+        ids = set(announcement_ids)
+        with self._lock:
+            current = self._snapshot
+            if not any(ann_id in current for ann_id in ids):
+                return
+            self._swap([ann for ann in current.announcements if ann['id'] not in ids])
+
+    def patch(self, updates: Dict[int, Dict]) -> None:
+        """
+        Изменение отдельных полей объявлений каталога.
+
+        Args:
+            updates: Словарь {id: {поле: значение}}
+        """
+        with self._lock:
+            current = self._snapshot
+            changed = [
+                {**current.get(ann_id), **fields}
+                for ann_id, fields in updates.items()
+                if ann_id in current
+            ]
+        self.upsert(changed)
+
+
+async def load_details(session: AsyncSession, announcements: Sequence[Mapping]) -> List[Dict]:
+    """
+    Дополнение объявлений каталога длинными полями (DETAIL_FIELDS).
+
+    Поля всех объявлений читаются одним запросом IN (...). Объявления,
+    которые уже сняты с публикации, в результат не попадают.
+
+    Args:
+        session: Сессия базы данных
+        announcements: Объявления каталога, которые будут показаны
+
+    Returns:
+        Полные объявления в исходном порядке
+    """
+    ids = [ann['id'] for ann in announcements]
+    if not ids:
+        return []
+
+    rows = await session.execute(
+        select(Announcement.id, *DETAIL_COLUMNS).where(
+            Announcement.id.in_(ids),
+            Announcement.is_approved == True
+        )
+    )
+    details = {row.id: row._asdict() for row in rows}
+    return [{**ann, **details[ann['id']]} for ann in announcements if ann['id'] in details]
+
+
+async def read_index_details(announcements: Sequence[Mapping]) -> Dict[int, Dict]:
+    """
+    Длинные поля (DETAIL_FIELDS) для построения поисковых индексов.
+
+    Снимок каталога этих полей не хранит, поэтому они читаются из БД одним
+    запросом и нужны только на время построения индекса. Обычные словари
+    объявлений уже содержат все поля, и для них ничего не читается.
+
+    Args:
+        announcements: Снимок каталога или список объявлений
+
+    Returns:
+        Словарь {id: {поле: текст}} (пустой, если объявления содержат поля сами)
+    """
+    if not isinstance(announcements, CatalogSnapshot) or not len(announcements):
+        return {}
+
+    async with get_async_db_session() as session:
+        rows = await session.execute(
+            select(Announcement.id, *DETAIL_COLUMNS).where(Announcement.is_approved == True)
+        )
+        return {row.id: row._asdict() for row in rows if row.id in announcements}
+
+
+# Глобальная версия каталога процесса
+catalog_version = CatalogVersion()
+
+# Глобальный снимок каталога одобренных объявлений
+catalog = CatalogStore()
@@ -0,0 +1,225 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from .search_index import tokenize
+
+
+# Обертка запроса к OpenAI: (назначение для метрик, функция запроса) -> ответ
+OpenAIGuard = Callable[[str, Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+# Поля объявления, из которых собирается текст для эмбеддинга
+EMBEDDING_FIELDS = ('bot_name', 'task_solution', 'included_features')
+
+
+def announcement_text(announcement: Mapping, details: Optional[Mapping] = None) -> str:
+    """
+    Текст объявления для построения эмбеддинга.
+
+    Args:
+        announcement: Словарь объявления
+        details: Длинные поля объявления, которых нет в самом объявлении
+
+    Returns:
+        Склеенный текст полей объявления
+    """
+    details = details or {}
+    return '\n'.join(
+        (details[field] if field in details else announcement.get(field)) or ''
+        for field in EMBEDDING_FIELDS
+    )
+
+
+class EmbeddingProvider(ABC):
+    """Базовый класс поставщика эмбеддингов."""
+
+    name: str = 'base'
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Построение эмбеддингов для списка текстов.
+
+        Args:
+            texts: Список текстов
+
+        Returns:
+            Матрица размера (len(texts), dimension)
+        """
+        pass
+
+
+class HashingEmbedder(EmbeddingProvider):
+    """Детерминированный локальный эмбеддер на хешировании признаков."""
+
+    name = 'hashing'
+
+    def __init__(self, dimension: int = 512):
+        """
+        Инициализация эмбеддера.
+
+        Args:
+            dimension: Размерность вектора
+        """
+        self.dimension = dimension
+
+    def _features(self, text: str) -> Iterable[str]:
+        """Основы слов и биграммы основ."""
+        terms = tokenize(text)
+        yield from terms
+        for first, second in zip(terms, terms[1:]):
+            yield f'{first} {second}'
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        """Построение вектора для одного текста."""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in self._features(text):
+            # crc32 стабилен между процессами в отличие от встроенного hash()
+            digest = zlib.crc32(feature.encode('utf-8'))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimension] += sign
+        # Логарифмическое сглаживание частот, чтобы повторы не доминировали
+        return np.sign(vector) * np.log1p(np.abs(vector))
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack([self._embed_one(text) for text in texts])
+
+
+class OpenAIEmbedder(EmbeddingProvider):
+    """Эмбеддинги через OpenAI Embeddings API."""
+
+    name = 'openai'
+
+    def __init__(self, client: AsyncOpenAI, model: str = 'text-embedding-3-small', batch_size: int = 256,
+                 guard: Optional[OpenAIGuard] = None):
+        """
+        Инициализация эмбеддера.
+
+        Args:
+            client: Клиент OpenAI
+            model: Название модели эмбеддингов
+            batch_size: Количество текстов в одном запросе
+            guard: Обертка запросов к OpenAI (лимит, срок, размыкатель цепи)
+        """
+        self.client = client
+        self.model = model
+        self.batch_size = batch_size
+        self.guard = guard
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            def request(batch=texts[start:start + self.batch_size]):
+                return self.client.embeddings.create(model=self.model, input=batch)
+
+            response = await (self.guard('embeddings', request) if self.guard else request())
+            vectors.extend(item.embedding for item in response.data)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def create_embedding_provider(name: str, client: Optional[AsyncOpenAI] = None,
+                              model: str = 'text-embedding-3-small',
+                              guard: Optional[OpenAIGuard] = None) -> EmbeddingProvider:
+    """
+    Создание поставщика эмбеддингов по названию из конфигурации.
+
+    Args:
+        name: Название поставщика ('hashing' или 'openai')
+        client: Клиент OpenAI (нужен для 'openai')
+        model: Название модели эмбеддингов OpenAI
+        guard: Обертка запросов к OpenAI (лимит, срок, размыкатель цепи)
+
+    Returns:
+        Поставщик эмбеддингов
+    """
+    if name == 'openai' and client is not None:
+        return OpenAIEmbedder(client, model=model, guard=guard)
+    return HashingEmbedder()
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Нормализация строк матрицы по L2."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """Векторный индекс объявлений с поиском по косинусной близости."""
+
+    def __init__(self, provider: EmbeddingProvider):
+        """
+        Инициализация пустого индекса.
+
+        Args:
+            provider: Поставщик эмбеддингов
+        """
+        self.provider = provider
+        # Эмбеддинг каждого объявления вместе с контрольной суммой его текста,
+        # чтобы при пересборке индекса пересчитывать только измененные
+        self._vectors: Dict[int, Tuple[int, np.ndarray]] = {}
+        self._ids: np.ndarray = np.zeros(0, dtype=np.int64)
+        self._matrix: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def build(self, announcements: List[Dict], details: Optional[Mapping[int, Mapping]] = None) -> None:
+        """
+        Построение матрицы нормализованных векторов каталога.
+
+        Args:
+            announcements: Объявления в виде словарей
+            details: Длинные поля объявлений {id: {поле: текст}}, которых нет в самих
+                объявлениях; индекс их не хранит
+        """
+        details = details or {}
+        texts = {ann['id']: announcement_text(ann, details.get(ann['id'])) for ann in announcements}
+        checksums = {ann_id: zlib.crc32(text.encode('utf-8')) for ann_id, text in texts.items()}
+        missing = [
+            ann for ann in announcements
+            if self._vectors.get(ann['id'], (None,))[0] != checksums[ann['id']]
+        ]
+        if missing:
+            vectors = _normalize(await self.provider.embed([texts[ann['id']] for ann in missing]))
+            for ann, vector in zip(missing, vectors):
+                self._vectors[ann['id']] = (checksums[ann['id']], vector)
+
+        # Удаляем эмбеддинги объявлений, которых больше нет в каталоге
+        for ann_id in set(self._vectors) - set(checksums):
+            del self._vectors[ann_id]
+
+        if not announcements:
+            self._ids = np.zeros(0, dtype=np.int64)
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            return
+
+        self._ids = np.fromiter((ann['id'] for ann in announcements), dtype=np.int64, count=len(announcements))
+        self._matrix = np.vstack([self._vectors[ann['id']][1] for ann in announcements])
+
+    async def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Поиск k ближайших объявлений к запросу.
+
+        Args:
+            query: Текст запроса
+            k: Количество кандидатов
+
+        Returns:
+            Список пар (id объявления, косинусная близость) по убыванию близости
+        """
+        if not len(self._ids) or k <= 0:
+            return []
+
+        query_vector = _normalize(await self.provider.embed([query]))[0]
+        scores = self._matrix @ query_vector
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self._ids[i]), float(scores[i])) for i in top]
@@ -0,0 +1,544 @@
+import asyncio
+import datetime
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from config import Config
+from database.db import async_engine, get_async_db_session
+from database.models import FsmRecord
+from utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Состояние и данные одного ключа
+FsmRecordData = Tuple[Optional[str], Dict[str, Any]]
+
+
+def _state_name(state: StateType) -> Optional[str]:
+    """Имя состояния для хранения."""
+    return state.state if isinstance(state, State) else state
+
+
+def _state_group(state: Optional[str]) -> str:
+    """Группа состояний (AnnouncementForm, SearchForm и т.п.)."""
+    return state.split(':', 1)[0] if state else 'none'
+
+
+def _default_key_builder() -> KeyBuilder:
+    """Ключи включают ID бота, чтобы несколько ботов могли делить одно хранилище."""
+    return DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+
+
+class _MemoryRecord:
+    """Состояние, данные и время последнего обращения одного ключа."""
+
+    __slots__ = ('state', 'data', 'touched', 'size')
+
+    def __init__(self):
+        self.state: Optional[str] = None
+        self.data: Dict[str, Any] = {}
+        self.touched = time.monotonic()
+        self.size = 0
+
+    @property
+    def group(self) -> str:
+        """Группа состояний (AnnouncementForm, SearchForm и т.п.)."""
+        return _state_group(self.state)
+
+
+class TTLMemoryStorage(BaseStorage):
+    """
+    Хранилище FSM в памяти процесса с удалением брошенных состояний.
+
+    Состояние, к которому не обращались дольше времени простоя своей группы
+    (FSM_GROUP_TTLS, по умолчанию FSM_STATE_TTL), удаляется вместе с данными:
+    при чтении и периодической очисткой (cleanup_forever). Для каждой группы
+    считается число живых состояний и примерный объем их данных.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, group_ttls: Optional[Mapping[str, int]] = None):
+        """
+        Инициализация хранилища.
+
+        Args:
+            ttl: Время простоя по умолчанию (по умолчанию FSM_STATE_TTL)
+            group_ttls: Время простоя по группам состояний (по умолчанию FSM_GROUP_TTLS)
+        """
+        self.ttl = ttl or Config.FSM_STATE_TTL
+        self.group_ttls = dict(Config.FSM_GROUP_TTLS if group_ttls is None else group_ttls)
+        self._records: Dict[StorageKey, _MemoryRecord] = {}
+
+    def _expired(self, record: _MemoryRecord, now: float) -> bool:
+        """Проверка простоя записи."""
+        return now - record.touched > self.group_ttls.get(record.group, self.ttl)
+
+    def _get(self, key: StorageKey) -> Optional[_MemoryRecord]:
+        """Живая запись ключа с отметкой обращения."""
+        record = self._records.get(key)
+        if record is None:
+            return None
+        now = time.monotonic()
+        if self._expired(record, now):
+            del self._records[key]
+            metrics.increment('fsm.evicted')
+            return None
+        record.touched = now
+        return record
+
+    def _put(self, key: StorageKey) -> _MemoryRecord:
+        """Запись ключа для изменения (создается при отсутствии)."""
+        record = self._get(key)
+        if record is None:
+            record = self._records[key] = _MemoryRecord()
+        return record
+
+    def _drop_if_empty(self, key: StorageKey, record: _MemoryRecord) -> None:
+        """Удаление записи без состояния и данных (после state.clear())."""
+        if record.state is None and not record.data:
+            self._records.pop(key, None)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = self._put(key)
+        record.state = _state_name(state)
+        self._drop_if_empty(key, record)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self._get(key)
+        return record.state if record else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        record = self._put(key)
+        record.data = dict(data)
+        # Примерный объем по JSON-представлению: документы, видео и длинные тексты формы
+        record.size = len(json.dumps(record.data, ensure_ascii=False, default=str).encode()) if data else 0
+        self._drop_if_empty(key, record)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self._get(key)
+        return dict(record.data) if record else {}
+
+    def sweep(self) -> int:
+        """
+        Удаление всех просроченных записей.
+
+        Returns:
+            Количество удаленных записей
+        """
+        now = time.monotonic()
+        expired = [key for key, record in self._records.items() if self._expired(record, now)]
+        for key in expired:
+            del self._records[key]
+        if expired:
+            metrics.increment('fsm.evicted', len(expired))
+        return len(expired)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Живые состояния по группам.
+
+        Returns:
+            {группа: {'states': количество, 'bytes': примерный объем данных}}
+        """
+        result: Dict[str, Dict[str, int]] = {}
+        for record in self._records.values():
+            group = result.setdefault(record.group, {'states': 0, 'bytes': 0})
+            group['states'] += 1
+            group['bytes'] += record.size
+        return result
+
+    async def cleanup_forever(self, interval: Optional[float] = None) -> None:
+        """
+        Периодическое удаление брошенных состояний и публикация статистики в метрики.
+
+        Args:
+            interval: Интервал между проходами (по умолчанию FSM_CLEANUP_INTERVAL)
+        """
+        reported = set()
+        while True:
+            await asyncio.sleep(interval or Config.FSM_CLEANUP_INTERVAL)
+            removed = self.sweep()
+            stats = self.stats()
+            # Группы, в которых не осталось состояний, обнуляются
+            for group in reported | set(stats):
+                group_stats = stats.get(group, {'states': 0, 'bytes': 0})
+                metrics.gauge(f'fsm.{group}.states', group_stats['states'])
+                metrics.gauge(f'fsm.{group}.bytes', group_stats['bytes'])
+            reported |= set(stats)
+            if removed:
+                logger.info(f"Удалено брошенных состояний FSM: {removed}, осталось: {stats}")
+
+    async def close(self) -> None:
+        self._records.clear()
+
+
+class SQLStorage(BaseStorage):
+    """
+    Хранилище FSM в таблице fsm_states.
+
+    Состояние и данные ключа лежат в одной строке и читаются одним запросом.
+    Каждая запись продлевает срок жизни на время простоя группы состояния
+    (FSM_GROUP_TTLS, по умолчанию ttl); просроченные строки не читаются
+    и удаляются фоновой очисткой (cleanup_forever).
+    """
+
+    def __init__(self, key_builder: Optional[KeyBuilder] = None, ttl: Optional[int] = None,
+                 group_ttls: Optional[Mapping[str, int]] = None):
+        """
+        Инициализация хранилища.
+
+        Args:
+            key_builder: Построитель ключей (по умолчанию с ID бота)
+            ttl: Время жизни состояния с последнего изменения (по умолчанию FSM_STATE_TTL)
+            group_ttls: Время жизни по группам состояний (по умолчанию FSM_GROUP_TTLS)
+        """
+        self.key_builder = key_builder or _default_key_builder()
+        self.ttl = ttl or Config.FSM_STATE_TTL
+        self.group_ttls = dict(Config.FSM_GROUP_TTLS if group_ttls is None else group_ttls)
+
+    def _expires_at(self, state: Optional[str]) -> datetime.datetime:
+        """Срок жизни записи с этим состоянием, изменяемой сейчас."""
+        ttl = self.group_ttls.get(_state_group(state), self.ttl)
+        return datetime.datetime.utcnow() + datetime.timedelta(seconds=ttl)
+
+    @staticmethod
+    def _upsert(rows: Iterable[Dict[str, Any]], columns: Iterable[str]):
+        """
+        INSERT ... ON DUPLICATE KEY UPDATE для MySQL или ON CONFLICT для SQLite.
+
+        Args:
+            rows: Значения строк
+            columns: Колонки, обновляемые у существующей строки
+        """
+        rows = list(rows)
+        if async_engine.dialect.name == 'mysql':
+            stmt = mysql_insert(FsmRecord).values(rows)
+            return stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in columns})
+
+        stmt = sqlite_insert(FsmRecord).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[FsmRecord.storage_key],
+            set_={column: stmt.excluded[column] for column in columns}
+        )
+
+    async def _write(self, key: StorageKey, column: str, value: Any) -> None:
+        """Запись одной колонки; пустая строка (без состояния и данных) удаляется."""
+        storage_key = self.key_builder.build(key)
+        async with get_async_db_session() as session:
+            state = value if column == 'state' else None
+            if column == 'data' and self.group_ttls:
+                # Срок жизни зависит от группы текущего состояния ключа
+                state = await session.scalar(
+                    select(FsmRecord.state).where(FsmRecord.storage_key == storage_key)
+                )
+            await session.execute(self._upsert(
+                [{'storage_key': storage_key, column: value, 'expires_at': self._expires_at(state)}],
+                (column, 'expires_at')
+            ))
+            if value is None:
+                await session.execute(delete(FsmRecord).where(
+                    FsmRecord.storage_key == storage_key,
+                    FsmRecord.state.is_(None),
+                    FsmRecord.data.is_(None)
+                ))
+
+    async def get_many(self, keys: Iterable[StorageKey]) -> Dict[StorageKey, FsmRecordData]:
+        """
+        Чтение состояний нескольких ключей одним запросом.
+
+        Args:
+            keys: Ключи хранилища
+
+        Returns:
+            Состояние и данные по каждому ключу (отсутствующие - (None, {}))
+        """
+        keys = list(keys)
+        by_storage_key = {self.key_builder.build(key): key for key in keys}
+        result = {key: (None, {}) for key in keys}
+        if not keys:
+            return result
+
+        async with get_async_db_session() as session:
+            rows = await session.execute(
+                select(FsmRecord.storage_key, FsmRecord.state, FsmRecord.data).where(
+                    FsmRecord.storage_key.in_(by_storage_key),
+                    FsmRecord.expires_at > datetime.datetime.utcnow()
+                )
+            )
+            for storage_key, state, data in rows:
+                result[by_storage_key[storage_key]] = (state, dict(data or {}))
+        return result
+
+    async def set_many(self, records: Mapping[StorageKey, FsmRecordData]) -> None:
+        """
+        Запись состояний и данных нескольких ключей одним запросом.
+
+        Args:
+            records: Состояние и данные по каждому ключу
+        """
+        if not records:
+            return
+        rows = [
+            {
+                'storage_key': self.key_builder.build(key),
+                'state': _state_name(state),
+                'data': dict(data) or None,
+                'expires_at': self._expires_at(_state_name(state)),
+            }
+            for key, (state, data) in records.items()
+        ]
+        async with get_async_db_session() as session:
+            await session.execute(self._upsert(rows, ('state', 'data', 'expires_at')))
+
+    async def get_record(self, key: StorageKey) -> FsmRecordData:
+        """
+        Состояние и данные ключа одним запросом.
+
+        Args:
+            key: Ключ хранилища
+
+        Returns:
+            Кортеж (состояние, данные)
+        """
+        return (await self.get_many([key]))[key]
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._write(key, 'state', _state_name(state))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self.get_record(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(key, 'data', dict(data) or None)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self.get_record(key)
+        return data
+
+    async def update_data(self, key: StorageKey, data: Mapping[str, Any]) -> Dict[str, Any]:
+        """Чтение, объединение и запись данных в одной транзакции с блокировкой строки."""
+        storage_key = self.key_builder.build(key)
+        now = datetime.datetime.utcnow()
+        async with get_async_db_session() as session:
+            row = (await session.execute(
+                select(FsmRecord.state, FsmRecord.data, FsmRecord.expires_at)
+                .where(FsmRecord.storage_key == storage_key)
+                .with_for_update()
+            )).first()
+            current = dict(row.data or {}) if row is not None and row.expires_at > now else {}
+            current.update(data)
+            state = row.state if row is not None else None
+            await session.execute(self._upsert(
+                [{'storage_key': storage_key, 'data': current or None, 'expires_at': self._expires_at(state)}],
+                ('data', 'expires_at')
+            ))
+        return current.copy()
+
+    async def purge_expired(self) -> int:
+        """
+        Удаление просроченных и пустых записей.
+
+        Returns:
+            Количество удаленных записей
+        """
+        async with get_async_db_session() as session:
+            result = await session.execute(delete(FsmRecord).where(or_(
+                FsmRecord.expires_at <= datetime.datetime.utcnow(),
+                (FsmRecord.state.is_(None)) & (FsmRecord.data.is_(None))
+            )))
+        return result.rowcount
+
+    async def cleanup_forever(self, interval: Optional[float] = None) -> None:
+        """
+        Периодическое удаление просроченных записей.
+
+        Args:
+            interval: Интервал между проходами (по умолчанию FSM_CLEANUP_INTERVAL)
+        """
+        while True:
+            await asyncio.sleep(interval or Config.FSM_CLEANUP_INTERVAL)
+            try:
+                removed = await self.purge_expired()
+                if removed:
+                    logger.info(f"Удалено просроченных состояний FSM: {removed}")
+            except Exception as e:
+                logger.error(f"Ошибка очистки состояний FSM: {e}")
+
+    async def close(self) -> None:
+        # Движок БД общий с остальным приложением и закрывается вместе с ним
+        pass
+
+
+class RedisFsmStorage(BaseStorage):
+    """
+    Хранилище FSM в Redis.
+
+    Ключ хранится как хэш с полями state и data; оба поля читаются одной
+    командой HMGET, а запись и продление TTL идут одним конвейером. TTL ключа -
+    время простоя группы его состояния (FSM_GROUP_TTLS, по умолчанию ttl).
+    Принимает любой клиент с интерфейсом redis.asyncio.Redis, в том числе
+    встраиваемую замену вроде fakeredis.FakeAsyncRedis.
+    """
+
+    def __init__(self, redis, key_builder: Optional[KeyBuilder] = None, ttl: Optional[int] = None,
+                 group_ttls: Optional[Mapping[str, int]] = None):
+        """
+        Инициализация хранилища.
+
+        Args:
+            redis: Клиент redis.asyncio.Redis
+            key_builder: Построитель ключей (по умолчанию с ID бота)
+            ttl: Время жизни состояния с последнего изменения (по умолчанию FSM_STATE_TTL)
+            group_ttls: Время жизни по группам состояний (по умолчанию FSM_GROUP_TTLS)
+        """
+        self.redis = redis
+        self.key_builder = key_builder or _default_key_builder()
+        self.ttl = ttl or Config.FSM_STATE_TTL
+        self.group_ttls = dict(Config.FSM_GROUP_TTLS if group_ttls is None else group_ttls)
+
+    @classmethod
+    def from_url(cls, url: Optional[str] = None, **kwargs) -> 'RedisFsmStorage':
+        """
+        Создание хранилища по адресу Redis.
+
+        Args:
+            url: Адрес Redis (по умолчанию REDIS_URL)
+            **kwargs: Параметры хранилища
+
+        Returns:
+            Хранилище
+        """
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url or Config.REDIS_URL), **kwargs)
+
+    @staticmethod
+    def _decode(state, data) -> FsmRecordData:
+        """Разбор полей хэша."""
+        if isinstance(state, bytes):
+            state = state.decode()
+        return state, json.loads(data) if data else {}
+
+    def _queue_write(self, pipe, key: str, state: StateType, data: Optional[Mapping[str, Any]],
+                     current_state: Optional[str] = None) -> None:
+        """
+        Добавление в конвейер записи полей (None - поле не меняется) и продления TTL.
+
+        Args:
+            pipe: Конвейер Redis
+            key: Ключ Redis
+            state: Новое состояние ('' - удалить, None - не менять)
+            data: Новые данные (пустые - удалить, None - не менять)
+            current_state: Сохраненное состояние ключа, если state не меняется (для выбора TTL)
+        """
+        for field, value in (('state', _state_name(state)), ('data', data)):
+            if value is None:
+                continue
+            if field == 'data':
+                value = json.dumps(dict(value), ensure_ascii=False) if value else None
+            if value:
+                pipe.hset(key, field, value)
+            else:
+                pipe.hdel(key, field)
+        # Хэш без полей Redis удаляет сам
+        state = _state_name(state) if state is not None else current_state
+        pipe.expire(key, self.group_ttls.get(_state_group(state), self.ttl))
+
+    async def get_many(self, keys: Iterable[StorageKey]) -> Dict[StorageKey, FsmRecordData]:
+        """
+        Чтение состояний нескольких ключей за один обмен с Redis.
+
+        Args:
+            keys: Ключи хранилища
+
+        Returns:
+            Состояние и данные по каждому ключу (отсутствующие - (None, {}))
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hmget(self.key_builder.build(key), 'state', 'data')
+            replies = await pipe.execute()
+        return {key: self._decode(*reply) for key, reply in zip(keys, replies)}
+
+    async def set_many(self, records: Mapping[StorageKey, FsmRecordData]) -> None:
+        """
+        Запись состояний и данных нескольких ключей за один обмен с Redis.
+
+        Args:
+            records: Состояние и данные по каждому ключу
+        """
+        if not records:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key, (state, data) in records.items():
+                storage_key = self.key_builder.build(key)
+                pipe.delete(storage_key)
+                self._queue_write(pipe, storage_key, state or '', data)
+            await pipe.execute()
+
+    async def get_record(self, key: StorageKey) -> FsmRecordData:
+        """
+        Состояние и данные ключа одной командой.
+
+        Args:
+            key: Ключ хранилища
+
+        Returns:
+            Кортеж (состояние, данные)
+        """
+        return self._decode(*await self.redis.hmget(self.key_builder.build(key), 'state', 'data'))
+
+    async def _write(self, key: StorageKey, state: StateType, data: Optional[Mapping[str, Any]]) -> None:
+        """Запись полей ключа одной транзакцией."""
+        storage_key = self.key_builder.build(key)
+        current_state = None
+        if state is None and self.group_ttls:
+            # Данные без смены состояния: TTL выбирается по группе сохраненного состояния
+            current_state, _ = self._decode(await self.redis.hget(storage_key, 'state'), None)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._queue_write(pipe, storage_key, state, data, current_state)
+            await pipe.execute()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        # Пустая строка означает удаление поля (None в _queue_write - поле не трогать)
+        await self._write(key, state or '', None)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self.get_record(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(key, None, data)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self.get_record(key)
+        return data
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+def create_fsm_storage() -> BaseStorage:
+    """
+    Создание хранилища FSM по настройке FSM_STORAGE.
+
+    Returns:
+        TTLMemoryStorage, SQLStorage или RedisFsmStorage
+    """
+    if Config.FSM_STORAGE == 'sql':
+        return SQLStorage()
+    if Config.FSM_STORAGE == 'redis':
+        return RedisFsmStorage.from_url()
+    return TTLMemoryStorage()
@@ -0,0 +1,57 @@
+import logging
+import time
+from typing import List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+
+from database.db import get_async_db_session
+from database.models import Announcement
+from utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class FulltextSearch:
+    """
+    Полнотекстовый поиск объявлений средствами MySQL.
+
+    Использует FULLTEXT-индекс ft_announcements_text (парсер ngram) и
+    MATCH ... AGAINST в режиме естественного языка: MySQL сам считает
+    релевантность, поэтому стоимость поиска не растет линейно с каталогом
+    и не требует держать индекс в памяти бота.
+    """
+
+    # Колонки должны совпадать с колонками FULLTEXT-индекса
+    COLUMNS = (Announcement.bot_name, Announcement.task_solution, Announcement.included_features)
+
+    async def search(self, query: str, limit: int = 5, offset: int = 0) -> List[Tuple[int, float]]:
+        """
+        Поиск одобренных объявлений по релевантности.
+
+        Args:
+            query: Поисковый запрос
+            limit: Размер страницы
+            offset: Смещение страницы
+
+        Returns:
+            Список (ID объявления, релевантность) по убыванию релевантности
+        """
+        query = (query or '').strip()
+        if not query:
+            return []
+
+        relevance = match(*self.COLUMNS, against=query).in_natural_language_mode()
+        statement = (
+            select(Announcement.id, relevance.label('score'))
+            .where(Announcement.is_approved == True, relevance)
+            .order_by(relevance.desc(), Announcement.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        started = time.perf_counter()
+        async with get_async_db_session() as session:
+            rows = (await session.execute(statement)).all()
+        metrics.observe('search.fulltext.latency_ms', (time.perf_counter() - started) * 1000)
+        return [(row.id, float(row.score)) for row in rows]
@@ -0,0 +1,266 @@
+import asyncio
+import datetime
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Config
+from database.db import get_async_db_session
+from database.models import OutboxMessage
+from utils.metrics import metrics
+from .catalog import after_commit
+
+
+logger = logging.getLogger(__name__)
+
+# Статусы записей outbox
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+# Ошибки, которые не исправятся повтором (бот заблокирован, чат не найден и т.п.)
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest)
+
+
+@dataclass
+class OutboxEntry:
+    """Захваченная обработчиком запись outbox."""
+    id: int
+    kind: str
+    payload: Dict
+    progress: Dict = field(default_factory=dict)
+    attempts: int = 0
+
+    async def checkpoint(self) -> None:
+        """
+        Сохранение прогресса многошаговой отправки.
+
+        После повтора обработчик по progress пропускает уже выполненные шаги,
+        например не публикует текст объявления второй раз.
+        """
+        async with get_async_db_session() as session:
+            await session.execute(
+                update(OutboxMessage).where(OutboxMessage.id == self.id).values(progress=dict(self.progress))
+            )
+
+
+OutboxHandler = Callable[[Bot, OutboxEntry], Awaitable[None]]
+
+
+class Outbox:
+    """
+    Надежная очередь исходящих отправок в Telegram.
+
+    Записи добавляются в той же транзакции, что и изменение данных, поэтому
+    отправка не теряется при падении процесса между коммитом и сетью.
+    Фоновый обработчик забирает записи пачками, повторяет ошибки
+    с экспоненциальной задержкой и отмечает отправленные.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, poll_interval: Optional[float] = None,
+                 max_attempts: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None, lease: Optional[float] = None):
+        """
+        Инициализация очереди.
+
+        Args:
+            batch_size: Записей за один проход (по умолчанию OUTBOX_BATCH_SIZE)
+            poll_interval: Интервал опроса таблицы (по умолчанию OUTBOX_POLL_INTERVAL)
+            max_attempts: Попыток до пометки failed (по умолчанию OUTBOX_MAX_ATTEMPTS)
+            base_delay: Задержка перед первым повтором (по умолчанию OUTBOX_RETRY_BASE_DELAY)
+            max_delay: Максимальная задержка повтора (по умолчанию OUTBOX_RETRY_MAX_DELAY)
+            lease: Время, на которое запись закрепляется за обработчиком (по умолчанию OUTBOX_LEASE)
+        """
+        self.batch_size = batch_size or Config.OUTBOX_BATCH_SIZE
+        self.poll_interval = poll_interval or Config.OUTBOX_POLL_INTERVAL
+        self.max_attempts = max_attempts or Config.OUTBOX_MAX_ATTEMPTS
+        self.base_delay = base_delay or Config.OUTBOX_RETRY_BASE_DELAY
+        self.max_delay = max_delay or Config.OUTBOX_RETRY_MAX_DELAY
+        self.lease = lease or Config.OUTBOX_LEASE
+        self._handlers: Dict[str, OutboxHandler] = {'message.send': self._send_message}
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: OutboxHandler) -> None:
+        """
+        Регистрация обработчика записей заданного типа.
+
+        Args:
+            kind: Тип записи
+            handler: Корутина handler(bot, entry), выбрасывающая исключение при ошибке отправки
+        """
+        self._handlers[kind] = handler
+
+    def enqueue(self, session: AsyncSession, kind: str, payload: Dict, dedup_key: Optional[str] = None) -> None:
+        """
+        Добавление записи в текущую транзакцию.
+
+        Args:
+            session: Сессия базы данных
+            kind: Тип записи
+            payload: Данные для отправки (JSON)
+            dedup_key: Уникальный ключ, защищающий от повторной постановки той же отправки
+        """
+        session.add(OutboxMessage(kind=kind, payload=payload, dedup_key=dedup_key))
+        after_commit(session, self.wake)
+        metrics.increment('outbox.enqueued')
+
+    def enqueue_message(self, session: AsyncSession, chat_id: int, text: str,
+                        reply_markup: Optional[InlineKeyboardMarkup] = None,
+                        dedup_key: Optional[str] = None, **params) -> None:
+        """
+        Постановка в очередь текстового сообщения.
+
+        Args:
+            session: Сессия базы данных
+            chat_id: ID чата
+            text: Текст сообщения
+            reply_markup: Клавиатура
+            dedup_key: Уникальный ключ отправки
+            **params: Параметры send_message (parse_mode, message_thread_id и т.п.)
+        """
+        payload = {'chat_id': chat_id, 'text': text, 'params': params}
+        if reply_markup is not None:
+            payload['reply_markup'] = reply_markup.model_dump(exclude_none=True)
+        self.enqueue(session, 'message.send', payload, dedup_key)
+
+    @staticmethod
+    async def _send_message(bot: Bot, entry: OutboxEntry) -> None:
+        """Отправка текстового сообщения из outbox."""
+        payload = entry.payload
+        reply_markup = payload.get('reply_markup')
+        await bot.send_message(
+            payload['chat_id'],
+            payload['text'],
+            reply_markup=InlineKeyboardMarkup.model_validate(reply_markup) if reply_markup else None,
+            **payload.get('params', {})
+        )
+
+    def wake(self) -> None:
+        """Немедленный запуск обработки (вызывается после коммита новых записей)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim(self) -> List[OutboxEntry]:
+        """
+        Захват пачки готовых к отправке записей.
+
+        Записи закрепляются за обработчиком переносом available_at на время
+        аренды: при падении процесса они снова станут доступны после ее истечения.
+        """
+        now = datetime.datetime.utcnow()
+        async with get_async_db_session() as session:
+            rows = (await session.scalars(
+                select(OutboxMessage).where(
+                    OutboxMessage.status == PENDING,
+                    OutboxMessage.available_at <= now
+                ).order_by(OutboxMessage.id).limit(self.batch_size).with_for_update(skip_locked=True)
+            )).all()
+
+            lease_until = now + datetime.timedelta(seconds=self.lease)
+            for row in rows:
+                row.available_at = lease_until
+
+            return [
+                OutboxEntry(id=row.id, kind=row.kind, payload=row.payload,
+                            progress=dict(row.progress or {}), attempts=row.attempts)
+                for row in rows
+            ]
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Экспоненциальная задержка повтора со случайным разбросом."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _deliver(self, bot: Bot, entry: OutboxEntry) -> Dict:
+        """
+        Отправка одной записи.
+
+        Returns:
+            Изменения записи для пакетного UPDATE
+        """
+        now = datetime.datetime.utcnow()
+        attempts = entry.attempts + 1
+        handler = self._handlers.get(entry.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"Нет обработчика outbox для типа {entry.kind}")
+            await handler(bot, entry)
+        except Exception as e:
+            permanent = isinstance(e, PERMANENT_ERRORS) or attempts >= self.max_attempts
+            metrics.increment('outbox.failed' if permanent else 'outbox.retried')
+            logger.error(f"Ошибка отправки outbox #{entry.id} ({entry.kind}), попытка {attempts}: {e}")
+            return {
+                'id': entry.id,
+                'status': FAILED if permanent else PENDING,
+                'attempts': attempts,
+                'last_error': str(e)[:1000],
+                'progress': entry.progress,
+                'available_at': now + datetime.timedelta(seconds=self._retry_delay(attempts)),
+            }
+
+        metrics.increment('outbox.sent')
+        return {'id': entry.id, 'status': SENT, 'attempts': attempts, 'progress': entry.progress, 'sent_at': now}
+
+    async def drain(self, bot: Bot) -> int:
+        """
+        Один проход обработки: захват пачки, отправка, сохранение результатов.
+
+        Args:
+            bot: Объект бота
+
+        Returns:
+            Количество обработанных записей
+        """
+        entries = await self._claim()
+        if not entries:
+            return 0
+
+        semaphore = asyncio.Semaphore(Config.NOTIFY_CONCURRENCY)
+
+        async def deliver(entry: OutboxEntry) -> Dict:
+            async with semaphore:
+                return await self._deliver(bot, entry)
+
+        results = await asyncio.gather(*(deliver(entry) for entry in entries))
+
+        # Результаты пачки сохраняются одним UPDATE по первичному ключу
+        async with get_async_db_session() as session:
+            await session.execute(update(OutboxMessage), results)
+        return len(entries)
+
+    async def run_forever(self, bot: Bot) -> None:
+        """
+        Фоновая обработка outbox.
+
+        Args:
+            bot: Объект бота
+        """
+        self._wakeup = asyncio.Event()
+        while True:
+            # Сигнал, пришедший во время прохода, не теряется: ожидание ниже сразу завершится
+            self._wakeup.clear()
+            try:
+                processed = await self.drain(bot)
+            except Exception as e:
+                logger.error(f"Ошибка обработки outbox: {e}")
+                processed = 0
+
+            # Полная пачка - возможно, есть еще записи, продолжаем сразу
+            if processed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Глобальная очередь исходящих отправок
+outbox = Outbox()
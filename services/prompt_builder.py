@@ -0,0 +1,209 @@
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken необязателен
+    tiktoken = None
+
+
+SEARCH_SYSTEM_PROMPT = """Ты - эксперт по AI-решениям. Помогаешь пользователям найти подходящие AI-боты и решения.
+
+Тебе передается каталог AI-решений (по одному JSON-объекту в строке: id, name, description) и запрос пользователя.
+Проанализируй запрос пользователя и найди наиболее подходящие AI-решения из каталога.
+
+Верни ответ СТРОГО в формате JSON:
+{
+    "found": true/false,
+    "results": [
+        {
+            "id": номер_id,
+            "bot_name": "название",
+            "task_solution": "описание задачи и решения"
+        }
+    ],
+    "explanation": "объяснение выбора"
+}
+
+Требования:
+1. Если ничего не найдено, верни "found": false и пустой массив results
+2. Сортируй результаты по relevance_score (от большего к меньшему)
+3. Включай только решения с relevance_score >= 6
+4. Максимум 5 результатов
+5. Объяснения должны быть краткими (до 50 символов)
+6. Отвечай ТОЛЬКО JSON, без дополнительного текста"""
+
+SHORT_DESCRIPTIONS_SYSTEM_PROMPT = """Ты эксперт по созданию кратких и привлекательных описаний AI-решений.
+
+Создай короткие описания (максимум 60 символов) для переданных AI-решений
+(по одному JSON-объекту в строке: id, name, description).
+Описание должно быть понятным и привлекательным для пользователя.
+
+Верни результат в формате JSON:
+{
+    "1": "короткое описание для ID 1",
+    "2": "короткое описание для ID 2"
+}
+
+Требования:
+- Максимум 60 символов
+- Понятно и привлекательно
+- Отражает суть решения
+- На русском языке"""
+
+_ENCODING = None
+_WORD_RE = re.compile(r'\w+|[^\w\s]')
+
+
+def count_tokens(text: str) -> int:
+    """
+    Локальный подсчет токенов текста.
+
+    Использует tiktoken, если он установлен, иначе оценивает количество
+    токенов по длине слов (кириллица кодируется плотнее латиницы).
+
+    Args:
+        text: Текст
+
+    Returns:
+        Количество токенов
+    """
+    global _ENCODING
+    if tiktoken is not None:
+        if _ENCODING is None:
+            _ENCODING = tiktoken.get_encoding('o200k_base')
+        return len(_ENCODING.encode(text))
+
+    tokens = 0
+    for word in _WORD_RE.findall(text):
+        chars_per_token = 4 if word.isascii() else 3
+        tokens += -(-len(word) // chars_per_token)
+    return tokens
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    Обрезка текста по границе слова.
+
+    Args:
+        text: Исходный текст
+        max_chars: Максимальная длина
+
+    Returns:
+        Текст длиной не более max_chars символов
+    """
+    text = ' '.join((text or '').split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1].rsplit(' ', 1)[0]
+    return cut + '…'
+
+
+@dataclass
+class Prompt:
+    """Собранный промпт и его характеристики."""
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    build_ms: float
+    candidates: int
+
+
+class PromptBuilder:
+    """Построитель компактных промптов с ограничением по токенам."""
+
+    def __init__(self, token_budget: int = 3000, description_chars: int = 300):
+        """
+        Инициализация построителя.
+
+        Args:
+            token_budget: Максимальное количество токенов промпта
+            description_chars: Максимальная длина описания решения в каталоге
+        """
+        self.token_budget = token_budget
+        self.description_chars = description_chars
+        self._search_system_tokens = count_tokens(SEARCH_SYSTEM_PROMPT)
+        self._short_system_tokens = count_tokens(SHORT_DESCRIPTIONS_SYSTEM_PROMPT)
+
+    def _catalog_line(self, announcement: Dict) -> str:
+        """Компактная JSON-строка объявления без отступов."""
+        return json.dumps({
+            'id': announcement['id'],
+            'name': announcement['bot_name'],
+            'description': truncate_text(announcement['task_solution'], self.description_chars)
+        }, ensure_ascii=False, separators=(',', ':'))
+
+    def _fit_catalog(self, announcements: List[Dict], reserved_tokens: int) -> List[str]:
+        """
+        Отбор строк каталога в пределах бюджета токенов.
+
+        Объявления перебираются в порядке релевантности, а в промпт попадают
+        в порядке id, чтобы одинаковые наборы давали одинаковый префикс
+        и срабатывало кеширование промптов на стороне провайдера.
+        """
+        budget = self.token_budget - reserved_tokens
+        selected = []
+        for announcement in announcements:
+            line = self._catalog_line(announcement)
+            line_tokens = count_tokens(line) + 1
+            if line_tokens > budget:
+                break
+            budget -= line_tokens
+            selected.append((announcement['id'], line))
+        selected.sort(key=lambda item: item[0])
+        return [line for _, line in selected]
+
+    def build_search_prompt(self, user_query: str, candidates: List[Dict]) -> Prompt:
+        """
+        Промпт для ранжирования кандидатов по запросу пользователя.
+
+        Args:
+            user_query: Запрос пользователя
+            candidates: Кандидаты в порядке убывания релевантности
+
+        Returns:
+            Собранный промпт
+        """
+        started = time.perf_counter()
+        query_block = f'Запрос пользователя: "{user_query}"'
+        reserved = self._search_system_tokens + count_tokens(query_block) + 16
+        lines = self._fit_catalog(candidates, reserved)
+
+        # Каталог идет перед запросом: запрос меняется чаще всего, поэтому он в конце
+        user_content = 'Каталог AI-решений:\n' + '\n'.join(lines) + '\n\n' + query_block
+        messages = [
+            {'role': 'system', 'content': SEARCH_SYSTEM_PROMPT},
+            {'role': 'user', 'content': user_content}
+        ]
+        return Prompt(
+            messages=messages,
+            prompt_tokens=self._search_system_tokens + count_tokens(user_content),
+            build_ms=(time.perf_counter() - started) * 1000,
+            candidates=len(lines)
+        )
+
+    def build_short_descriptions_prompt(self, announcements: List[Dict]) -> Prompt:
+        """
+        Промпт для генерации коротких описаний.
+
+        Args:
+            announcements: Список объявлений
+
+        Returns:
+            Собранный промпт
+        """
+        started = time.perf_counter()
+        lines = self._fit_catalog(announcements, self._short_system_tokens + 16)
+        user_content = 'AI-решения:\n' + '\n'.join(lines)
+        messages = [
+            {'role': 'system', 'content': SHORT_DESCRIPTIONS_SYSTEM_PROMPT},
+            {'role': 'user', 'content': user_content}
+        ]
+        return Prompt(
+            messages=messages,
+            prompt_tokens=self._short_system_tokens + count_tokens(user_content),
+            build_ms=(time.perf_counter() - started) * 1000,
+            candidates=len(lines)
+        )
@@ -0,0 +1,207 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Sequence
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.metrics import metrics
+from .catalog import lookup
+
+if TYPE_CHECKING:
+    from .ai_search_service import AISearchService
+
+
+# Максимум результатов поиска без GPT
+KEYWORD_RESULTS_LIMIT = 5
+
+
+def keyword_result(results: Sequence[Mapping]) -> Dict:
+    """
+    Результат поиска по ключевым словам в формате smart_search.
+
+    Args:
+        results: Найденные объявления по убыванию релевантности
+
+    Returns:
+        Словарь с результатами поиска
+    """
+    results = list(results)
+    return {
+        'found': len(results) > 0,
+        'results': results,
+        'explanation': f'Найдено {len(results)} решений по ключевым словам' if results else 'Ничего не найдено'
+    }
+
+
+class SearchBackend(ABC):
+    """
+    Базовый класс поискового движка.
+
+    Поиск состоит из двух шагов: retrieve отбирает кандидатов из каталога,
+    rank упорядочивает их и формирует результат в формате smart_search.
+    explain описывает выдачу для логов и теневого сравнения.
+    """
+
+    name: str = 'base'
+
+    def __init__(self, service: 'AISearchService'):
+        """
+        Инициализация движка.
+
+        Args:
+            service: Сервис поиска (клиент OpenAI, индексы и кеши каталога)
+        """
+        self.service = service
+
+    @abstractmethod
+    async def retrieve(self, query: str, announcements: Sequence[Mapping],
+                       version: Optional[int] = None) -> Sequence[Mapping]:
+        """
+        Отбор кандидатов.
+
+        Args:
+            query: Запрос пользователя
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
+
+        Returns:
+            Кандидаты для ранжирования
+        """
+        pass
+
+    @abstractmethod
+    async def rank(self, query: str, candidates: Sequence[Mapping], announcements: Sequence[Mapping],
+                   version: Optional[int] = None) -> Dict:
+        """
+        Ранжирование кандидатов.
+
+        Args:
+            query: Запрос пользователя
+            candidates: Кандидаты, отобранные retrieve
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
+
+        Returns:
+            Словарь с результатами поиска в формате smart_search
+        """
+        pass
+
+    def explain(self, query: str, result: Dict) -> str:
+        """
+        Описание выдачи для логов.
+
+        Args:
+            query: Запрос пользователя
+            result: Результат поиска
+
+        Returns:
+            Строка с движком, ID найденных объявлений и пояснением
+        """
+        return f"{self.name}: '{query}' -> {result_ids(result)} ({result['explanation']})"
+
+    async def search(self, query: str, announcements: Sequence[Mapping], version: Optional[int] = None) -> Dict:
+        """
+        Поиск: отбор кандидатов и их ранжирование.
+
+        Args:
+            query: Запрос пользователя
+            announcements: Список всех одобренных объявлений
+            version: Версия снимка каталога
+
+        Returns:
+            Словарь с результатами поиска в формате smart_search
+        """
+        candidates = await self.retrieve(query, announcements, version)
+        return await self.rank(query, candidates, announcements, version)
+
+
+class GPTBackend(SearchBackend):
+    """Отбор кандидатов (эмбеддинги или FULLTEXT) и ранжирование GPT."""
+
+    name = 'gpt'
+
+    async def retrieve(self, query: str, announcements: Sequence[Mapping],
+                       version: Optional[int] = None) -> Sequence[Mapping]:
+        service = self.service
+        if not service.client:
+            raise CircuitOpenError("OPENAI_API_KEY не настроен")
+        if service.breaker.state == CircuitBreaker.OPEN:
+            # OpenAI недоступен: сразу отказываемся, не дожидаясь таймаутов
+            metrics.increment('ai.search.breaker_fallback')
+            raise CircuitOpenError("OpenAI временно недоступен")
+        return await service._retrieve_candidates(query, announcements, version)
+
+    async def rank(self, query: str, candidates: Sequence[Mapping], announcements: Sequence[Mapping],
+                   version: Optional[int] = None) -> Dict:
+        service = self.service
+        # Формируем компактный промпт в пределах бюджета токенов
+        prompt = service.prompt_builder.build_search_prompt(query, candidates)
+        gpt_response = await service._complete('search', prompt, max_tokens=1000)
+        return service._parse_gpt_response(gpt_response, announcements)
+
+
+class IndexBackend(SearchBackend):
+    """Локальный инвертированный индекс (BM25) в памяти."""
+
+    name = 'index'
+
+    async def retrieve(self, query: str, announcements: Sequence[Mapping],
+                       version: Optional[int] = None) -> Sequence[Mapping]:
+        if not query:
+            return []
+        service = self.service
+        await service._ensure_index(announcements, version)
+        hits = service.index.search(query, limit=KEYWORD_RESULTS_LIMIT)
+        return [service.index.get(ann_id) for ann_id, _ in hits]
+
+    async def rank(self, query: str, candidates: Sequence[Mapping], announcements: Sequence[Mapping],
+                   version: Optional[int] = None) -> Dict:
+        # Кандидаты уже упорядочены по BM25
+        return keyword_result(candidates)
+
+
+class FulltextBackend(SearchBackend):
+    """FULLTEXT-индекс MySQL (MATCH ... AGAINST)."""
+
+    name = 'fulltext'
+
+    async def retrieve(self, query: str, announcements: Sequence[Mapping],
+                       version: Optional[int] = None) -> Sequence[Mapping]:
+        hits = await self.service.fulltext.search(query, limit=KEYWORD_RESULTS_LIMIT)
+        return lookup(announcements, (ann_id for ann_id, _ in hits))
+
+    async def rank(self, query: str, candidates: Sequence[Mapping], announcements: Sequence[Mapping],
+                   version: Optional[int] = None) -> Dict:
+        # Кандидаты уже упорядочены по релевантности MySQL
+        return keyword_result(candidates)
+
+
+# Зарегистрированные движки поиска: название в конфигурации -> класс
+SEARCH_BACKENDS: Dict[str, Callable[['AISearchService'], SearchBackend]] = {
+    GPTBackend.name: GPTBackend,
+    IndexBackend.name: IndexBackend,
+    FulltextBackend.name: FulltextBackend,
+}
+
+
+def create_search_backend(name: str, service: 'AISearchService') -> SearchBackend:
+    """
+    Создание движка поиска по названию из конфигурации.
+
+    Args:
+        name: Название движка (ключ SEARCH_BACKENDS)
+        service: Сервис поиска
+
+    Returns:
+        Движок поиска
+
+    Raises:
+        ValueError: Движок с таким названием не зарегистрирован
+    """
+    factory = SEARCH_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Неизвестный движок поиска: {name}")
+    return factory(service)
+
+
+def result_ids(result: Dict) -> List[int]:
+    """ID найденных объявлений в порядке выдачи."""
+    return [ann['id'] for ann in result['results']] if result['found'] else []
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .search_index import tokenize
+
+
+def normalize_query(query: str) -> str:
+    """
+    Нормализация поискового запроса для ключа кеша.
+
+    Регистр, пробелы, пунктуация, стоп-слова и словоформы не влияют
+    на результат: "Чат-бот для магазина" и "чат бот, магазин" совпадают.
+
+    Args:
+        query: Запрос пользователя
+
+    Returns:
+        Нормализованный запрос
+    """
+    terms = tokenize(query)
+    if not terms:
+        return ' '.join(query.lower().split())
+    return ' '.join(terms)
+
+
+class SearchResultCache:
+    """Ограниченный LRU-кеш результатов поиска с временем жизни записей."""
+
+    def __init__(self, max_size: int = 256, ttl: float = 600):
+        """
+        Инициализация кеша.
+
+        Args:
+            max_size: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Tuple[str, int], Tuple[float, Dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, query: str, version: int) -> Optional[Dict]:
+        """
+        Получение результата из кеша.
+
+        Args:
+            query: Запрос пользователя
+            version: Версия каталога
+
+        Returns:
+            Результат поиска или None
+        """
+        key = (normalize_query(query), version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return result
+
+    def put(self, query: str, version: int, result: Dict) -> None:
+        """
+        Сохранение результата в кеш.
+
+        Args:
+            query: Запрос пользователя
+            version: Версия каталога, для которой получен результат
+            result: Результат поиска
+        """
+        key = (normalize_query(query), version)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def invalidate(self, *_) -> None:
+        """Очистка кеша (вызывается при изменении каталога)."""
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Счетчики работы кеша.
+
+        Returns:
+            Словарь с количеством попаданий, промахов, вытеснений и размером кеша
+        """
+        with self._lock:
+            return {**self._stats, 'size': len(self._entries)}
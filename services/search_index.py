@@ -0,0 +1,248 @@
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+# Поля объявления, попадающие в индекс, и их вес при подсчете частоты термина.
+# Длинные поля (состав, требования, сложность) в каталоге не хранятся:
+# при построении индекса они читаются из БД и не остаются в памяти
+FIELD_WEIGHTS: Dict[str, float] = {
+    'bot_name': 3.0,
+    'task_solution': 2.0,
+    'included_features': 1.0,
+    'client_requirements': 0.5,
+    'complexity': 0.5,
+}
+
+STOP_WORDS = frozenset("""
+а без более бы был была были было быть в вам вас весь во вот все всего всех вы где да даже для до его ее ей ему если
+есть еще же за здесь и из или им их к как какая какой когда кто ли либо мне может мы на над надо наш не него нее нет ни
+них но ну о об однако он она они оно от очень по под при про с со так также такой там те тем то того тоже той только
+том ты у уже хоть чего чей чем что чтобы чье чья эта эти это этот я
+нужен нужна нужно нужны хочу ищу найти подобрать помогите пожалуйста
+""".split())
+
+_TOKEN_RE = re.compile(r'[0-9a-zа-я]+')
+_CYRILLIC_RE = re.compile(r'[а-я]')
+
+
+class RussianStemmer:
+    """Стеммер Портера (Snowball) для русского языка."""
+
+    _PERFECTIVE_GERUND = re.compile(r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$')
+    _REFLEXIVE = re.compile(r'(с[яь])$')
+    _ADJECTIVE = re.compile(r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|ую|юю|ая|яя|ою|ею)$')
+    _PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+    _VERB = re.compile(
+        r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)'
+        r'|((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+    )
+    _NOUN = re.compile(
+        r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+    )
+    _RV = re.compile(r'^(.*?[аеиоуыэюя])(.*)$')
+    _DERIVATIONAL = re.compile(r'.*[^аеиоуыэюя]+[аеиоуыэюя].*ость?$')
+    _DER = re.compile(r'ость?$')
+    _SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+    _I = re.compile(r'и$')
+    _SOFT_SIGN = re.compile(r'ь$')
+    _NN = re.compile(r'нн$')
+
+    def __init__(self):
+        """Инициализация стеммера с кешем уже обработанных слов."""
+        self._cache: Dict[str, str] = {}
+
+    def stem(self, word: str) -> str:
+        """
+        Получение основы слова.
+
+        Args:
+            word: Слово в нижнем регистре
+
+        Returns:
+            Основа слова
+        """
+        cached = self._cache.get(word)
+        if cached is not None:
+            return cached
+
+        stem = self._stem(word)
+        if len(self._cache) < 100_000:
+            self._cache[word] = stem
+        return stem
+
+    def _stem(self, word: str) -> str:
+        """Применение шагов алгоритма к области RV слова."""
+        if not _CYRILLIC_RE.search(word):
+            return word
+
+        match = self._RV.match(word)
+        if not match:
+            return word
+        start, rv = match.groups()
+        if not rv:
+            return word
+
+        # Шаг 1: деепричастия, возвратные, прилагательные, глаголы, существительные
+        temp = self._PERFECTIVE_GERUND.sub('', rv, 1)
+        if temp == rv:
+            rv = self._REFLEXIVE.sub('', rv, 1)
+            temp = self._ADJECTIVE.sub('', rv, 1)
+            if temp != rv:
+                rv = self._PARTICIPLE.sub('', temp, 1)
+            else:
+                temp = self._VERB.sub('', rv, 1)
+                rv = self._NOUN.sub('', rv, 1) if temp == rv else temp
+        else:
+            rv = temp
+
+        # Шаг 2: окончание "и"
+        rv = self._I.sub('', rv, 1)
+
+        # Шаг 3: словообразовательные суффиксы
+        if self._DERIVATIONAL.match(rv):
+            rv = self._DER.sub('', rv, 1)
+
+        # Шаг 4: превосходная степень, двойное "н", мягкий знак
+        temp = self._SOFT_SIGN.sub('', rv, 1)
+        if temp == rv:
+            rv = self._SUPERLATIVE.sub('', rv, 1)
+            rv = self._NN.sub('н', rv, 1)
+        else:
+            rv = temp
+
+        return start + rv
+
+
+_stemmer = RussianStemmer()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Разбиение текста на нормализованные термины.
+
+    Текст приводится к нижнему регистру, "ё" заменяется на "е",
+    стоп-слова отбрасываются, остальные слова приводятся к основе.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        Список терминов в порядке появления
+    """
+    if not text:
+        return []
+
+    words = _TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+    return [_stemmer.stem(word) for word in words if word not in STOP_WORDS]
+
+
+class SearchIndex:
+    """Инвертированный индекс объявлений с ранжированием BM25."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, field_weights: Optional[Dict[str, float]] = None):
+        """
+        Инициализация пустого индекса.
+
+        Args:
+            k1: Параметр насыщения частоты термина
+            b: Параметр нормализации по длине документа
+            field_weights: Веса полей объявления
+        """
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._idf: Dict[str, float] = {}
+        self._norms: List[float] = []
+        self._ids: List[int] = []
+        self._docs: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, announcements: Iterable[Dict], details: Optional[Mapping[int, Mapping]] = None) -> None:
+        """
+        Построение индекса по списку объявлений.
+
+        Args:
+            announcements: Объявления в виде словарей
+            details: Длинные поля объявлений {id: {поле: текст}}, которых нет в самих
+                объявлениях; индекс их не хранит
+        """
+        postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        lengths: List[float] = []
+        ids: List[int] = []
+        docs: Dict[int, Dict] = {}
+
+        for doc_idx, ann in enumerate(announcements):
+            frequencies: Dict[str, float] = defaultdict(float)
+            length = 0.0
+            extra = details.get(ann['id'], {}) if details else {}
+            for field, weight in self.field_weights.items():
+                terms = tokenize(extra[field] if field in extra else ann.get(field))
+                for term in terms:
+                    frequencies[term] += weight
+                length += weight * len(terms)
+
+            for term, tf in frequencies.items():
+                postings[term].append((doc_idx, tf))
+            lengths.append(length)
+            ids.append(ann['id'])
+            docs[ann['id']] = ann
+
+        total = len(ids)
+        avg_length = (sum(lengths) / total) if total else 0.0
+
+        # Знаменатель BM25 зависит только от длины документа, считаем его заранее
+        self._norms = [
+            self.k1 * (1 - self.b + self.b * (length / avg_length if avg_length else 0.0))
+            for length in lengths
+        ]
+        self._idf = {
+            term: math.log(1 + (total - len(docs_list) + 0.5) / (len(docs_list) + 0.5))
+            for term, docs_list in postings.items()
+        }
+        self._postings = dict(postings)
+        self._ids = ids
+        self._docs = docs
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        Поиск объявлений по запросу.
+
+        Стоимость поиска пропорциональна числу вхождений терминов запроса,
+        а не размеру каталога.
+
+        Args:
+            query: Текст запроса
+            limit: Максимальное количество результатов
+
+        Returns:
+            Список пар (id объявления, релевантность) по убыванию релевантности
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            term_postings = self._postings.get(term)
+            if not term_postings:
+                continue
+            idf = self._idf[term]
+            for doc_idx, tf in term_postings:
+                scores[doc_idx] += idf * tf * (self.k1 + 1) / (tf + self._norms[doc_idx])
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(self._ids[doc_idx], score) for doc_idx, score in best]
+
+    def get(self, announcement_id: int) -> Optional[Dict]:
+        """
+        Получение проиндексированного объявления по ID.
+
+        Args:
+            announcement_id: ID объявления
+
+        Returns:
+            Словарь объявления или None
+        """
+        return self._docs.get(announcement_id)
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update
+
+from database.db import get_async_db_session
+from database.models import Announcement
+from .ai_search_service import AISearchService
+from .catalog import catalog, after_commit
+
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина сохраняемого короткого описания (размер колонки)
+SHORT_DESCRIPTION_MAX_LENGTH = 255
+
+
+class ShortDescriptionService:
+    """Генерация и сохранение коротких описаний объявлений пачками."""
+
+    def __init__(self, ai_search: AISearchService, batch_size: int = 20, flush_delay: float = 2.0):
+        """
+        Инициализация сервиса.
+
+        Args:
+            ai_search: Сервис AI-поиска для обращения к GPT
+            batch_size: Количество объявлений в одном запросе к модели
+            flush_delay: Задержка перед генерацией, чтобы собрать одобрения в одну пачку (секунд)
+        """
+        self.ai_search = ai_search
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self._pending: Dict[int, Dict] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def generate(self, announcements: List[Dict]) -> Dict[int, str]:
+        """
+        Генерация коротких описаний пачками по batch_size объявлений.
+
+        Пачки, для которых модель вернула ошибку, пропускаются:
+        их описания останутся пустыми до следующего заполнения.
+
+        Args:
+            announcements: Список объявлений
+
+        Returns:
+            Словарь {id: короткое_описание}
+        """
+        descriptions: Dict[int, str] = {}
+        for start in range(0, len(announcements), self.batch_size):
+            batch = announcements[start:start + self.batch_size]
+            try:
+                generated = await self.ai_search.generate_short_descriptions(batch)
+            except Exception as e:
+                logger.error(f"Ошибка генерации коротких описаний: {e}")
+                continue
+            for ann_id, description in generated.items():
+                descriptions[int(ann_id)] = description[:SHORT_DESCRIPTION_MAX_LENGTH]
+        return descriptions
+
+    @staticmethod
+    async def save(descriptions: Dict[int, str]) -> None:
+        """
+        Сохранение коротких описаний в БД одним запросом.
+
+        Args:
+            descriptions: Словарь {id: короткое_описание}
+        """
+        if not descriptions:
+            return
+
+        async with get_async_db_session() as session:
+            await session.execute(
+                update(Announcement),
+                [{'id': ann_id, 'short_description': text} for ann_id, text in descriptions.items()]
+            )
+            after_commit(session, lambda: catalog.patch(
+                {ann_id: {'short_description': text} for ann_id, text in descriptions.items()}
+            ))
+
+    def schedule(self, announcement: Dict) -> None:
+        """
+        Постановка одобренного объявления в очередь на генерацию описания.
+
+        Args:
+            announcement: Словарь объявления
+        """
+        if not self.ai_search.client:
+            return
+
+        self._pending[announcement['id']] = announcement
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        """Генерация описаний для накопленных объявлений после задержки."""
+        await asyncio.sleep(self.flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Генерация и сохранение описаний для всех объявлений в очереди."""
+        pending, self._pending = list(self._pending.values()), {}
+        if not pending:
+            return
+
+        try:
+            await self.save(await self.generate(pending))
+        except Exception as e:
+            logger.error(f"Ошибка сохранения коротких описаний: {e}")
+
+    async def backfill(self, limit: Optional[int] = None) -> int:
+        """
+        Заполнение коротких описаний для уже одобренных объявлений.
+
+        Args:
+            limit: Максимальное количество обрабатываемых объявлений
+
+        Returns:
+            Количество сохраненных описаний
+        """
+        saved = 0
+        last_id = 0
+        while limit is None or saved < limit:
+            async with get_async_db_session() as session:
+                rows = (await session.execute(
+                    select(Announcement.id, Announcement.bot_name, Announcement.task_solution).where(
+                        Announcement.is_approved == True,
+                        Announcement.short_description.is_(None),
+                        Announcement.id > last_id
+                    ).order_by(Announcement.id).limit(self.batch_size * 5)
+                )).all()
+
+            if not rows:
+                break
+
+            last_id = rows[-1].id
+            announcements = [
+                {'id': row.id, 'bot_name': row.bot_name, 'task_solution': row.task_solution}
+                for row in rows
+            ]
+            descriptions = await self.generate(announcements)
+            await self.save(descriptions)
+            saved += len(descriptions)
+            logger.info(f"Сохранено коротких описаний: {saved}")
+
+        return saved
@@ -1,3 +1,14 @@
 from .messages import messages, MessageLoader
+from .metrics import metrics, Metrics
+from .fanout import fan_out, FanoutResult
+from .media import send_attachments, build_media_groups
+from .rate_limit import OutboundRateLimiter, TokenBucket
+from .throttling import ThrottlingMiddleware
+from .single_flight import SingleFlight
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 
-__all__ = ['messages', 'MessageLoader']
+__all__ = [
+    'messages', 'MessageLoader', 'metrics', 'Metrics', 'fan_out', 'FanoutResult',
+    'send_attachments', 'build_media_groups', 'OutboundRateLimiter', 'TokenBucket',
+    'ThrottlingMiddleware', 'SingleFlight', 'CircuitBreaker', 'CircuitOpenError'
+]
@@ -0,0 +1,143 @@
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from .metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Вызов отклонен: внешний сервис считается недоступным."""
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи по доле ошибок в скользящем окне.
+
+    closed - вызовы проходят, результаты копятся в окне window секунд;
+    если вызовов не меньше min_calls и доля ошибок достигла failure_rate,
+    цепь размыкается. open - вызовы сразу отклоняются. Через open_seconds
+    цепь переходит в half_open: пропускается не более half_open_probes
+    пробных вызовов; успех замыкает цепь, ошибка снова размыкает.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    # Числовые коды состояний для метрик
+    _STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, window: float, min_calls: int, failure_rate: float,
+                 open_seconds: float, half_open_probes: int = 1):
+        """
+        Инициализация размыкателя.
+
+        Args:
+            name: Название для логов и метрик (breaker.<name>.*)
+            window: Длина скользящего окна (секунд)
+            min_calls: Минимум вызовов в окне для оценки доли ошибок
+            failure_rate: Доля ошибок, при которой цепь размыкается (0..1)
+            open_seconds: Время до пробных вызовов после размыкания
+            half_open_probes: Одновременных пробных вызовов в half_open
+        """
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        metrics.gauge(f'breaker.{name}.state', self._STATE_CODES[self.CLOSED])
+        metrics.register(f'breaker.{name}', self.stats)
+
+    def _transition(self, state: str) -> None:
+        """Смена состояния с публикацией в метрики."""
+        if state == self._state:
+            return
+        logger.warning(f"Размыкатель {self.name}: {self._state} -> {state}")
+        self._state = state
+        self._probes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        if state != self.HALF_OPEN:
+            self._outcomes.clear()
+        metrics.increment(f'breaker.{self.name}.to_{state}')
+        metrics.gauge(f'breaker.{self.name}.state', self._STATE_CODES[state])
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние (open переходит в half_open по истечении open_seconds)."""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Разрешение на вызов.
+
+        В half_open разрешение занимает слот пробного вызова, поэтому
+        за ним обязательно должен последовать record_success, record_failure или release.
+
+        Returns:
+            True, если вызов можно выполнять
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        metrics.increment(f'breaker.{self.name}.rejected')
+        return False
+
+    def release(self) -> None:
+        """Отказ от разрешенного вызова без оценки сервиса (например, при отмене)."""
+        if self._state == self.HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def _record(self, ok: bool) -> None:
+        """Учет результата вызова в окне."""
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def record_success(self) -> None:
+        """Успешный вызов."""
+        if self._state == self.HALF_OPEN:
+            self._transition(self.CLOSED)
+            return
+        self._record(True)
+
+    def record_failure(self) -> None:
+        """Вызов, завершившийся отказом сервиса."""
+        metrics.increment(f'breaker.{self.name}.failures')
+        if self._state == self.HALF_OPEN:
+            self._transition(self.OPEN)
+            return
+        self._record(False)
+        if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if failures / len(self._outcomes) >= self.failure_rate:
+                self._transition(self.OPEN)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Состояние размыкателя (счетчики переходов и отказов - в метриках breaker.<name>.*).
+
+        Returns:
+            Состояние, вызовы и ошибки в окне
+        """
+        return {
+            'state': self.state,
+            'window_calls': len(self._outcomes),
+            'window_failures': sum(1 for _, ok in self._outcomes if not ok),
+        }
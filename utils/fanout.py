@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from config import Config
+from .metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FanoutResult:
+    """Итог рассылки: кому отправлено и чьи отправки завершились ошибкой."""
+    sent: List[int] = field(default_factory=list)
+    failed: Dict[int, Exception] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Все получатели получили сообщения."""
+        return not self.failed
+
+
+async def fan_out(recipients: Iterable[int], send: Callable[[int], Awaitable[None]],
+                  concurrency: Optional[int] = None, name: str = 'notify') -> FanoutResult:
+    """
+    Параллельная рассылка нескольким получателям.
+
+    Получатели обслуживаются одновременно, но не более concurrency за раз.
+    Все сообщения одного получателя отправляются внутри send по порядку,
+    поэтому их очередность сохраняется. Ошибка прерывает отправку только
+    этому получателю и попадает в результат.
+
+    Args:
+        recipients: ID получателей (повторы отбрасываются)
+        send: Корутина, отправляющая все сообщения одному получателю
+        concurrency: Максимум одновременно обслуживаемых получателей (по умолчанию NOTIFY_CONCURRENCY)
+        name: Название рассылки для логов и метрик
+
+    Returns:
+        Итог рассылки
+    """
+    semaphore = asyncio.Semaphore(concurrency or Config.NOTIFY_CONCURRENCY)
+    result = FanoutResult()
+    started = time.perf_counter()
+
+    async def deliver(recipient: int) -> None:
+        async with semaphore:
+            try:
+                await send(recipient)
+            except Exception as e:
+                result.failed[recipient] = e
+            else:
+                result.sent.append(recipient)
+
+    await asyncio.gather(*(deliver(recipient) for recipient in dict.fromkeys(recipients)))
+
+    metrics.observe(f'{name}.fanout_ms', (time.perf_counter() - started) * 1000)
+    metrics.increment(f'{name}.sent', len(result.sent))
+    if result.failed:
+        metrics.increment(f'{name}.failed', len(result.failed))
+        for recipient, error in result.failed.items():
+            logger.warning(f"Рассылка {name}: не удалось отправить получателю {recipient}: {error}")
+    return result
@@ -0,0 +1,106 @@
+import html
+import re
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.types import InputMediaDocument, InputMediaVideo, Message
+
+from .metrics import metrics
+
+
+# Максимальное количество файлов в одном альбоме (ограничение Bot API)
+MEDIA_GROUP_LIMIT = 10
+
+# Максимальная длина подписи к файлу (ограничение Bot API)
+CAPTION_LIMIT = 1024
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def caption_length(caption: str) -> int:
+    """
+    Длина подписи в HTML так, как ее считает Bot API.
+
+    Telegram ограничивает длину текста после разбора разметки
+    в единицах UTF-16 (эмодзи занимают две).
+
+    Args:
+        caption: Подпись в HTML
+
+    Returns:
+        Длина видимого текста подписи
+    """
+    text = html.unescape(_TAG_RE.sub('', caption))
+    return len(text.encode('utf-16-le')) // 2
+
+
+def build_media_groups(documents: Optional[List[Dict]], videos: Optional[List[Dict]],
+                       caption: Optional[str] = None) -> List[List[InputMediaDocument | InputMediaVideo]]:
+    """
+    Разбиение вложений объявления на альбомы.
+
+    Документы нельзя смешивать в альбоме с другими типами, поэтому
+    документы и видео группируются отдельно, по MEDIA_GROUP_LIMIT файлов.
+    Подпись добавляется к первому файлу первого альбома.
+
+    Args:
+        documents: Документы объявления (словари с file_id)
+        videos: Видео объявления (словари с file_id)
+        caption: Подпись в HTML
+
+    Returns:
+        Список альбомов
+    """
+    groups = []
+    for media_type, files in ((InputMediaDocument, documents or []), (InputMediaVideo, videos or [])):
+        for start in range(0, len(files), MEDIA_GROUP_LIMIT):
+            group = []
+            for item in files[start:start + MEDIA_GROUP_LIMIT]:
+                # Объекты InputMedia неизменяемы, поэтому подпись задается при создании
+                if caption and not groups and not group:
+                    group.append(media_type(media=item['file_id'], caption=caption, parse_mode='HTML'))
+                else:
+                    group.append(media_type(media=item['file_id']))
+            groups.append(group)
+    return groups
+
+
+async def send_attachments(bot: Bot, chat_id: int, documents: Optional[List[Dict]], videos: Optional[List[Dict]],
+                           caption: Optional[str] = None, delivered: int = 0,
+                           on_delivered: Optional[Callable[[int], Awaitable[None]]] = None,
+                           **kwargs) -> List[Message]:
+    """
+    Отправка вложений объявления альбомами.
+
+    Одиночный файл отправляется обычным send_document/send_video,
+    так как альбом должен содержать от двух файлов.
+
+    Args:
+        bot: Объект бота
+        chat_id: ID чата
+        documents: Документы объявления
+        videos: Видео объявления
+        caption: Подпись к первому файлу в HTML (не длиннее CAPTION_LIMIT)
+        delivered: Количество первых альбомов, уже отправленных ранее (пропускаются)
+        on_delivered: Вызывается после каждого альбома с числом отправленных альбомов
+        **kwargs: Параметры отправки (message_thread_id, reply_to_message_id и т.п.)
+
+    Returns:
+        Отправленные сообщения
+    """
+    sent = []
+    for index, group in enumerate(build_media_groups(documents, videos, caption)):
+        if index < delivered:
+            continue
+
+        metrics.increment('telegram.attachment_calls')
+        if len(group) > 1:
+            sent.extend(await bot.send_media_group(chat_id, media=group, **kwargs))
+        else:
+            item = group[0]
+            send = bot.send_document if isinstance(item, InputMediaDocument) else bot.send_video
+            sent.append(await send(chat_id, item.media, caption=item.caption, parse_mode=item.parse_mode, **kwargs))
+
+        if on_delivered:
+            await on_delivered(index + 1)
+    return sent
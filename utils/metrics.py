@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, Mapping
+
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    """Реестр счетчиков и замеров времени работы бота."""
+
+    def __init__(self, window: int = 1000):
+        """
+        Инициализация реестра.
+
+        Args:
+            window: Количество последних значений, хранимых для каждого замера
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._observations: Dict[str, Deque[float]] = {}
+        self._sources: Dict[str, Callable[[], Mapping]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Увеличение счетчика.
+
+        Args:
+            name: Название счетчика
+            value: Величина увеличения
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def gauge(self, name: str, value: float) -> None:
+        """
+        Установка текущего значения показателя (размер очереди, объем памяти и т.п.).
+
+        Args:
+            name: Название показателя
+            value: Значение
+        """
+        with self._lock:
+            self._counters[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """
+        Сохранение значения замера (время, размер и т.п.).
+
+        Args:
+            name: Название замера
+            value: Значение
+        """
+        with self._lock:
+            values = self._observations.get(name)
+            if values is None:
+                values = self._observations[name] = deque(maxlen=self.window)
+            values.append(value)
+            self._counters[f'{name}.count'] += 1
+            self._counters[f'{name}.sum'] += value
+
+    def percentile(self, name: str, percent: float) -> float:
+        """
+        Перцентиль по последним значениям замера.
+
+        Args:
+            name: Название замера
+            percent: Перцентиль от 0 до 100
+
+        Returns:
+            Значение перцентиля или 0, если замеров не было
+        """
+        with self._lock:
+            values = sorted(self._observations.get(name, ()))
+        if not values:
+            return 0.0
+        index = min(len(values) - 1, int(round(percent / 100 * (len(values) - 1))))
+        return values[index]
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Текущие значения всех счетчиков и перцентили замеров.
+
+        Returns:
+            Словарь {название: значение}
+        """
+        with self._lock:
+            result = dict(self._counters)
+            names = list(self._observations)
+        for name in names:
+            result[f'{name}.p50'] = self.percentile(name, 50)
+            result[f'{name}.p95'] = self.percentile(name, 95)
+        return result
+
+    def reset(self) -> None:
+        """Сброс всех счетчиков и замеров."""
+        with self._lock:
+            self._counters.clear()
+            self._observations.clear()
+
+    def register(self, name: str, source: Callable[[], Mapping]) -> None:
+        """
+        Регистрация статистики компонента для периодического отчета.
+
+        Args:
+            name: Префикс показателей компонента в отчете
+            source: Функция без аргументов, возвращающая {показатель: значение}
+        """
+        with self._lock:
+            self._sources[name] = source
+
+    def report(self) -> Dict[str, object]:
+        """
+        Снимок метрик вместе со статистикой зарегистрированных компонентов.
+
+        Returns:
+            Словарь {название: значение}
+        """
+        result: Dict[str, object] = dict(self.snapshot())
+        with self._lock:
+            sources = list(self._sources.items())
+        for name, source in sources:
+            try:
+                stats = source()
+            except Exception as e:
+                logger.error(f"Ошибка получения статистики {name}: {e}")
+                continue
+            for key, value in stats.items():
+                result[f'{name}.{key}'] = value
+        return result
+
+    async def log_forever(self, interval: float) -> None:
+        """
+        Периодический вывод отчета о метриках в лог одной строкой.
+
+        Args:
+            interval: Интервал между отчетами (секунд)
+        """
+        while True:
+            await asyncio.sleep(interval)
+            report = self.report()
+            logger.info("Метрики: " + ', '.join(
+                f"{name}={value:g}" if isinstance(value, float) else f"{name}={value}"
+                for name, value in sorted(report.items())
+            ))
+
+
+# Глобальный реестр метрик процесса
+metrics = Metrics()
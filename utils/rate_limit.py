@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from config import Config
+from .metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Ведро токенов: не более rate событий в секунду с всплеском до capacity."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Инициализация ведра.
+
+        Args:
+            rate: Скорость пополнения (токенов в секунду)
+            capacity: Максимальное количество токенов
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Пополнение токенов за прошедшее время."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """
+        Взять токен, если он есть.
+
+        Args:
+            now: Текущее время (time.monotonic)
+
+        Returns:
+            True, если токен получен
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        """
+        Резервирование токена в очереди.
+
+        Токен списывается сразу (баланс может уйти в минус), поэтому
+        следующие запросы встают в очередь за текущим в порядке вызова.
+
+        Args:
+            now: Текущее время (time.monotonic)
+
+        Returns:
+            Время ожидания до отправки (секунд)
+        """
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def pause(self, seconds: float, now: Optional[float] = None) -> None:
+        """
+        Запрет выдачи токенов на заданное время (после ответа 429).
+
+        Args:
+            seconds: Длительность паузы
+            now: Текущее время (time.monotonic)
+        """
+        self._refill(time.monotonic() if now is None else now)
+        # Следующий reserve() вернет ровно seconds
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class OutboundRateLimiter(BaseRequestMiddleware):
+    """
+    Планировщик исходящих запросов к Bot API.
+
+    Подключается к сессии бота (bot.session.middleware) и ограничивает все
+    отправки сообщений: общим ведром на бота и ведром на каждый чат, более
+    строгим для групп. На ответ 429 чат ставится на паузу retry_after,
+    а запрос повторно встает в очередь.
+    """
+
+    def __init__(self, global_rate: Optional[float] = None, private_rate: Optional[float] = None,
+                 group_rate: Optional[float] = None, chat_burst: Optional[float] = None,
+                 max_retries: Optional[int] = None, max_chats: int = 10000):
+        """
+        Инициализация планировщика.
+
+        Args:
+            global_rate: Отправок в секунду на бота (по умолчанию TELEGRAM_GLOBAL_RATE)
+            private_rate: Отправок в секунду в личный чат (по умолчанию TELEGRAM_PRIVATE_CHAT_RATE)
+            group_rate: Отправок в секунду в группу (по умолчанию TELEGRAM_GROUP_CHAT_RATE)
+            chat_burst: Допустимый всплеск отправок в один чат (по умолчанию TELEGRAM_CHAT_BURST)
+            max_retries: Количество повторов после 429 (по умолчанию TELEGRAM_MAX_RETRIES)
+            max_chats: Максимум хранимых ведер чатов
+        """
+        self.private_rate = private_rate or Config.TELEGRAM_PRIVATE_CHAT_RATE
+        self.group_rate = group_rate or Config.TELEGRAM_GROUP_CHAT_RATE
+        self.chat_burst = chat_burst or Config.TELEGRAM_CHAT_BURST
+        self.max_retries = Config.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        self.max_chats = max_chats
+
+        rate = global_rate or Config.TELEGRAM_GLOBAL_RATE
+        self._global = TokenBucket(rate, rate)
+        self._chats: OrderedDict[int | str, TokenBucket] = OrderedDict()
+        self.queue_depth = 0
+        metrics.register('telegram', self.stats)
+
+    @staticmethod
+    def _is_group(chat_id: int | str) -> bool:
+        """Группы, супергруппы и каналы имеют отрицательный ID или @username."""
+        return isinstance(chat_id, str) or chat_id < 0
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        """Ведро чата (давно неиспользуемые ведра вытесняются)."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            rate = self.group_rate if self._is_group(chat_id) else self.private_rate
+            bucket = self._chats[chat_id] = TokenBucket(rate, self.chat_burst)
+            while len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+
+    async def _wait_turn(self, chat_id: int | str) -> float:
+        """
+        Ожидание очереди отправки в чат.
+
+        Сначала ждем ведро чата, затем общее: так сообщение, ожидающее
+        медленный чат, не занимает общую квоту бота.
+
+        Returns:
+            Время ожидания (секунд)
+        """
+        started = time.monotonic()
+        self.queue_depth += 1
+        metrics.observe('telegram.queue_depth', self.queue_depth)
+        try:
+            delay = self._chat_bucket(chat_id).reserve()
+            if delay:
+                await asyncio.sleep(delay)
+            delay = self._global.reserve()
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            self.queue_depth -= 1
+        return time.monotonic() - started
+
+    async def __call__(self, make_request: NextRequestMiddlewareType[TelegramType], bot: Bot,
+                       method: TelegramMethod[TelegramType]) -> Response[TelegramType]:
+        """
+        Отправка запроса с учетом ограничений.
+
+        Args:
+            make_request: Следующий обработчик запроса
+            bot: Объект бота
+            method: Метод Bot API
+
+        Returns:
+            Ответ Bot API
+        """
+        chat_id = getattr(method, 'chat_id', None)
+        # Ограничиваются только отправки сообщений; ответы на callback, правки и т.п. идут сразу
+        if chat_id is None or not type(method).__name__.startswith(('Send', 'Copy', 'Forward')):
+            return await make_request(bot, method)
+
+        attempt = 0
+        while True:
+            waited = await self._wait_turn(chat_id)
+            metrics.observe('telegram.queue_wait_ms', waited * 1000)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                attempt += 1
+                metrics.increment('telegram.retry_after')
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(f"Bot API 429 для чата {chat_id}, повтор через {e.retry_after} с")
+                self._chat_bucket(chat_id).pause(e.retry_after)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Состояние очереди исходящих запросов (ожидание и ответы 429 - в метриках telegram.*).
+
+        Returns:
+            Глубина очереди и количество хранимых ведер чатов
+        """
+        return {
+            'queue_depth': self.queue_depth,
+            'chats': len(self._chats),
+        }
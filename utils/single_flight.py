@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from .metrics import metrics
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов.
+
+    Пока вызов с данным ключом выполняется, следующие вызовы с тем же ключом
+    не запускают работу заново, а ждут результат первого. Результат или
+    исключение получают все ожидающие. Работа выполняется отдельной задачей,
+    поэтому отмена или таймаут одного ожидающего не прерывает ее для остальных.
+    """
+
+    def __init__(self, name: str):
+        """
+        Инициализация.
+
+        Args:
+            name: Название для метрик (singleflight.<name>.*)
+        """
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        metrics.register(f'singleflight.{name}', self.stats)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Удаление завершенной задачи из списка выполняемых."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Исключение уже передано ожидающим; если их не осталось, не засоряем лог
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнение вызова или присоединение к уже выполняемому.
+
+        Args:
+            key: Ключ, по которому вызовы считаются одинаковыми
+            call: Функция, создающая корутину с работой
+
+        Returns:
+            Результат вызова
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            metrics.increment(f'singleflight.{self.name}.leaders')
+        else:
+            metrics.increment(f'singleflight.{self.name}.coalesced')
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        """Количество выполняемых вызовов."""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Состояние объединения (запущенные и присоединившиеся вызовы - в метриках singleflight.<name>.*).
+
+        Returns:
+            Количество выполняемых сейчас вызовов
+        """
+        return {'inflight': len(self._inflight)}
@@ -0,0 +1,121 @@
+import logging
+import math
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.flags import get_flag
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from config import Config
+from .messages import messages
+from .metrics import metrics
+from .rate_limit import TokenBucket
+
+
+logger = logging.getLogger(__name__)
+
+# Группа обработчиков без флага throttling
+DEFAULT_GROUP = 'default'
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничение частоты действий пользователя.
+
+    Для каждой пары (пользователь, группа обработчиков) ведется ведро токенов.
+    Группа задается флагом обработчика, например
+    router.message(SearchForm.search_query, flags={'throttling': 'search'}),
+    обработчики без флага относятся к группе default, флаг False отключает
+    ограничение. Лишние события отбрасываются до вызова обработчика;
+    пользователь получает одно предупреждение на серию отброшенных событий.
+
+    Подключается как внутренний middleware (dp.message.middleware(...)),
+    так как флаги обработчика известны только после выбора обработчика.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None, max_users: Optional[int] = None):
+        """
+        Инициализация middleware.
+
+        Args:
+            limits: {группа: (событий в секунду, всплеск)} (по умолчанию THROTTLE_* из конфигурации)
+            max_users: Максимум хранимых ведер (по умолчанию THROTTLE_MAX_USERS)
+        """
+        self.limits = limits or {
+            DEFAULT_GROUP: (Config.THROTTLE_DEFAULT_RATE, Config.THROTTLE_DEFAULT_BURST),
+            'search': (Config.THROTTLE_SEARCH_RATE, Config.THROTTLE_SEARCH_BURST),
+        }
+        self.max_users = max_users or Config.THROTTLE_MAX_USERS
+        # Ведро и признак уже отправленного предупреждения; давно неактивные пользователи вытесняются
+        self._buckets: OrderedDict[Tuple[int, str], list] = OrderedDict()
+        metrics.register('throttling', self.stats)
+
+    def _entry(self, user_id: int, group: str) -> list:
+        """Ведро пользователя в группе."""
+        key = (user_id, group)
+        entry = self._buckets.get(key)
+        if entry is None:
+            rate, burst = self.limits.get(group, self.limits[DEFAULT_GROUP])
+            entry = self._buckets[key] = [TokenBucket(rate, burst), False]
+            while len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return entry
+
+    @staticmethod
+    async def _notify(event: TelegramObject, seconds: int) -> None:
+        """Предупреждение пользователя об ограничении."""
+        text = messages.get_message('system', 'throttled', seconds=seconds)
+        try:
+            if isinstance(event, (CallbackQuery, Message)):
+                await event.answer(text)
+        except Exception as e:
+            logger.warning(f"Не удалось отправить предупреждение об ограничении: {e}")
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        """
+        Пропуск события к обработчику, если у пользователя есть токен.
+
+        Args:
+            handler: Следующий обработчик
+            event: Входящее событие
+            data: Данные контекста
+
+        Returns:
+            Результат обработчика или None для отброшенного события
+        """
+        user = data.get('event_from_user')
+        group = get_flag(data, 'throttling', default=DEFAULT_GROUP)
+        if user is None or group is False:
+            return await handler(event, data)
+
+        entry = self._entry(user.id, group)
+        bucket = entry[0]
+        if bucket.try_acquire():
+            entry[1] = False
+            return await handler(event, data)
+
+        metrics.increment(f'throttling.{group}.rejected')
+        if not entry[1]:
+            entry[1] = True
+            seconds = max(1, math.ceil((1 - bucket.tokens) / bucket.rate))
+            await self._notify(event, seconds)
+        elif isinstance(event, CallbackQuery):
+            # Без ответа на callback у пользователя остается "часики" на кнопке
+            try:
+                await event.answer()
+            except Exception:
+                pass
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Состояние ограничителя (отброшенные события - в метриках throttling.<группа>.rejected).
+
+        Returns:
+            Количество хранимых ведер
+        """
+        return {'buckets': len(self._buckets)}